@@ -0,0 +1,75 @@
+"""
+Runs the benchmark scenarios, from the project root:
+    python -m src.benchmark --output results.json
+    python -m src.benchmark --baseline results.json
+Every scenario runs in its own process. The exit code is 1 if a scenario is slower than the baseline
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+
+from src.benchmark.runner import measure, run_isolated, compare, to_json, from_json, report
+from src.benchmark.scenarios import SCENARIOS
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(prog='python -m src.benchmark', description='Miles benchmark scenarios')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run, may be repeated; all scenarios by default')
+    parser.add_argument('--list', action='store_true', help='print the scenarios and exit')
+    parser.add_argument('--warmup', type=int, help='warm-up runs, overrides the scenario default')
+    parser.add_argument('--repetitions', type=int, help='measured runs, overrides the scenario default')
+    parser.add_argument('--output', help='file for the JSON results, - for the standard output')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown of the median')
+    parser.add_argument('--in-process', action='store_true', help='run the scenarios in this process')
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(scenario)
+        return 0
+
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        if args.in_process:
+            results[name] = measure(SCENARIOS[name], args.warmup, args.repetitions)
+        else:
+            print(f'Running {name}...', file=sys.stderr)
+            results[name] = run_isolated(name, args.warmup, args.repetitions)
+
+    meta = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    }
+    data = to_json(results, meta)
+    if args.output == '-':
+        json.dump(data, sys.stdout)
+        return 0
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = from_json(json.load(f))
+    print(report(results, baseline))
+    if baseline is None:
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
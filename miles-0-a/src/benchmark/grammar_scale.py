@@ -0,0 +1,237 @@
+"""
+Measures how the build of the matching core grows with the size of the grammar, from the project root:
+    python -m src.benchmark.grammar_scale
+    python -m src.benchmark.grammar_scale --sizes 100 1000 10000 --max-exponent 1.2
+    python -m src.benchmark.grammar_scale --stage normalize
+The build stage measures the whole create_matching_core, the normalize stage only the normalization of the matcher
+of one namespace. Every grammar size is measured in its own process.
+The measured runs pause the cyclic garbage collector, as timeit does: its full collections walk the whole live heap,
+which grows with the grammar.
+The exit code is 1 if the time grows faster than near-linearly
+"""
+import argparse
+import gc
+import json
+import math
+import subprocess
+import sys
+from typing import List, Tuple, Dict, Callable, Any
+
+from src.benchmark.runner import ScenarioResult, measure, PROJECT_ROOT
+from src.benchmark.scenario import Scenario
+from src.miles.core.command.generic_command_processor import GenericCommandProcessor
+from src.miles.core.command.syntax_cache import SyntaxCache
+from src.miles.core.matcher.matcher_factory import MatcherFactory
+from src.miles.core.normalized.matcher_normalizer import normalize
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+DEFAULT_SIZES = [100, 500, 1000, 5000, 20000]
+STAGES = ['build', 'normalize']
+"""
+Largest allowed exponent k in time ~ size^k between two measured sizes, 1 is linear growth
+"""
+MAX_EXPONENT = 1.3
+"""
+Smaller grammars are dominated by fixed costs, so they are reported, but not checked
+"""
+MIN_CHECKED_SIZE = 1000
+
+_TEMPLATES = [
+    '{k} number',
+    '{k} (RED, GREEN, BLUE) {{ ALL }}',
+    'SET {k} [(ONE, TWO)] number',
+    'MOVE {k} TO {{ COORDINATES }} number number'
+]
+
+
+class _NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class _NumberAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        if context.current().isdigit():
+            context.consume()
+        else:
+            context.fail()
+
+    def is_pure(self) -> bool:
+        return True
+
+
+def keyword(index: int) -> str:
+    """
+    :return: unique uppercase word for the index: KA, KB, ..., KZ, KAB, KBB, ...
+    """
+    letters = []
+    while True:
+        letters.append(chr(ord('A') + index % 26))
+        index //= 26
+        if index == 0:
+            return 'K' + ''.join(letters)
+
+
+def generate_commands(size: int) -> List[Tuple[str, str]]:
+    """
+    :return: names and syntaxes of the commands, every command has its own keyword,
+    some of them share the first word (SET, MOVE)
+    """
+    return [(f'command{i}', _TEMPLATES[i % len(_TEMPLATES)].format(k=keyword(i))) for i in range(size)]
+
+
+def _without_gc(run: Callable[[], Any]) -> Callable[[], Any]:
+    def paused():
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return run()
+        finally:
+            if enabled:
+                gc.enable()
+
+    return paused
+
+
+def cold_build() -> MatchingCore:
+    """
+    Builds the matching core without the syntaxes parsed by the earlier builds in the process
+    """
+    SyntaxCache().clear()
+    return create_matching_core()
+
+
+def build_scenario(size: int) -> Scenario:
+    def setup():
+        plugin = MilesRegister().create_plugin_register('grammar_scale')
+        namespace_init = plugin.add_namespace('grammar_scale', 'scale')
+        namespace_init.add_matching('number', _NumberAnalyzer())
+        for name, syntax in generate_commands(size):
+            namespace_init.add_command(name, syntax, _NoExecutor())
+        return _without_gc(cold_build)
+
+    return Scenario(f'build_{size}', f'building the matching core of {size} commands', setup,
+                    warmup=0, repetitions=3)
+
+
+def normalize_scenario(size: int) -> Scenario:
+    """
+    The matcher is built from the commands once, only its normalization is measured
+    """
+    def setup():
+        matcher_factory = MatcherFactory()
+        matcher = matcher_factory.empty_matcher()
+        for name, syntax in generate_commands(size):
+            matcher_factory.add_command(matcher, GenericCommandProcessor().process(syntax), name)
+        return _without_gc(lambda: normalize(matcher))
+
+    return Scenario(f'normalize_{size}', f'normalizing the matcher of {size} commands', setup,
+                    warmup=0, repetitions=3)
+
+
+def _scenario(stage: str, size: int) -> Scenario:
+    if stage == 'normalize':
+        return normalize_scenario(size)
+    return build_scenario(size)
+
+
+def measure_size(size: int, repetitions: int | None = None, stage: str = 'build') -> ScenarioResult:
+    """
+    Measures the grammar in this process, for the build stage the grammar is registered in MilesRegister
+    """
+    return measure(_scenario(stage, size), repetitions=repetitions)
+
+
+def measure_size_isolated(size: int, repetitions: int | None = None, stage: str = 'build') -> ScenarioResult:
+    command = [sys.executable, '-m', 'src.benchmark.grammar_scale', '--in-process', '--sizes', str(size),
+               '--stage', stage]
+    if repetitions is not None:
+        command += ['--repetitions', str(repetitions)]
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'{stage.capitalize()} of {size} commands failed:\n{completed.stderr}')
+    data = json.loads(completed.stdout)
+    return ScenarioResult.from_dict(f'{stage}_{size}', data)
+
+
+def growth_exponents(times: Dict[int, float]) -> List[Tuple[int, int, float]]:
+    """
+    :param times: time by the grammar size
+    :return: (smaller size, larger size, k) for every two neighbouring sizes, where time grows as size^k
+    """
+    sizes = sorted(times)
+    exponents = []
+    for smaller, larger in zip(sizes, sizes[1:]):
+        k = math.log(times[larger] / times[smaller]) / math.log(larger / smaller)
+        exponents.append((smaller, larger, k))
+    return exponents
+
+
+def check_near_linear(times: Dict[int, float],
+                      max_exponent: float = MAX_EXPONENT,
+                      min_size: int = MIN_CHECKED_SIZE) -> List[str]:
+    """
+    :return: descriptions of the size steps that grow faster than size^max_exponent
+    """
+    violations = []
+    for smaller, larger, k in growth_exponents(times):
+        if smaller >= min_size and k > max_exponent:
+            violations.append(f'{smaller} -> {larger} commands: time grows as size^{k:.2f}')
+    return violations
+
+
+def report(results: Dict[int, ScenarioResult]) -> str:
+    times = {size: r.median() for size, r in results.items()}
+    lines = [f'{"commands":>10} {"median ms":>12} {"us/command":>12} {"exponent":>9}']
+    exponents = {larger: k for _, larger, k in growth_exponents(times)}
+    for size in sorted(times):
+        k = f'{exponents[size]:>9.2f}' if size in exponents else f'{"":>9}'
+        lines.append(f'{size:>10} {times[size] * 1000:>12.3f} {times[size] / size * 1e6:>12.1f} {k}')
+    return '\n'.join(lines)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(prog='python -m src.benchmark.grammar_scale',
+                                     description='Build time of the matching core by the grammar size')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='numbers of commands')
+    parser.add_argument('--stage', choices=STAGES, default='build', help='measured part of the build')
+    parser.add_argument('--repetitions', type=int, help='measured runs of every size')
+    parser.add_argument('--max-exponent', type=float, default=MAX_EXPONENT,
+                        help='largest allowed k in time ~ size^k')
+    parser.add_argument('--min-size', type=int, default=MIN_CHECKED_SIZE, help='smallest checked size')
+    parser.add_argument('--in-process', action='store_true',
+                        help='measure one size in this process and print its JSON result')
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    if args.in_process:
+        if len(args.sizes) != 1:
+            raise ValueError('Only one size can be measured in one process')
+        json.dump(measure_size(args.sizes[0], args.repetitions, args.stage).as_dict(), sys.stdout)
+        return 0
+
+    results = {}
+    for size in sorted(args.sizes):
+        print(f'Measuring {args.stage} of {size} commands...', file=sys.stderr)
+        results[size] = measure_size_isolated(size, args.repetitions, args.stage)
+    print(report(results))
+
+    violations = check_near_linear({size: r.median() for size, r in results.items()},
+                                   args.max_exponent, args.min_size)
+    for violation in violations:
+        print(f'NOT LINEAR {violation}')
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
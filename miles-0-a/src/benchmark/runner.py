@@ -0,0 +1,154 @@
+import json
+import math
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+from src.benchmark.scenario import Scenario
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class ScenarioResult:
+    """
+    Times of the measured runs of one scenario, in seconds
+    """
+    name: str
+    samples: List[float]
+
+    def __init__(self, name: str, samples: List[float]):
+        if not samples:
+            raise ValueError(f'Scenario {name} has no samples')
+        self.name = name
+        self.samples = list(samples)
+
+    def min(self) -> float:
+        return min(self.samples)
+
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    def stdev(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        return statistics.stdev(self.samples)
+
+    def p95(self) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'repetitions': len(self.samples),
+            'min': self.min(),
+            'median': self.median(),
+            'mean': self.mean(),
+            'stdev': self.stdev(),
+            'p95': self.p95(),
+            'samples': self.samples
+        }
+
+    @staticmethod
+    def from_dict(name: str, data: Dict[str, Any]) -> 'ScenarioResult':
+        return ScenarioResult(name, data['samples'])
+
+
+class Regression:
+    def __init__(self, name: str, baseline: float, current: float):
+        self.name = name
+        self.baseline = baseline
+        self.current = current
+
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else math.inf
+
+    def __str__(self):
+        return (f'{self.name}: median {self.current * 1000:.3f} ms, baseline {self.baseline * 1000:.3f} ms '
+                f'(x{self.ratio():.2f})')
+
+
+def measure(scenario: Scenario, warmup: int | None = None, repetitions: int | None = None) -> ScenarioResult:
+    """
+    Runs the scenario in this process: setup, warm-up runs, then the measured runs
+    """
+    if warmup is None:
+        warmup = scenario.warmup
+    if repetitions is None:
+        repetitions = scenario.repetitions
+    if repetitions < 1:
+        raise ValueError(f'Repetitions must be positive, got {repetitions}')
+    run = scenario.setup()
+    for _ in range(warmup):
+        run()
+    samples = []
+    for _ in range(repetitions):
+        started = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - started)
+    return ScenarioResult(scenario.name, samples)
+
+
+def run_isolated(name: str, warmup: int | None = None, repetitions: int | None = None) -> ScenarioResult:
+    """
+    Runs the scenario in a new process, so the plugins it registers in MilesRegister do not affect other scenarios
+    """
+    command = [sys.executable, '-m', 'src.benchmark', '--in-process', '--scenario', name, '--output', '-']
+    if warmup is not None:
+        command += ['--warmup', str(warmup)]
+    if repetitions is not None:
+        command += ['--repetitions', str(repetitions)]
+    completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f'Scenario {name} failed:\n{completed.stderr}')
+    data = json.loads(completed.stdout)
+    return ScenarioResult.from_dict(name, data['scenarios'][name])
+
+
+def compare(results: Dict[str, ScenarioResult],
+            baseline: Dict[str, ScenarioResult],
+            tolerance: float = 0.2,
+            min_delta: float = 0.0005) -> List[Regression]:
+    """
+    :param tolerance: allowed relative growth of the median time
+    :param min_delta: allowed absolute growth of the median time in seconds, smaller changes are noise
+    :return: scenarios that are slower than the baseline; scenarios missing in the baseline are skipped
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        current = result.median()
+        expected = base.median()
+        if current > expected * (1 + tolerance) and current - expected > min_delta:
+            regressions.append(Regression(name, expected, current))
+    return regressions
+
+
+def to_json(results: Dict[str, ScenarioResult], meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'meta': meta,
+        'scenarios': {name: result.as_dict() for name, result in results.items()}
+    }
+
+
+def from_json(data: Dict[str, Any]) -> Dict[str, ScenarioResult]:
+    return {name: ScenarioResult.from_dict(name, item) for name, item in data['scenarios'].items()}
+
+
+def report(results: Dict[str, ScenarioResult], baseline: Dict[str, ScenarioResult] | None = None) -> str:
+    lines = [f'{"scenario":<20} {"runs":>5} {"min ms":>10} {"median ms":>10} {"p95 ms":>10} {"stdev ms":>10}'
+             f'{"  baseline ms":>13}']
+    for name, r in results.items():
+        base = ''
+        if baseline is not None and name in baseline:
+            base = f'{baseline[name].median() * 1000:>13.3f}'
+        lines.append(f'{name:<20} {len(r.samples):>5} {r.min() * 1000:>10.3f} {r.median() * 1000:>10.3f} '
+                     f'{r.p95() * 1000:>10.3f} {r.stdev() * 1000:>10.3f}{base}')
+    return '\n'.join(lines)
@@ -0,0 +1,24 @@
+from typing import Callable, Any
+
+
+class Scenario:
+    """
+    Named benchmark scenario. Setup builds everything the scenario needs (grammar, core, inputs)
+    and returns the function that is measured, so only this function is timed.
+    Setup registers plugins in MilesRegister, so every scenario expects a fresh process (see runner.run_isolated)
+    """
+
+    def __init__(self,
+                 name: str,
+                 description: str,
+                 setup: Callable[[], Callable[[], Any]],
+                 warmup: int = 3,
+                 repetitions: int = 20):
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.warmup = warmup
+        self.repetitions = repetitions
+
+    def __str__(self):
+        return f'{self.name}: {self.description}'
@@ -0,0 +1,187 @@
+from typing import Callable, Any, Dict, List
+
+from src.benchmark.grammar_scale import build_scenario, cold_build
+from src.benchmark.scenario import Scenario
+from src.miles.core.recognizer.recognizer_error import RecognizerError
+from src.miles.shared.context.flags import Flags
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.extended import ExtendedCore
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+CANVAS_COMMANDS = [
+    'Insert yellow square at 100 200',
+    'Insert red circle at x 10 and y 20',
+    'Add pink triangle at X 300 and Y 40',
+    'Move A to coordinates 70 17',
+    'Move A to coordinates X 5 and Y 6',
+    'set A color blue',
+    'Set A X 30',
+    'remove A',
+    'clear'
+]
+
+TYPO_COMMANDS = [
+    'insetr sqaure at 100 100',
+    'Inesrt yelow circel at 10 20',
+    'Mvoe A to coordinats 70 17',
+    'st A colr bleu',
+    'remvoe A'
+]
+
+FAILURE_COMMANDS = [
+    'totally wrong input',
+    'Insert red circle at',
+    'Move A to',
+    'set A color',
+    'rotate A by 90',
+    'Insert ' + ' '.join(['red'] * 20)
+]
+
+LIST_WORDS = ['apple', 'banana', 'orange', 'grape', 'pear']
+LIST_LENGTH = 500
+
+
+class _NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+def _flags(source: str) -> Flags:
+    flags = Flags()
+    flags.set_flag('source', source)
+    return flags
+
+
+def _canvas_core() -> MatchingCore:
+    from src.server.canvas_grammar import canvas_grammar  # needs the audio dependencies of the server
+    plugin = MilesRegister().create_plugin_register('app')
+    canvas_grammar(plugin)
+    return create_matching_core()
+
+
+def _recognize_all(core: MatchingCore, commands: List[str], flags_list: List[Flags]) -> int:
+    recognized = 0
+    for flags in flags_list:
+        for command in commands:
+            try:
+                core.recognize(command, 'canvas', flags)
+                recognized += 1
+            except RecognizerError:
+                pass
+    return recognized
+
+
+def _canvas_setup(commands: List[str], sources: List[str]) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        core = _canvas_core()
+        flags_list = [_flags(s) for s in sources]
+        return lambda: _recognize_all(core, commands, flags_list)
+
+    return setup
+
+
+def _list_setup():
+    choice = ', '.join(w.upper() for w in LIST_WORDS)
+    plugin = MilesRegister().create_plugin_register('benchmark')
+    namespace_init = plugin.add_namespace('benchmark', 'benchmark')
+    namespace_init.add_command('words', f'V [({choice})]', _NoExecutor())
+    core = create_matching_core()
+    words = ' '.join(LIST_WORDS[i % len(LIST_WORDS)] for i in range(LIST_LENGTH))
+    valid = f'v {words}'
+    invalid = f'v {words} $$$'
+
+    def run():
+        core.recognize(valid, namespace='benchmark')
+        try:
+            core.recognize(invalid, namespace='benchmark')
+        except RecognizerError:
+            pass
+
+    return run
+
+
+class _PairAnalyzer(TypedContextAnalyzer):
+
+    def __init__(self):
+        self._core = ExtendedCore(plugin='extended', namespace='extended', matching='pair')
+        self._core.init_commands([('c1', 'A B'), ('c2', 'C D'), ('c3', 'E F')])
+
+    def invoke(self, context: TextRecognizeContext):
+        structures = self._core.recognize_extended(context=context)
+        if not structures:
+            context.fail()
+            return
+        for s in structures:
+            context.variant(s.size())
+
+
+class _RecursionAnalyzer(TypedContextAnalyzer):
+
+    def __init__(self):
+        self._core = ExtendedCore(plugin='extended', namespace='extended', matching='recursion')
+        self._core.init_commands([('c1', 'Z recursion'), ('c2', 'Y recursion'), ('c3', 'Z'), ('c4', 'Y')])
+
+    def invoke(self, context: TextRecognizeContext):
+        structures = self._core.recognize_extended(context=context)
+        if not structures:
+            context.fail()
+            return
+        for s in structures:
+            context.variant(s.size())
+
+
+def _extended_setup():
+    plugin_register = MilesRegister().create_plugin_register('extended')
+    namespace_init = plugin_register.add_namespace('extended', 'extended')
+    namespace_init.add_command('command1', 'pair', _NoExecutor())
+    namespace_init.add_command('command2', 'recursion', _NoExecutor())
+    namespace_init.add_matching('pair', _PairAnalyzer())
+    namespace_init.add_matching('recursion', _RecursionAnalyzer())
+    core = create_matching_core()
+    commands = ['a b', 'c d', 'e f', 'z', 'y z y z', ' '.join(['z', 'y'] * 6)]
+
+    def run():
+        for command in commands:
+            core.recognize(command, namespace='extended')
+
+    return run
+
+
+def _core_build_setup(parsed: bool):
+    """
+    :param parsed: if True, the syntaxes parsed by the warmup are reused, otherwise every run parses them again
+    """
+    def setup():
+        from src.server.canvas_grammar import canvas_grammar
+        plugin = MilesRegister().create_plugin_register('app')
+        canvas_grammar(plugin)
+        return create_matching_core if parsed else cold_build
+
+    return setup
+
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in [
+    Scenario('canvas_text', 'canvas commands typed as text',
+             _canvas_setup(CANVAS_COMMANDS, ['text'])),
+    Scenario('canvas_audio', 'canvas commands from the voice recognition',
+             _canvas_setup(CANVAS_COMMANDS, ['audio'])),
+    Scenario('canvas_typo', 'canvas commands with typos, from text and audio',
+             _canvas_setup(TYPO_COMMANDS, ['text', 'audio'])),
+    Scenario('canvas_failure', 'canvas inputs that are not commands, from text and audio',
+             _canvas_setup(FAILURE_COMMANDS, ['text', 'audio'])),
+    Scenario('list_grammar', f'list of {LIST_LENGTH} words, valid and invalid',
+             _list_setup, warmup=1, repetitions=10),
+    Scenario('extended_recursion', 'matchings recognized by nested ExtendedCore commands',
+             _extended_setup),
+    Scenario('core_build', 'building the matching core of the canvas grammar',
+             _core_build_setup(parsed=False), warmup=1, repetitions=10),
+    Scenario('core_build_parsed', 'building the matching core of the canvas grammar from the parsed syntaxes',
+             _core_build_setup(parsed=True), warmup=1, repetitions=10),
+    build_scenario(1000),
+]}
@@ -168,14 +168,23 @@ class ChoiceComponent(CommandComponent):
 
 
 class Command:
+    """
+    Parsed command syntax. Commands and their components are not changed after parsing,
+    so one command can be shared by all namespaces with the same syntax
+    """
+
     def __init__(self, root: RootComponent):
-        self.root = root
+        self._root = root
+
+    @property
+    def root(self) -> RootComponent:
+        return self._root
 
     def __str__(self):
-        return f"Command: {self.root}"
+        return f"Command: {self._root}"
 
     def accept_visitor(self, visitor):
-        self.root.accept_visitor(visitor)
+        self._root.accept_visitor(visitor)
 
 
 class ComponentVisitor(ABC):
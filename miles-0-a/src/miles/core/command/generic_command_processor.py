@@ -6,6 +6,7 @@ from src.miles.core.command.command import Command, RootComponent, \
     WordComponent, MatchingComponent, ChoiceComponent, ListComponent, OptionalComponent, SequenceComponent, \
     NamedComponent
 from src.miles.core.command.command_processor_error import CommandProcessorError
+from src.miles.core.command.syntax_cache import SyntaxCache
 from src.miles.utils.singleton import Singleton
 
 
@@ -54,6 +55,10 @@ class _GenericCommandTransformer(Transformer):
 
 
 class _GenericCommandParser(metaclass=Singleton):
+    """
+    The LALR tables are stored in the directory of SyntaxCache, if it is attached before the first parse
+    """
+
     def __init__(self):
         grammar = r"""
             start:   sequence                   -> root
@@ -76,25 +81,33 @@ class _GenericCommandParser(metaclass=Singleton):
             %ignore WS
         """
 
-        self.content = Lark(grammar, start="start", parser="lalr")
+        cache_path = SyntaxCache().parser_cache_path()
+        self.content = Lark(grammar, start="start", parser="lalr", cache=cache_path or False)
 
 
 class GenericCommandProcessor:
     def __init__(self, parser: Lark | None = None, transformer: Transformer | None = None):
-        if parser is None:
-            parser = _GenericCommandParser().content
+        self._memo = parser is None and transformer is None  # commands of a custom parser are not shared
         if transformer is None:
             transformer = _GenericCommandTransformer()
         self._parser = parser
         self._transformer = transformer
 
     def process(self, command_string: str) -> Command:
+        if self._memo:
+            command = SyntaxCache().get(command_string)
+            if command is not None:
+                return command
+        if self._parser is None:
+            self._parser = _GenericCommandParser().content  # built on the first parse, not needed for memo hits
         try:
             tree = self._parser.parse(command_string)
-            transformed = self._transformer.transform(tree)
-            named_command = self._transformer.transform(transformed)
+            named_command = self._transformer.transform(tree)
         except Error as e:
             raise CommandProcessorError('Command parsing error') from e
         if not isinstance(named_command, RootComponent):
             raise CommandProcessorError(f'Unexpected parsing output: ' + named_command)
-        return Command(named_command)
+        command = Command(named_command)
+        if self._memo:
+            SyntaxCache().put(command_string, command)
+        return command
@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Any
+
+from src.miles.core.command.command import Command, ComponentVisitor, RootComponent, SequenceComponent, \
+    WordComponent, MatchingComponent, OptionalComponent, ListComponent, ChoiceComponent, NamedComponent, \
+    CommandComponent
+from src.miles.utils.singleton import Singleton
+
+"""
+Increment when the command syntax or the stored form of commands changes, so old files are not used
+"""
+SYNTAX_CACHE_VERSION = 1
+COMMANDS_FILE = 'syntax-commands.json'
+PARSER_FILE = 'syntax-parser.lark'
+
+
+class _CommandWriter(ComponentVisitor):
+    """
+    Writes the components as nested JSON compatible lists: [kind, content...]
+    """
+
+    def __init__(self):
+        self.result = None
+
+    def write(self, component: CommandComponent) -> List[Any]:
+        component.accept_visitor(self)
+        return self.result
+
+    def visit_root(self, root: RootComponent):
+        self.result = ['root', self.write(root.get_content())]
+
+    def visit_sequence(self, sequence: SequenceComponent):
+        self.result = ['sequence', [self.write(c) for c in sequence.get_content()]]
+
+    def visit_word(self, word: WordComponent):
+        self.result = ['word', word.get_content()]
+
+    def visit_matching(self, matching: MatchingComponent):
+        self.result = ['matching', matching.get_content()]
+
+    def visit_optional(self, optional: OptionalComponent):
+        self.result = ['optional', self.write(optional.get_content())]
+
+    def visit_list(self, lst: ListComponent):
+        self.result = ['list', self.write(lst.get_content())]
+
+    def visit_choice(self, choice: ChoiceComponent):
+        self.result = ['choice', [self.write(c) for c in choice.get_content()]]
+
+    def visit_named(self, named: NamedComponent):
+        self.result = ['named', named.get_name(), self.write(named.get_content())]
+
+
+def _read_component(data: List[Any]) -> CommandComponent:
+    kind = data[0]
+    if kind == 'root':
+        return RootComponent(_read_component(data[1]))
+    if kind == 'sequence':
+        return SequenceComponent([_read_component(c) for c in data[1]])
+    if kind == 'word':
+        return WordComponent(data[1])
+    if kind == 'matching':
+        return MatchingComponent(data[1])
+    if kind == 'optional':
+        return OptionalComponent(_read_component(data[1]))
+    if kind == 'list':
+        return ListComponent(_read_component(data[1]))
+    if kind == 'choice':
+        return ChoiceComponent([_read_component(c) for c in data[1]])
+    if kind == 'named':
+        return NamedComponent(data[1], _read_component(data[2]))
+    raise ValueError(f'Unknown command component: {kind}')
+
+
+def command_to_list(command: Command) -> List[Any]:
+    return _CommandWriter().write(command.root)
+
+
+def command_from_list(data: List[Any]) -> Command:
+    root = _read_component(data)
+    if not isinstance(root, RootComponent):
+        raise ValueError(f'Command must start with a root component, got {data[0]}')
+    return Command(root)
+
+
+class SyntaxCache(metaclass=Singleton):
+    """
+    Process-wide memo of parsed command syntax: the same syntax string is parsed by Lark only once,
+    all users of the syntax share one Command, commands are never changed after parsing.
+    When a directory is attached, the memo is loaded from it and can be saved back,
+    and the Lark parser of the command syntax stores its LALR tables there
+    """
+    _commands: Dict[str, Command]
+
+    def __init__(self):
+        self._commands = {}
+        self._lock = threading.Lock()
+        self._directory = None
+        self._loaded = True
+        self._changed = False
+
+    def get(self, syntax: str) -> Command | None:
+        if not self._loaded:
+            self._load()
+        return self._commands.get(syntax)
+
+    def put(self, syntax: str, command: Command):
+        with self._lock:
+            if syntax not in self._commands:
+                self._commands[syntax] = command
+                self._changed = True
+
+    def __len__(self):
+        return len(self._commands)
+
+    def clear(self):
+        with self._lock:
+            self._commands = {}
+            self._changed = False
+
+    def directory(self) -> Path | None:
+        return self._directory
+
+    def parser_cache_path(self) -> str | None:
+        """
+        :return: file for the LALR tables of the command syntax parser, None if no directory is attached
+        """
+        if self._directory is None:
+            return None
+        return str(self._directory / PARSER_FILE)
+
+    def attach(self, directory: str | os.PathLike):
+        """
+        The commands stored in the directory are loaded on the first lookup
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            if self._directory != directory:
+                self._directory = directory
+                self._loaded = False
+
+    def _load(self):
+        """
+        Unreadable or outdated files are ignored, commands that are already known are kept
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self._directory / COMMANDS_FILE, encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') != SYNTAX_CACHE_VERSION:
+                    return
+                stored = {syntax: command_from_list(tree) for syntax, tree in data['commands'].items()}
+            except (OSError, ValueError, KeyError, TypeError, IndexError):
+                return
+            for syntax, command in stored.items():
+                self._commands.setdefault(syntax, command)
+
+    def save(self):
+        """
+        Writes the memo to the attached directory atomically, if it has new commands
+        """
+        if not self._loaded:
+            self._load()  # keep the stored commands that have not been used yet
+        with self._lock:
+            if self._directory is None or not self._changed:
+                return
+            data = {
+                'version': SYNTAX_CACHE_VERSION,
+                'commands': {syntax: command_to_list(command) for syntax, command in self._commands.items()}
+            }
+            self._changed = False
+            self._directory.mkdir(parents=True, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self._directory, prefix='syntax-', suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, separators=(',', ':'))
+                os.replace(temporary, self._directory / COMMANDS_FILE)
+            except BaseException:
+                os.unlink(temporary)
+                raise
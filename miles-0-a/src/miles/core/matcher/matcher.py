@@ -1,8 +1,7 @@
-from typing import Self, List
+from typing import Self, List, Dict, Tuple
 
 from src.miles.core.matcher.matcher_error import MatcherError
 from src.miles.shared.connection_type import ConnectionType
-from src.miles.utils.list_utils import index_of
 from src.miles.utils.pretty import PrintableStructure
 from src.miles.utils.strings import print_list
 
@@ -27,6 +26,9 @@ class MatchConnection(PrintableStructure):
                 and self.connection_type == other.connection_type
                 and self.connection_arg == other.connection_arg)
 
+    def __hash__(self):
+        return hash((self.connection_type, self.connection_arg, self.name))
+
     def sprint(self):
         result = '(' + self.connection_type.name
         if self.connection_arg:
@@ -45,6 +47,7 @@ class MatchState:
     _destinations: List[Self]
     _priorities: List[int]
     _final: bool
+    _indexes: Dict[MatchConnection, int]
 
     def __hash__(self):
         return self._state_id
@@ -55,6 +58,7 @@ class MatchState:
         self._destinations = []
         self._priorities = []
         self._final = is_final
+        self._indexes = {}
 
     def __str__(self):
         return (f"State {{ id={self._state_id}, "
@@ -71,8 +75,11 @@ class MatchState:
             return False
         return self._state_id == other._state_id
 
+    def _connection_index(self, connection: MatchConnection) -> int:
+        return self._indexes.get(connection, -1)
+
     def has_connection(self, connection: MatchConnection, priority: int | None = None):
-        index = index_of(self._connections, connection)
+        index = self._connection_index(connection)
         if index == -1:
             return False
         if priority is None:
@@ -80,13 +87,13 @@ class MatchState:
         return self._priorities[index] == priority
 
     def get_destination(self, connection):
-        index = index_of(self._connections, connection)
+        index = self._connection_index(connection)
         if index < 0:
             return None
         return self._destinations[index]
 
     def get_priority(self, connection: MatchConnection):
-        index = index_of(self._connections, connection)
+        index = self._connection_index(connection)
         if index < 0:
             return None
         return self._priorities[index]
@@ -94,8 +101,14 @@ class MatchState:
     def all_connections(self) -> List[MatchConnection]:
         return list(self._connections)
 
+    def transitions(self) -> List[Tuple[MatchConnection, Self]]:
+        """
+        :return: all outgoing connections together with their destinations
+        """
+        return list(zip(self._connections, self._destinations))
+
     def update_priority(self, connection: MatchConnection, priority: int):
-        index = index_of(self._connections, connection)
+        index = self._connection_index(connection)
         if index == -1:
             return None
 
@@ -106,6 +119,7 @@ class MatchState:
     def add_connection(self, connection: MatchConnection, priority: int, new_state: Self):
         if self.has_connection(connection):
             raise MatcherError(f'Cannot add connection, because one already exists: {connection}')
+        self._indexes[connection] = len(self._connections)
         self._connections.append(connection)
         self._priorities.append(priority)
         self._destinations.append(new_state)
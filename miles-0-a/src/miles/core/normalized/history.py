@@ -37,27 +37,66 @@ class HistoryItem:
 
 
 class NorHistory:
-    _items: List[HistoryItem]
+    """
+    Persistent recognition history.
+    Every history is a link to its last item and to the history it extends, so extending is O(1)
+    and all pointers that come from the same origin share the common part of their histories.
+    The plain list of items is materialized only on demand (see all_items)
+    """
+    _parent: Self | None
+    _item: HistoryItem | None
+    _size: int
 
     def __init__(self, items: List[HistoryItem] | None = None):
-        if items is None:
-            self._items = []
-        else:
-            self._items = list(items)
+        self._parent = None
+        self._item = None
+        self._size = 0
+        if items:
+            history = NorHistory()
+            for item in items[:-1]:
+                history = history.extend(item)
+            self._parent = history
+            self._item = items[-1]
+            self._size = history._size + 1
+
+    @classmethod
+    def _linked(cls, parent: Self, item: HistoryItem) -> Self:
+        history = cls.__new__(cls)
+        history._parent = parent
+        history._item = item
+        history._size = parent._size + 1
+        return history
 
     def extend(self, item: HistoryItem) -> Self:
-        return NorHistory(self._items + [item])
+        return NorHistory._linked(self, item)
 
     def all_items(self) -> List[HistoryItem]:
-        return list(self._items)
+        items = [None] * self._size
+        history = self
+        for i in range(self._size - 1, -1, -1):
+            items[i] = history._item
+            history = history._parent
+        return items
+
+    def __len__(self):
+        return self._size
 
     def __eq__(self, other):
         if not isinstance(other, NorHistory):
             return False
-        return self._items == other._items
+        if self._size != other._size:
+            return False
+        first, second = self, other
+        while first is not second:  # shared tails are equal by definition
+            if first._item != second._item:
+                return False
+            first, second = first._parent, second._parent
+        return True
 
     def __str__(self):
-        return print_list(self._items)
+        return print_list(self.all_items())
 
     def last(self) -> HistoryItem:
-        return self._items[-1]
+        if self._item is None:
+            raise IndexError('History is empty')
+        return self._item
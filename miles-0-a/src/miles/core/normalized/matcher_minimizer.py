@@ -0,0 +1,83 @@
+from collections import deque
+from typing import List, Dict, Tuple, Any
+
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedState
+
+"""
+Minimization merges equivalent states of a normalized matcher.
+Two states are equivalent when both are final or both are not, and their connections, in their order,
+have the same nodes, the same priorities and equivalent destinations.
+Every command ends with its own 'recognize <name>' connection, so states of different commands are merged only
+when the rest of the paths is the same, and every recognized command is still identified by its label.
+The recognizer reaches the same histories through the minimized matcher, in the same order
+"""
+
+
+def _reachable_states(matcher: NormalizedMatcher) -> List[NormalizedState]:
+    initial = matcher.initial_state()
+    visited = {initial}
+    ordered = [initial]
+    queue = deque([initial])
+    while queue:
+        current = queue.popleft()
+        for _, destination, _ in current.transitions():
+            if destination not in visited:
+                visited.add(destination)
+                ordered.append(destination)
+                queue.append(destination)
+    return ordered
+
+
+def _own_signature(state: NormalizedState) -> Tuple[Any, ...]:
+    """
+    :return: everything that makes the state different except the destinations
+    """
+    connections = []
+    for connection, _, priority in state.transitions():
+        nodes = tuple((node.node_type, node.argument, node.name) for node in connection.get_nodes())
+        connections.append((nodes, priority))
+    return state.is_final(), tuple(connections)
+
+
+def _numbered(signatures: List[Any]) -> List[int]:
+    numbers: Dict[Any, int] = {}
+    return [numbers.setdefault(signature, len(numbers)) for signature in signatures]
+
+
+def equivalence_classes(matcher: NormalizedMatcher) -> Tuple[List[NormalizedState], List[int]]:
+    """
+    Splits the states until the destinations of equivalent states are equivalent too
+    :return: reachable states in breadth-first order and the class of every state, the initial state has class 0
+    """
+    states = _reachable_states(matcher)
+    index = {state: i for i, state in enumerate(states)}
+    destinations = [[index[destination] for _, destination, _ in state.transitions()] for state in states]
+
+    classes = _numbered([_own_signature(state) for state in states])
+    count = max(classes) + 1
+    while True:
+        refined = _numbered([(classes[i], tuple(classes[d] for d in destinations[i])) for i in range(len(states))])
+        refined_count = max(refined) + 1
+        classes = refined
+        if refined_count == count:
+            return states, classes
+        count = refined_count
+
+
+def minimize(matcher: NormalizedMatcher) -> NormalizedMatcher:
+    """
+    :return: matcher with one state for every class of equivalent states. The first state of a class
+    in breadth-first order represents the class and keeps its id and connections
+    """
+    states, classes = equivalence_classes(matcher)
+    representatives: Dict[int, NormalizedState] = {}
+    for state, state_class in zip(states, classes):
+        if state_class not in representatives:
+            representatives[state_class] = state
+
+    merged = {c: NormalizedState(state.get_id(), state.is_final()) for c, state in representatives.items()}
+    index = {state: i for i, state in enumerate(states)}
+    for state_class, state in representatives.items():
+        for connection, destination, priority in state.transitions():
+            merged[state_class].add_connection(connection, merged[classes[index[destination]]], priority)
+    return NormalizedMatcher(merged[classes[0]])
@@ -1,4 +1,5 @@
-from typing import Set, List, Self, Dict
+from collections import deque
+from typing import Set, List, Self, Dict, Tuple, Deque
 
 from src.miles.core.matcher.matcher import Matcher, MatchState, MatchConnection, ConnectionType
 from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedState, NormalizedNode, \
@@ -19,44 +20,72 @@ This approach provides several important advantages:
     For example, [{a}] - list of optionals may have an infinite loop
     - Automatic connections are still possible because of final states.
     For example, (state) --auto--> (final) cannot be rewritten as word or matching connection
+
+Every path of automatic connections becomes a connection of its own, so nested optionals, like {{A}} {{B}} {{C}},
+multiply the connections of a state. With a fan-out limit, a state that would have more connections
+keeps some of its automatic successors as shared states: it has one automatic-only connection to every such state,
+and the paths after the state are the connections of the shared state. The history of the recognized command
+is the same, the paths are only split in two connections
 """
 
+"""
+Fan-out limit of the command matchers where all connections have the default priority, see normalize
+"""
+MAX_FAN_OUT = 64
+
 
 @auto_str
 class _PathNode:
-    def __init__(self, state: MatchState, connection: MatchConnection):
+    def __init__(self, state: MatchState, connection: MatchConnection, destination: MatchState):
         self.state = state
         self.connection = connection
+        self.destination = destination
 
 
 class _Path:
-    def __init__(self, path: List[_PathNode] | None = None):
-        if path is None:
-            path = []
+    def __init__(self, path: Tuple[_PathNode, ...] = ()):
         self._path = path
 
-    def extend(self, node: _PathNode) -> Self:
-        return _Path(self._path + [node])
-
     def destination(self) -> MatchState | None:
         if len(self._path) == 0:
             return None
-        last_node = self._path[-1]
-        return last_node.state.get_destination(last_node.connection)
+        return self._path[-1].destination
 
     def __str__(self):
-        return print_list(self._path)
+        return print_list(list(self._path))
 
     def nodes(self) -> List[_PathNode]:
         return list(self._path)
 
 
-@auto_str
+class _PathLink:
+    """
+    Path under construction as a linked list from the last node to the first one, extending it does not copy
+    """
+
+    def __init__(self, node: _PathNode, previous: Self | None):
+        self.node = node
+        self.previous = previous
+
+    @staticmethod
+    def to_tuple(link: Self | None) -> Tuple[_PathNode, ...]:
+        nodes = []
+        while link is not None:
+            nodes.append(link.node)
+            link = link.previous
+        nodes.reverse()
+        return tuple(nodes)
+
+
 class _StackItem:
-    def __init__(self, state: MatchState, count: int, path: _Path):
+    def __init__(self, state: MatchState, link: _PathLink | None, depth: int, first_path: int):
         self.state = state
-        self.count = count
-        self.path = path
+        self.transitions = state.transitions()
+        self.count = 0
+        self.link = link  # path from the origin to this state
+        self.depth = depth  # number of nodes in this path
+        self.first_path = first_path  # index of the first path found from this state
+        self.loopback = depth + 1  # smallest depth of a state on the stack that the paths from this state return to
 
 
 class _NormalizedPaths(PrintableStructure):
@@ -94,19 +123,92 @@ class _NormalizedCollection(PrintableStructure):
         return list(self._paths)
 
 
-def _find_all_reachable_paths(from_state: MatchState) -> List[_Path]:
-    stack: List[_StackItem] = [_StackItem(from_state, 0, _Path())]
-    paths: List[_Path] = []
+def _share_paths(found: List[Tuple[_PathNode, ...]],
+                 current: _StackItem,
+                 closures: Dict[MatchState, Tuple[Tuple[_PathNode, ...], ...]],
+                 shared: Dict[MatchState, Tuple[Tuple[_PathNode, ...], ...]],
+                 max_fan_out: int):
+    """
+    Replaces the paths from the current state through its automatic successors with known closures
+    by single paths that end in these successors, the successors with the most paths first,
+    until the current state has at most max_fan_out paths or no successor is left.
+    Such successors become shared states: their closures are the connections of their own
+    """
+    depth = current.depth
+    groups: List[Tuple[_PathNode, List[Tuple[_PathNode, ...]]]] = []
+    for nodes in found[current.first_path:]:
+        node = nodes[depth]
+        if groups and groups[-1][0] is node:
+            groups[-1][1].append(nodes)
+        else:
+            groups.append((node, [nodes]))
+
+    savings: Dict[MatchState, int] = {}
+    for node, paths in groups:
+        if len(paths) > 1 and node.destination in closures:
+            savings[node.destination] = savings.get(node.destination, 0) + len(paths) - 1
+
+    count = len(found) - current.first_path
+    chosen: Set[MatchState] = set()
+    for state in sorted(savings, key=savings.__getitem__, reverse=True):
+        if count <= max_fan_out:
+            break
+        chosen.add(state)
+        count -= savings[state]
+    if not chosen:
+        return
+
+    for state in chosen:
+        if state not in shared:  # may be shared by another state after its paths were taken
+            shared[state] = closures[state]
+            closures[state] = ((),)
+    reduced = []
+    for node, paths in groups:
+        if node.destination in chosen:
+            reduced.append(paths[0][:depth + 1])
+        else:
+            reduced.extend(paths)
+    found[current.first_path:] = reduced
+
+
+def _find_all_reachable_paths(from_state: MatchState,
+                              closures: Dict[MatchState, Tuple[Tuple[_PathNode, ...], ...]],
+                              shared: Dict[MatchState, Tuple[Tuple[_PathNode, ...], ...]],
+                              max_fan_out: int | None = None) -> List[_Path]:
+    """
+    Depth-first search of all paths from the state that pass through automatic connections
+    and end with a non-automatic connection or in a final state. A path never passes through a state twice.
+
+    If no path from a state returns to this state or to the states before it, the state is not a part of
+    an automatic loop, and its paths do not depend on how the state was reached. They are remembered in closures
+    when the search leaves the state and reused, in the same order, whenever the state is passed through again.
+
+    If max_fan_out is set, a state with more paths than that shares the closures of its successors (see _share_paths),
+    the paths of the shared states are in shared
+    """
+    if from_state in shared:
+        return [_Path(nodes) for nodes in shared[from_state]]
+    if from_state in closures:
+        return [_Path(nodes) for nodes in closures[from_state]]
+
+    found: List[Tuple[_PathNode, ...]] = []
+    stack: List[_StackItem] = [_StackItem(from_state, None, 0, 0)]
+    depth_on_stack: Dict[MatchState, int] = {from_state: 0}
     while len(stack) > 0:
         current = stack[-1]
-        connections = current.state.all_connections()
 
-        if current.count >= len(connections):
+        if current.count >= len(current.transitions):
             stack.pop(-1)
+            del depth_on_stack[current.state]
+            if max_fan_out is not None and len(found) - current.first_path > max_fan_out:
+                _share_paths(found, current, closures, shared, max_fan_out)
+            if current.loopback > current.depth:
+                closures[current.state] = tuple(nodes[current.depth:] for nodes in found[current.first_path:])
+            if stack:
+                stack[-1].loopback = min(stack[-1].loopback, current.loopback)
             continue
 
-        connection = current.state.all_connections()[current.count]
-        destination = current.state.get_destination(connection)
+        connection, destination = current.transitions[current.count]
         current.count += 1
 
         terminate = False
@@ -116,27 +218,34 @@ def _find_all_reachable_paths(from_state: MatchState) -> List[_Path]:
         if destination.is_final():
             terminate = True
 
-        if destination in [s.state for s in stack] and not terminate:  # loopback
+        if destination in depth_on_stack and not terminate:  # loopback
+            current.loopback = min(current.loopback, depth_on_stack[destination])
             continue
 
-        new_path = current.path.extend(_PathNode(current.state, connection))
+        link = _PathLink(_PathNode(current.state, connection, destination), current.link)
 
         if terminate:
-            paths.append(new_path)  # reached final state, remember the path and continue
+            found.append(_PathLink.to_tuple(link))  # reached final state, remember the path and continue
+        elif destination in closures:
+            prefix = _PathLink.to_tuple(link)  # the paths from this node are already known
+            found.extend(prefix + suffix for suffix in closures[destination])
         else:
-            stack.append(_StackItem(destination, 0, new_path))  # continue from this node
-    return paths
+            stack.append(_StackItem(destination, link, current.depth + 1, len(found)))  # continue from this node
+            depth_on_stack[destination] = current.depth + 1
+    return [_Path(nodes) for nodes in found]
 
 
-def _get_normalized_collection(matcher: Matcher) -> _NormalizedCollection:
+def _get_normalized_collection(matcher: Matcher, max_fan_out: int | None = None) -> _NormalizedCollection:
     initial = matcher.get_initial_state()
     key_states: Set[MatchState] = {initial}
+    closures: Dict[MatchState, Tuple[Tuple[_PathNode, ...], ...]] = {}
+    shared: Dict[MatchState, Tuple[Tuple[_PathNode, ...], ...]] = {}
 
-    queue: List[MatchState] = [initial]
+    queue: Deque[MatchState] = deque([initial])
     n_paths: List[_NormalizedPaths] = []
     while len(queue) > 0:
-        current = queue.pop(0)
-        reachable: List[_Path] = _find_all_reachable_paths(current)
+        current = queue.popleft()
+        reachable: List[_Path] = _find_all_reachable_paths(current, closures, shared, max_fan_out)
 
         last_destinations = []
         for r in reachable:
@@ -144,22 +253,15 @@ def _get_normalized_collection(matcher: Matcher) -> _NormalizedCollection:
 
         for dest in last_destinations:
             if dest not in key_states:
+                key_states.add(dest)
                 queue.append(dest)
 
-        key_states = key_states | set(last_destinations)
         if len(reachable) > 0:
             n_paths.append(_NormalizedPaths(current, reachable))
 
     return _NormalizedCollection(n_paths)
 
 
-class _ConnectionPrototype:
-    def __init__(self, from_id: int, path: _Path, to_id: int):
-        self.from_id = from_id
-        self.to_id = to_id
-        self.path = path
-
-
 def _map_connection_type(connection_type: ConnectionType) -> HistoryNodeType:
     if connection_type == ConnectionType.AUTOMATIC:
         return HistoryNodeType.AUTOMATIC
@@ -175,46 +277,44 @@ class _NormalizerMatcherBuilder:
         self._origin_id = origin_id
         self._collection = collection
         self._connection_id = 0
+        self._states: Dict[int, NormalizedState] = {}
+        self._nodes: Dict[MatchConnection, NormalizedNode] = {}
 
     def _create_state(self, _final: bool):
         state = NormalizedState(self._state_id, _final)
         self._state_id += 1
         return state
 
-    def build(self) -> NormalizedMatcher:
-        paths = self._collection.all_paths()
-
-        prototypes: List[_ConnectionPrototype] = []
-
-        all_states: Dict[int, NormalizedState] = {}
+    def _state_for(self, state: MatchState) -> NormalizedState:
+        normalized_state = self._states.get(state.get_id())
+        if normalized_state is None:
+            normalized_state = self._create_state(state.is_final())
+            self._states[state.get_id()] = normalized_state
+        return normalized_state
+
+    def _node_for(self, connection: MatchConnection) -> NormalizedNode:
+        """
+        Equal connections share one normalized node, nodes are never changed
+        """
+        node = self._nodes.get(connection)
+        if node is None:
+            node = NormalizedNode(_map_connection_type(connection.connection_type),
+                                  connection.connection_arg,
+                                  connection.name)
+            self._nodes[connection] = node
+        return node
 
-        for path in paths:
-            origin = path.origin
+    def build(self) -> NormalizedMatcher:
+        for path in self._collection.all_paths():
+            from_state = self._state_for(path.origin)
             for inner in path.paths:
-                destination = inner.destination()
-                prototypes.append(_ConnectionPrototype(origin.get_id(), inner, destination.get_id()))
-                if origin.get_id() not in all_states.keys():
-                    all_states[origin.get_id()] = self._create_state(origin.is_final())
-                if destination.get_id() not in all_states.keys():
-                    all_states[destination.get_id()] = self._create_state(destination.is_final())
-
-        for prototype in prototypes:
-            from_state = all_states.get(prototype.from_id)
-            to_state = all_states.get(prototype.to_id)
-            all_nodes = []
-            for path_node in prototype.path.nodes():
-                connection = path_node.connection
-                normalized_node = NormalizedNode(
-                    _map_connection_type(connection.connection_type),
-                    connection.connection_arg,
-                    connection.name
-                )
-                all_nodes.append(normalized_node)
-            normalized_connection = NormalizedConnection(self._connection_id, all_nodes)
-            self._connection_id += 1
-            from_state.add_connection(normalized_connection, to_state)
-
-        return NormalizedMatcher(all_states.get(self._origin_id))
+                to_state = self._state_for(inner.destination())
+                all_nodes = [self._node_for(path_node.connection) for path_node in inner.nodes()]
+                normalized_connection = NormalizedConnection(self._connection_id, all_nodes)
+                self._connection_id += 1
+                from_state.add_connection(normalized_connection, to_state)
+
+        return NormalizedMatcher(self._states.get(self._origin_id))
 
 
 def _build_normalized_matcher(matcher: Matcher, collection: _NormalizedCollection) -> NormalizedMatcher:
@@ -222,6 +322,28 @@ def _build_normalized_matcher(matcher: Matcher, collection: _NormalizedCollectio
     return _NormalizerMatcherBuilder(origin_id, collection).build()
 
 
-def normalize(origin: Matcher) -> NormalizedMatcher:
-    collection = _get_normalized_collection(origin)
+def count_connections(matcher: Matcher) -> int:
+    """
+    :return: number of connections of all states reachable from the initial state
+    """
+    initial = matcher.get_initial_state()
+    visited = {initial}
+    queue: Deque[MatchState] = deque([initial])
+    count = 0
+    while queue:
+        current = queue.popleft()
+        for _, destination in current.transitions():
+            count += 1
+            if destination not in visited:
+                visited.add(destination)
+                queue.append(destination)
+    return count
+
+
+def normalize(origin: Matcher, max_fan_out: int | None = None) -> NormalizedMatcher:
+    """
+    :param max_fan_out: if set, states with more connections than that share the paths of their successors
+    where possible, otherwise every path is a connection
+    """
+    collection = _get_normalized_collection(origin, max_fan_out)
     return _build_normalized_matcher(origin, collection)
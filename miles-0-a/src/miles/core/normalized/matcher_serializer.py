@@ -0,0 +1,51 @@
+from collections import deque
+from typing import Dict, Any, Tuple
+
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedState, NormalizedNode, \
+    NormalizedConnection, HistoryNodeType
+
+"""
+Normalized matchers are stored as JSON compatible dictionaries:
+    {
+        "initial": state id,
+        "nodes": [[node type name, argument, name], ...],
+        "states": [[state id, final, [[connection id, node indexes, destination id, priority], ...]], ...]
+    }
+Equal nodes are stored once and shared by the restored connections.
+State and connection ids and the order of connections are kept, so a restored matcher compiles to the same CompiledMatcher
+"""
+
+
+def matcher_to_dict(matcher: NormalizedMatcher) -> Dict[str, Any]:
+    initial = matcher.initial_state()
+    visited = {initial}
+    queue = deque([initial])
+    node_indexes: Dict[Tuple[str, str, str | None], int] = {}
+    states = []
+    while queue:
+        current = queue.popleft()
+        transitions = []
+        for connection, destination, priority in current.transitions():
+            nodes = []
+            for node in connection.get_nodes():
+                key = (node.node_type.name, node.argument, node.name)
+                nodes.append(node_indexes.setdefault(key, len(node_indexes)))
+            transitions.append([connection.get_id(), nodes, destination.get_id(), priority])
+            if destination not in visited:
+                visited.add(destination)
+                queue.append(destination)
+        states.append([current.get_id(), current.is_final(), transitions])
+    return {'initial': initial.get_id(), 'nodes': [list(key) for key in node_indexes], 'states': states}
+
+
+def matcher_from_dict(data: Dict[str, Any]) -> NormalizedMatcher:
+    nodes = [NormalizedNode(HistoryNodeType[node_type], argument, name) for node_type, argument, name in data['nodes']]
+    states: Dict[int, NormalizedState] = {}
+    for state_id, final, _ in data['states']:
+        states[state_id] = NormalizedState(state_id, final)
+    for state_id, _, transitions in data['states']:
+        state = states[state_id]
+        for connection_id, node_indexes, destination_id, priority in transitions:
+            connection = NormalizedConnection(connection_id, [nodes[i] for i in node_indexes])
+            state.add_connection(connection, states[destination_id], priority)
+    return NormalizedMatcher(states[data['initial']])
@@ -0,0 +1,67 @@
+from collections import deque
+from typing import Dict, Any
+
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, is_shared_connection
+
+
+class NormalizationStats:
+    """
+    Size of the matcher of one namespace before and after the normalization.
+    The size before is unknown (None) when the normalized matcher was not built in this process, e.g. loaded from
+    the grammar cache
+    """
+    connections_before: int | None
+    connections_after: int
+    states: int
+    max_fan_out: int
+    shared_states: int
+
+    def __init__(self,
+                 connections_before: int | None,
+                 connections_after: int,
+                 states: int,
+                 max_fan_out: int,
+                 shared_states: int):
+        self.connections_before = connections_before
+        self.connections_after = connections_after
+        self.states = states
+        self.max_fan_out = max_fan_out  # largest number of connections of one state
+        self.shared_states = shared_states
+
+    def __str__(self):
+        return (f'NormalizationStats(connections_before={self.connections_before}, '
+                f'connections_after={self.connections_after}, states={self.states}, '
+                f'max_fan_out={self.max_fan_out}, shared_states={self.shared_states})')
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'connections_before': self.connections_before,
+            'connections_after': self.connections_after,
+            'states': self.states,
+            'max_fan_out': self.max_fan_out,
+            'shared_states': self.shared_states
+        }
+
+
+def normalization_stats(matcher: NormalizedMatcher, connections_before: int | None = None) -> NormalizationStats:
+    """
+    :param connections_before: number of connections of the matcher before the normalization, if known
+    """
+    initial = matcher.initial_state()
+    visited = {initial}
+    queue = deque([initial])
+    shared = set()
+    connections = 0
+    max_fan_out = 0
+    while queue:
+        current = queue.popleft()
+        transitions = current.transitions()
+        connections += len(transitions)
+        max_fan_out = max(max_fan_out, len(transitions))
+        for connection, destination, _ in transitions:
+            if is_shared_connection(connection, destination):
+                shared.add(destination)
+            if destination not in visited:
+                visited.add(destination)
+                queue.append(destination)
+    return NormalizationStats(connections_before, connections, len(visited), max_fan_out, len(shared))
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Dict, Any
+
+from src.miles.core.normalized.matcher_serializer import matcher_to_dict, matcher_from_dict
+from src.miles.core.plugin.pipeline import namespace_max_fan_out
+from src.miles.core.plugin.plugin_definition import PluginDefinition
+from src.miles.core.plugin.plugin_structure import PluginStructure
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher
+
+"""
+Increment when the stored form or the way the matchers are built changes, so old cache files are not used
+"""
+CACHE_FORMAT_VERSION = 3
+
+
+def _grammar_description(definitions: List[PluginDefinition]) -> List[Any]:
+    plugins = []
+    for plugin in definitions:
+        namespaces = []
+        for namespace in plugin.namespaces():
+            namespaces.append({
+                'name': namespace.name,
+                'prefix': namespace.prefix,
+                'commands': [[command.name, command.syntax] for command in namespace.commands],
+                'priorities': namespace.priority_manager.as_dict(),
+                'minimize': namespace.minimize_matcher,
+                'max_fan_out': namespace_max_fan_out(namespace)
+            })
+        plugins.append({'name': plugin.name(), 'namespaces': namespaces})
+    return plugins
+
+
+def grammar_key(definitions: List[PluginDefinition]) -> str:
+    """
+    :return: hash of everything the matchers are built from: plugin and namespace names, prefixes,
+    command names and syntax, static priorities, minimization and the fan-out limit,
+    which depends on the priority strategy and on whether there are dynamic priorities
+    """
+    description = json.dumps([CACHE_FORMAT_VERSION, _grammar_description(definitions)], sort_keys=True)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+
+class CachedGrammar:
+    """
+    Matchers restored from the cache: the namespace matcher and the matchers of namespaces by plugin name
+    """
+
+    def __init__(self, namespace_matcher: NormalizedMatcher, plugins: Dict[str, Dict[str, NormalizedMatcher]]):
+        self.namespace_matcher = namespace_matcher
+        self.plugins = plugins
+
+    def plugin_matchers(self, plugin_name: str) -> Dict[str, NormalizedMatcher]:
+        return self.plugins.get(plugin_name, {})
+
+
+class GrammarCache:
+    """
+    Stores built normalized matchers in a directory, one JSON file per grammar key.
+    Executors, analyzers and dynamic priorities are not stored, they are taken from the register on every start
+    """
+
+    def __init__(self, directory: str | os.PathLike):
+        self._directory = Path(directory)
+
+    def path(self, key: str) -> Path:
+        return self._directory / f'grammar-{key}.json'
+
+    def load(self, key: str) -> CachedGrammar | None:
+        """
+        :return: cached matchers, or None if there is no usable cache file for the key
+        """
+        try:
+            with open(self.path(key), encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != CACHE_FORMAT_VERSION or data.get('key') != key:
+            return None
+        try:
+            namespace_matcher = matcher_from_dict(data['namespace_matcher'])
+            plugins = {plugin: {namespace: matcher_from_dict(matcher) for namespace, matcher in namespaces.items()}
+                       for plugin, namespaces in data['plugins'].items()}
+        except (KeyError, TypeError, ValueError):
+            return None
+        return CachedGrammar(namespace_matcher, plugins)
+
+    def store(self, key: str, namespace_matcher: NormalizedMatcher, plugin_structures: List[PluginStructure]):
+        """
+        Writes the cache file atomically, so other processes never read a half-written file
+        """
+        data = {
+            'version': CACHE_FORMAT_VERSION,
+            'key': key,
+            'namespace_matcher': matcher_to_dict(namespace_matcher),
+            'plugins': {structure.plugin_name: {namespace.name: matcher_to_dict(namespace.command_matcher)
+                                                for namespace in structure.namespaces}
+                        for structure in plugin_structures}
+        }
+        self._directory.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=self._directory, prefix='grammar-', suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
@@ -1,45 +1,82 @@
-from typing import List
+from typing import List, Dict, Tuple
 
 from src.miles.core.command.generic_command_processor import GenericCommandProcessor
 from src.miles.core.matcher.matcher_factory import MatcherFactory
-from src.miles.core.normalized.matcher_normalizer import normalize
-from src.miles.core.plugin.plugin_definition import PluginDefinition
+from src.miles.core.normalized.matcher_minimizer import minimize
+from src.miles.core.normalized.matcher_normalizer import normalize, count_connections, MAX_FAN_OUT
+from src.miles.core.normalized.normalization_stats import normalization_stats
+from src.miles.core.plugin.plugin_definition import PluginDefinition, NamespaceOfCommands
 from src.miles.core.plugin.plugin_structure import PluginStructure, NamespaceComponent
 from src.miles.core.priority.priority_assign import PriorityAssigner
+from src.miles.core.priority.priority_config import PriorityStrategy
 from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher
 from src.miles.shared.executor.command_executor import CommandExecutorsMap
 
 
-def create_normalized_matcher_from_definitions(plugin_definition: PluginDefinition) -> PluginStructure:
+def namespace_max_fan_out(namespace: NamespaceOfCommands) -> int | None:
+    """
+    The paths after a shared state are ordered at the shared state, not together with the other paths
+    of the state before it, so the fan-out is bounded only if all connections have the same priority
+    """
+    if namespace.priority_manager.get_strategy() != PriorityStrategy.ALL_DEFAULT:
+        return None
+    if namespace.dynamic_priorities.get_rules():
+        return None
+    return MAX_FAN_OUT
+
+
+def _build_namespace_matcher(namespace: NamespaceOfCommands,
+                             matcher_factory: MatcherFactory) -> Tuple[NormalizedMatcher, int]:
+    """
+    :return: normalized matcher of the namespace and the number of connections before the normalization
+    """
+    matcher = matcher_factory.empty_matcher()
+    for stored_command in namespace.commands:
+        command = GenericCommandProcessor().process(stored_command.syntax)
+        matcher_factory.add_command(matcher, command, stored_command.name)
+
+    normalized_matcher = normalize(matcher, namespace_max_fan_out(namespace))
+    if namespace.minimize_matcher:
+        normalized_matcher = minimize(normalized_matcher)
+    PriorityAssigner(namespace.priority_manager).assign_all(normalized_matcher)
+    return normalized_matcher, count_connections(matcher)
+
+
+def create_normalized_matcher_from_definitions(plugin_definition: PluginDefinition,
+                                               matchers: Dict[str, NormalizedMatcher] | None = None) \
+        -> PluginStructure:
+    """
+    :param matchers: already built matchers of namespaces by their names, for example, from the grammar cache.
+    Matchers of other namespaces are built from the command syntax
+    """
     plugin_name = plugin_definition.name()
+    if matchers is None:
+        matchers = {}
 
     matcher_factory = MatcherFactory()
     namespace_components: List[NamespaceComponent] = []
     for namespace in plugin_definition.namespaces():
-
-        priority_manager = namespace.priority_manager
-        dynamic_rule_set = namespace.dynamic_priorities
-        priority_assigner = PriorityAssigner(priority_manager)
-
-        matcher = matcher_factory.empty_matcher()
-        for stored_command in namespace.commands:
-            command = GenericCommandProcessor().process(stored_command.syntax)
-            matcher_factory.add_command(matcher, command, stored_command.name)
-
-        normalized_matcher = normalize(matcher)
+        normalized_matcher = matchers.get(namespace.name)
+        connections_before = None
+        if normalized_matcher is None:
+            normalized_matcher, connections_before = _build_namespace_matcher(namespace, matcher_factory)
 
         executor_map = CommandExecutorsMap()
         for stored_command in namespace.commands:
             executor_map.add(stored_command.name, stored_command.executor)
 
-        priority_assigner.assign_all(normalized_matcher)
         word_analyzer_factory = namespace.word_analyzer_factory
         namespace_component = NamespaceComponent(namespace.name,
                                                  normalized_matcher,
                                                  namespace.definition_set,
-                                                 dynamic_rule_set,
+                                                 namespace.dynamic_priorities,
                                                  executor_map,
-                                                 word_analyzer_factory, namespace.certainty_effect)
+                                                 word_analyzer_factory, namespace.certainty_effect,
+                                                 search_strategy=namespace.search_strategy,
+                                                 score_combination=namespace.score_combination,
+                                                 beam_width=namespace.beam_width,
+                                                 normalization_stats=normalization_stats(normalized_matcher,
+                                                                                         connections_before))
         namespace_components.append(namespace_component)
 
     return PluginStructure(plugin_name, namespace_components)
@@ -4,6 +4,7 @@ from src.miles.core.command.command import WordComponent
 from src.miles.core.matcher.comand_defintion import CommandNamespace
 from src.miles.core.priority.priority_manager import PriorityManager
 from src.miles.core.recognizer.matching_definition import MatchingDefinitionSet
+from src.miles.core.recognizer.search_strategy import SearchStrategy, ScoreCombination, DEFAULT_BEAM_WIDTH
 from src.miles.shared.certainty import CertaintyEffect
 from src.miles.shared.context_analyzer import WordContextAnalyzerFactory
 from src.miles.shared.executor.command_executor import CommandExecutor
@@ -26,7 +27,11 @@ class NamespaceOfCommands:
                  dynamic_priorities: DynamicPriorityRuleSet,
                  definition_set: MatchingDefinitionSet,
                  word_analyzer_factory: WordContextAnalyzerFactory,
-                 certainty_effect: CertaintyEffect):
+                 certainty_effect: CertaintyEffect,
+                 search_strategy: SearchStrategy = SearchStrategy.DEPTH_FIRST,
+                 score_combination: ScoreCombination = ScoreCombination.PRODUCT,
+                 beam_width: int = DEFAULT_BEAM_WIDTH,
+                 minimize_matcher: bool = False):
         self.name = name
         if prefix is None:
             prefix = ''
@@ -37,6 +42,10 @@ class NamespaceOfCommands:
         self.definition_set = definition_set
         self.word_analyzer_factory = word_analyzer_factory
         self.certainty_effect: CertaintyEffect = certainty_effect
+        self.search_strategy = search_strategy
+        self.score_combination = score_combination
+        self.beam_width = beam_width
+        self.minimize_matcher = minimize_matcher
 
     def as_command_namespace(self):
         words = self.prefix.split() if self.prefix.strip() else []
@@ -1,6 +1,9 @@
 from typing import List
 
+from src.miles.core.normalized.normalization_stats import NormalizationStats
+from src.miles.core.recognizer.compiled_matcher import CompiledMatcher, compile_matcher
 from src.miles.core.recognizer.matching_definition import MatchingDefinitionSet
+from src.miles.core.recognizer.search_strategy import SearchStrategy, ScoreCombination, DEFAULT_BEAM_WIDTH
 from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher
 from src.miles.shared.certainty import CertaintyEffect
 from src.miles.shared.context_analyzer import WordContextAnalyzerFactory
@@ -16,14 +19,26 @@ class NamespaceComponent:
                  dynamic_ruleset: DynamicPriorityRuleSet,
                  executors_map: CommandExecutorsMap,
                  word_analyzer_factory: WordContextAnalyzerFactory,
-                 certainty_effect: CertaintyEffect):
+                 certainty_effect: CertaintyEffect,
+                 compiled_matcher: CompiledMatcher | None = None,
+                 search_strategy: SearchStrategy = SearchStrategy.DEPTH_FIRST,
+                 score_combination: ScoreCombination = ScoreCombination.PRODUCT,
+                 beam_width: int = DEFAULT_BEAM_WIDTH,
+                 normalization_stats: NormalizationStats | None = None):
         self.name = name
         self.executors_map = executors_map
         self.command_matcher = command_mather
+        if compiled_matcher is None:
+            compiled_matcher = compile_matcher(command_mather)
+        self.compiled_matcher = compiled_matcher
         self.definitions = definitions
         self.dynamic_priorities = dynamic_ruleset
         self.word_analyzer_factory = word_analyzer_factory
         self.certainty_effect = certainty_effect
+        self.search_strategy = search_strategy
+        self.score_combination = score_combination
+        self.beam_width = beam_width
+        self.normalization_stats = normalization_stats
 
 
 class PluginStructure:
@@ -62,7 +62,11 @@ def _map_namespace(namespace: NamespaceInitializer) -> NamespaceOfCommands:
         definition_set=definition_set,
         dynamic_priorities=dynamic_ruleset,
         word_analyzer_factory=word_analyzer_factory,
-        certainty_effect=certainty
+        certainty_effect=certainty,
+        search_strategy=namespace.get_search_strategy(),
+        score_combination=namespace.get_score_combination(),
+        beam_width=namespace.get_beam_width(),
+        minimize_matcher=namespace.get_minimize_matcher()
     )
 
 
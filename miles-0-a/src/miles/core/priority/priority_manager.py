@@ -1,4 +1,4 @@
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Any
 
 from src.miles.core.priority.priority_config import PriorityStrategy
 from src.miles.core.recognizer.normalized_matcher import HistoryNodeType, NormalizedNode
@@ -85,3 +85,18 @@ class PriorityManager:
 
     def default_priority(self):
         return self._def_priority
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        :return: everything that defines the priorities of nodes, in a JSON compatible form
+        """
+        return {
+            'strategy': self._strategy.name,
+            'default': self._def_priority,
+            'word': self._def_word,
+            'matching': self._def_matching,
+            'automatic': self._def_automatic,
+            'nodes': sorted([node_type.name, str(argument), priority]
+                            for (node_type, argument), priority in self._node_priorities.items()),
+            'named': sorted([str(name), priority] for name, priority in self._named_priorities.items())
+        }
@@ -0,0 +1,53 @@
+from typing import Dict, List, Tuple, Hashable, Any
+
+
+class AnalyzerVariant:
+    """
+    Single exit of the analyzer: the pointer that reaches it is moved to the position,
+    remembers the consumed tokens and the result, and continues with the certainty
+    """
+    __slots__ = ('position', 'consumed', 'result', 'certainty')
+
+    def __init__(self, position: int, consumed: List[str], result: Any, certainty: float):
+        self.position = position
+        self.consumed = consumed
+        self.result = result
+        self.certainty = certainty
+
+
+class AnalyzerMemo:
+    """
+    Variants of pure analyzers (see GenericContextAnalyzer.is_pure) remembered during one recognition.
+    The key is (matching name, node name, position, flags fingerprint, stack fingerprint),
+    analyzers see the node name, so named uses of a matching do not share variants
+    """
+    _variants: Dict[Tuple[Hashable, ...], List[AnalyzerVariant]]
+    _hits: int
+    _misses: int
+
+    def __init__(self):
+        self._variants = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> List[AnalyzerVariant] | None:
+        variants = self._variants.get(key)
+        if variants is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return variants
+
+    def put(self, key: Tuple[Hashable, ...], variants: List[AnalyzerVariant]):
+        self._variants[key] = variants
+
+    def hits(self) -> int:
+        return self._hits
+
+    def misses(self) -> int:
+        return self._misses
+
+    def clear(self):
+        self._variants = {}
+        self._hits = 0
+        self._misses = 0
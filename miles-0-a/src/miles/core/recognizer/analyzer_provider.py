@@ -2,17 +2,34 @@ from src.miles.core.recognizer.matching_definition import MatchingDefinitionSet
 from src.miles.core.recognizer.normalized_matcher import HistoryNodeType
 from src.miles.shared.context_analyzer import (AutomaticContextAnalyzer,
                                                GenericContextAnalyzer, WordContextAnalyzerFactory)
+from src.miles.shared.analyzer_profiler import AnalyzerProfiler
 
 
 class AnalyzerProvider:
-    def __init__(self, definitions: MatchingDefinitionSet, word_analyzer_factory: WordContextAnalyzerFactory):
+    def __init__(self,
+                 definitions: MatchingDefinitionSet,
+                 word_analyzer_factory: WordContextAnalyzerFactory,
+                 profiler: AnalyzerProfiler | None = None):
+        """
+        :param profiler: if given, word and matching analyzers are wrapped to record their calls
+        """
         self.definitions = definitions
         self.word_analyzer_factory = word_analyzer_factory
+        self.profiler = profiler
 
     def provide_analyzer(self, node_type: HistoryNodeType, argument: str | None) -> GenericContextAnalyzer:
         if node_type == HistoryNodeType.AUTOMATIC:
             return AutomaticContextAnalyzer()
         if node_type == HistoryNodeType.MATCHING:
-            return self.definitions.get_matching(argument).analyzer()
+            analyzer = self.definitions.get_matching(argument).analyzer()
+            if self.profiler is not None:
+                return self.profiler.wrap('matching', argument, analyzer)
+            return analyzer
         if node_type == HistoryNodeType.WORD:
-            return self.word_analyzer_factory.build(argument)
+            analyzer = self.word_analyzer_factory.build(argument)
+            if self.profiler is not None:
+                return self.profiler.wrap('word', argument, analyzer)
+            return analyzer
+
+    def exact_words(self) -> bool:
+        return self.word_analyzer_factory.exact_words()
@@ -0,0 +1,244 @@
+from collections import deque
+from typing import List, Tuple, Dict, Sequence
+
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedState, NormalizedConnection, \
+    NormalizedNode, HistoryNodeType, is_shared_connection
+
+"""
+Compiled matcher is a frozen form of the normalized matcher, that is used by the recognizer.
+Normalized states and connections are replaced by integer indexes:
+    - every state has an index in the range [0, number of states);
+    - transitions of all states are stored in the flat arrays (destinations, priorities, nodes, connections);
+    - transitions of a state occupy the range [offset, next offset) of these arrays.
+All lookups are O(1) and no lists are copied during recognition.
+Every state also has a first-token dispatch index: transitions that start with a word are grouped by the lowercase word,
+all other transitions (matching, automatic-only, empty) are always candidates.
+Every state also keeps its expectations: the first node of every transition that consumes tokens (word or matching),
+used to complete commands.
+Transitions to shared states (see normalize) are marked, the recognizer passes such states in the same step
+The matcher must be compiled after the priorities are assigned, further changes of the normalized matcher are not visible
+"""
+
+
+class CompiledState:
+    __slots__ = ('_index', '_id', '_final', '_first', '_last', '_ordered', '_by_word', '_others', '_rank',
+                 '_expected')
+
+    def __init__(self,
+                 index: int,
+                 state_id: int,
+                 final: bool,
+                 first: int,
+                 last: int,
+                 ordered: Tuple[int, ...],
+                 by_word: Dict[str, Tuple[int, ...]],
+                 others: Tuple[int, ...],
+                 rank: Tuple[int, ...],
+                 expected: Tuple[Tuple[int, int | None], ...]):
+        self._index = index
+        self._id = state_id
+        self._final = final
+        self._first = first
+        self._last = last
+        self._ordered = ordered
+        self._by_word = by_word
+        self._others = others
+        self._rank = rank
+        self._expected = expected
+
+    def __str__(self):
+        return f'State {self._id}'
+
+    def index(self) -> int:
+        return self._index
+
+    def get_id(self) -> int:
+        return self._id
+
+    def is_final(self) -> bool:
+        return self._final
+
+    def transitions(self) -> range:
+        return range(self._first, self._last)
+
+    def ordered_transitions(self) -> Tuple[int, ...]:
+        """
+        :return: transitions of the state sorted by static priority, highest first
+        """
+        return self._ordered
+
+    def transition_count(self) -> int:
+        return self._last - self._first
+
+    def candidates(self, token: str | None) -> Sequence[int]:
+        """
+        Transitions that can match the token if words are compared exactly, in the order of ordered_transitions
+        :param token: current token or None at the end of input
+        """
+        if token is None:
+            return self._others
+        words = self._by_word.get(token.lower())
+        if words is None:
+            return self._others
+        if not self._others:
+            return words
+        return sorted(words + self._others, key=self._rank.__getitem__)
+
+    def expectations(self) -> Tuple[Tuple[int, int | None], ...]:
+        """
+        :return: pairs (transition, index of its first word or matching node) in the order of ordered_transitions,
+        the index is None if the transition does not consume tokens
+        """
+        return self._expected
+
+
+class CompiledMatcher:
+    _states: Tuple[CompiledState, ...]
+    _offsets: Tuple[int, ...]
+    _destinations: Tuple[int, ...]
+    _priorities: Tuple[int, ...]
+    _nodes: Tuple[Tuple[NormalizedNode, ...], ...]
+    _connections: Tuple[NormalizedConnection, ...]
+    _shared: Tuple[bool, ...]
+
+    def __init__(self,
+                 states: Tuple[CompiledState, ...],
+                 offsets: Tuple[int, ...],
+                 destinations: Tuple[int, ...],
+                 priorities: Tuple[int, ...],
+                 nodes: Tuple[Tuple[NormalizedNode, ...], ...],
+                 connections: Tuple[NormalizedConnection, ...],
+                 shared: Tuple[bool, ...] | None = None):
+        self._states = states
+        self._offsets = offsets
+        self._destinations = destinations
+        self._priorities = priorities
+        self._nodes = nodes
+        self._connections = connections
+        if shared is None:
+            shared = (False,) * len(destinations)
+        self._shared = shared
+
+    def initial_state(self) -> CompiledState:
+        return self._states[0]
+
+    def state(self, index: int) -> CompiledState:
+        return self._states[index]
+
+    def states(self) -> Tuple[CompiledState, ...]:
+        return self._states
+
+    def size(self) -> int:
+        return len(self._states)
+
+    def transition_count(self) -> int:
+        return len(self._destinations)
+
+    def nodes(self, transition: int) -> Tuple[NormalizedNode, ...]:
+        return self._nodes[transition]
+
+    def destination(self, transition: int) -> CompiledState:
+        return self._states[self._destinations[transition]]
+
+    def priority(self, transition: int) -> int:
+        return self._priorities[transition]
+
+    def connection(self, transition: int) -> NormalizedConnection:
+        return self._connections[transition]
+
+    def is_shared(self, transition: int) -> bool:
+        """
+        :return: True if the transition leads to a shared state
+        """
+        return self._shared[transition]
+
+
+def _reachable_states(matcher: NormalizedMatcher) -> List[NormalizedState]:
+    initial = matcher.initial_state()
+    visited = {initial}
+    ordered = [initial]
+    queue = deque([initial])
+    while queue:
+        current = queue.popleft()
+        for _, dest, _ in current.transitions():
+            if dest not in visited:
+                visited.add(dest)
+                ordered.append(dest)
+                queue.append(dest)
+    return ordered
+
+
+def _first_word(nodes: Tuple[NormalizedNode, ...]) -> str | None:
+    for node in nodes:
+        if node.node_type == HistoryNodeType.WORD:
+            return node.argument.lower()
+        if node.node_type != HistoryNodeType.AUTOMATIC:
+            return None
+    return None
+
+
+def _first_consuming(nodes: Tuple[NormalizedNode, ...]) -> int | None:
+    for i, node in enumerate(nodes):
+        if node.node_type != HistoryNodeType.AUTOMATIC:
+            return i
+    return None
+
+
+def _dispatch_index(ordered: Tuple[int, ...],
+                    nodes: List[Tuple[NormalizedNode, ...]]) -> Tuple[Dict[str, Tuple[int, ...]], Tuple[int, ...]]:
+    by_word: Dict[str, List[int]] = {}
+    others = []
+    for t in ordered:
+        word = _first_word(nodes[t])
+        if word is None:
+            others.append(t)
+        else:
+            by_word.setdefault(word, []).append(t)
+    return {word: tuple(lst) for word, lst in by_word.items()}, tuple(others)
+
+
+def compile_matcher(matcher: NormalizedMatcher) -> CompiledMatcher:
+    normalized_states = _reachable_states(matcher)
+    index_of_state: Dict[int, int] = {}
+    for i, state in enumerate(normalized_states):
+        index_of_state[state.get_id()] = i
+
+    offsets = [0]
+    destinations = []
+    priorities = []
+    nodes = []
+    connections = []
+    shared = []
+    for state in normalized_states:
+        for connection, destination, priority in state.transitions():
+            destinations.append(index_of_state[destination.get_id()])
+            priorities.append(priority)
+            nodes.append(tuple(connection.get_nodes()))
+            connections.append(connection)
+            shared.append(is_shared_connection(connection, destination))
+        offsets.append(len(destinations))
+
+    all_ordered = []
+    rank = [0] * len(destinations)
+    for i in range(len(normalized_states)):
+        ordered = tuple(sorted(range(offsets[i], offsets[i + 1]), key=lambda t: priorities[t], reverse=True))
+        for r, t in enumerate(ordered):
+            rank[t] = r
+        all_ordered.append(ordered)
+    rank = tuple(rank)
+
+    states = []
+    for i, state in enumerate(normalized_states):
+        ordered = all_ordered[i]
+        by_word, others = _dispatch_index(ordered, nodes)
+        expected = tuple((t, _first_consuming(nodes[t])) for t in ordered)
+        states.append(CompiledState(i, state.get_id(), state.is_final(), offsets[i], offsets[i + 1], ordered,
+                                    by_word, others, rank, expected))
+
+    return CompiledMatcher(states=tuple(states),
+                           offsets=tuple(offsets),
+                           destinations=tuple(destinations),
+                           priorities=tuple(priorities),
+                           nodes=tuple(nodes),
+                           connections=tuple(connections),
+                           shared=tuple(shared))
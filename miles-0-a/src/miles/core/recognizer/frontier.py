@@ -0,0 +1,236 @@
+import heapq
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Set, Tuple, List, Deque, Dict
+
+from src.miles.core.recognizer.recognizer_pointer import RecPointer
+from src.miles.core.recognizer.search_strategy import SearchStrategy, ScoreCombination, DEFAULT_BEAM_WIDTH
+
+
+class DynamicCache:
+    _cache: Set[Tuple[int, int]]
+
+    def __init__(self):
+        self._cache = set()
+
+    def _pair(self, pointer: RecPointer):
+        state_id = pointer.get_state().get_id()
+        position = pointer.get_position()
+        return state_id, position
+
+    def add_to_cache(self, pointer: RecPointer):
+        self._cache.add(self._pair(pointer))
+
+    def is_in_cache(self, pointer: RecPointer):
+        return self._pair(pointer) in self._cache
+
+    def __contains__(self, item):
+        if not isinstance(item, RecPointer):
+            return False
+        return self.is_in_cache(item)
+
+    def clear(self):
+        self._cache = set()
+
+
+class RecognitionFrontier(ABC):
+    """
+    Pointers that are waiting to be expanded by the command recognizer.
+    Every (state, position) pair is expanded at most once
+    """
+
+    @abstractmethod
+    def push_all(self, pointers: List[RecPointer]) -> None:
+        """
+        Adds pointers produced by one expansion, in the order defined by the certainty effect
+        """
+        pass
+
+    @abstractmethod
+    def pop(self) -> RecPointer | None:
+        """
+        :return: next pointer to expand, or None if there is nothing to expand
+        """
+        pass
+
+    @abstractmethod
+    def size(self) -> int:
+        """
+        :return: number of waiting entries, including the ones that are dropped when popped
+        """
+        pass
+
+    def pruned(self) -> int:
+        """
+        :return: number of pointers dropped without expansion
+        """
+        return 0
+
+    def deduplicated(self) -> int:
+        """
+        :return: number of pointers dropped because their state and position were already reached
+        """
+        return 0
+
+
+class DepthFirstFrontier(RecognitionFrontier):
+    _pointers: Deque[RecPointer]
+
+    def __init__(self):
+        self._pointers = deque()
+        self._cache = DynamicCache()
+        self._deduplicated = 0
+
+    def push_all(self, pointers: List[RecPointer]) -> None:
+        new_items: List[RecPointer] = []
+        for p in pointers:
+            if p not in self._cache:
+                new_items.append(p)
+        self._deduplicated += len(pointers) - len(new_items)
+
+        for item in new_items:
+            self._cache.add_to_cache(item)
+
+        self._pointers.extendleft(new_items)
+
+    def pop(self) -> RecPointer | None:
+        if not self._pointers:
+            return None
+        return self._pointers.popleft()
+
+    def size(self) -> int:
+        return len(self._pointers)
+
+    def deduplicated(self) -> int:
+        return self._deduplicated
+
+
+class BestFirstFrontier(RecognitionFrontier):
+    """
+    Orders pointers by the path score, then by the path priority.
+    Equal pointers are taken from the latest expansion first, in the order they were pushed, so with equal scores
+    the search goes deep like the depth first one.
+    Scores never increase along the path, so the first popped finished pointer has the best score
+    """
+    _heap: List[Tuple[float, int, int, int, RecPointer]]
+
+    def __init__(self, combination: ScoreCombination):
+        self._combination = combination
+        self._heap = []
+        self._expanded = DynamicCache()
+        self._generation = 0
+        self._deduplicated = 0
+
+    def push_all(self, pointers: List[RecPointer]) -> None:
+        self._generation += 1
+        for i, p in enumerate(pointers):
+            if p in self._expanded:
+                self._deduplicated += 1
+                continue
+            key = (-p.score(self._combination), -p.path_priority(), -self._generation, i, p)
+            heapq.heappush(self._heap, key)
+
+    def pop(self) -> RecPointer | None:
+        while self._heap:
+            pointer = heapq.heappop(self._heap)[-1]
+            if pointer in self._expanded:
+                self._deduplicated += 1
+                continue
+            self._expanded.add_to_cache(pointer)
+            return pointer
+        return None
+
+    def size(self) -> int:
+        return len(self._heap)
+
+    def deduplicated(self) -> int:
+        return self._deduplicated
+
+
+class BeamFrontier(RecognitionFrontier):
+    """
+    Expands pointers position by position: the lowest position goes first, pointers of the same position
+    are ordered like in the best first frontier.
+    At most width pointers enter every position from the previous ones, all other pointers that reach the position
+    are pruned. Pointers that move without consuming tokens stay in the beam of their origin
+    """
+    _layers: Dict[int, List[Tuple[float, int, int, int, bool, RecPointer]]]
+    _positions: List[int]
+    _entered: Dict[int, int]
+
+    def __init__(self, combination: ScoreCombination, width: int):
+        if width < 1:
+            raise ValueError(f'Beam width must be positive, got {width}')
+        self._combination = combination
+        self._width = width
+        self._layers = {}
+        self._positions = []
+        self._entered = {}
+        self._expanded = DynamicCache()
+        self._current = None
+        self._generation = 0
+        self._pruned = 0
+        self._deduplicated = 0
+        self._size = 0
+
+    def push_all(self, pointers: List[RecPointer]) -> None:
+        self._generation += 1
+        for i, p in enumerate(pointers):
+            if p in self._expanded:
+                self._deduplicated += 1
+                continue
+            position = p.get_position()
+            entry = position != self._current
+            layer = self._layers.get(position)
+            if layer is None:
+                layer = []
+                self._layers[position] = layer
+                heapq.heappush(self._positions, position)
+            key = (-p.score(self._combination), -p.path_priority(), -self._generation, i, entry, p)
+            heapq.heappush(layer, key)
+            self._size += 1
+
+    def pop(self) -> RecPointer | None:
+        while self._positions:
+            position = self._positions[0]
+            layer = self._layers[position]
+            if not layer:
+                del self._layers[position]
+                heapq.heappop(self._positions)
+                continue
+            _, _, _, _, entry, pointer = heapq.heappop(layer)
+            self._size -= 1
+            if pointer in self._expanded:
+                self._deduplicated += 1
+                continue
+            if entry:
+                entered = self._entered.get(position, 0)
+                if entered >= self._width:
+                    self._pruned += 1
+                    continue
+                self._entered[position] = entered + 1
+            self._expanded.add_to_cache(pointer)
+            self._current = position
+            return pointer
+        return None
+
+    def size(self) -> int:
+        return self._size
+
+    def pruned(self) -> int:
+        return self._pruned
+
+    def deduplicated(self) -> int:
+        return self._deduplicated
+
+
+def create_frontier(strategy: SearchStrategy,
+                    combination: ScoreCombination,
+                    beam_width: int = DEFAULT_BEAM_WIDTH) -> RecognitionFrontier:
+    if strategy == SearchStrategy.DEPTH_FIRST:
+        return DepthFirstFrontier()
+    if strategy == SearchStrategy.BEST_FIRST:
+        return BestFirstFrontier(combination)
+    if strategy == SearchStrategy.BEAM:
+        return BeamFrontier(combination, beam_width)
+    raise ValueError(f'Unexpected search strategy: {strategy.name}')
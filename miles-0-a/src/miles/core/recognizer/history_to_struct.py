@@ -1,4 +1,5 @@
 import re
+from collections import deque
 from typing import List
 
 from src.miles.core.normalized.history import NorHistory
@@ -40,10 +41,10 @@ class StructFactory:
             value=None
         )
         stack = [root_node]
-        item_queue = list(items)
+        item_queue = deque(items)
 
         while item_queue:
-            item = item_queue.pop(0)
+            item = item_queue.popleft()
             node = item.node
 
             included_tokens = item.included
@@ -117,7 +118,7 @@ class StructFactory:
                     if not item_queue:
                         raise ValueError(f'Expected to have choice option selected, but got end of input')
 
-                    choice_number_item = item_queue.pop(0)
+                    choice_number_item = item_queue.popleft()
                     number_argument = choice_number_item.node.argument
                     number = self._extract_option_value(number_argument)
                     struct = CommandNode(
@@ -1,8 +1,7 @@
 from enum import Enum
-from typing import List, Self
+from typing import List, Self, Tuple, Dict
 
 from src.miles.utils.decorators import auto_str
-from src.miles.utils.list_utils import index_of
 
 
 class HistoryNodeType(Enum):
@@ -63,6 +62,7 @@ class NormalizedState:
     _priorities: List[int]
     _destinations: List[Self]
     _final: bool
+    _indexes: Dict[int, int]
 
     def __init__(self, _id: int, final: bool):
         self._id = _id
@@ -70,6 +70,7 @@ class NormalizedState:
         self._final = final
         self._priorities = []
         self._destinations = []
+        self._indexes = {}
 
     def __hash__(self):
         return hash(self._id)
@@ -83,6 +84,7 @@ class NormalizedState:
         return f'State {self._id}'
 
     def add_connection(self, connection: NormalizedConnection, destination: Self, priority: int = 0):
+        self._indexes.setdefault(connection.get_id(), len(self._connections))
         self._connections.append(connection)
         self._destinations.append(destination)
         self._priorities.append(priority)
@@ -90,8 +92,14 @@ class NormalizedState:
     def all_connections(self) -> List[NormalizedConnection]:
         return list(self._connections)
 
+    def transitions(self) -> List[Tuple[NormalizedConnection, Self, int]]:
+        """
+        :return: all outgoing connections together with their destinations and priorities
+        """
+        return list(zip(self._connections, self._destinations, self._priorities))
+
     def _connection_index(self, connection: NormalizedConnection) -> int:
-        return index_of(self._connections, connection)
+        return self._indexes.get(connection.get_id(), -1)
 
     def get_destination(self, connection: NormalizedConnection) -> Self | None:
         index = self._connection_index(connection)
@@ -118,6 +126,16 @@ class NormalizedState:
         self._priorities[index] = priority
 
 
+def is_shared_connection(connection: NormalizedConnection, destination: NormalizedState) -> bool:
+    """
+    :return: True if the connection leads to a shared state of the normalized matcher:
+    it has only automatic nodes, and it does not end in a final state
+    """
+    if destination.is_final() or connection.empty():
+        return False
+    return all(node.node_type == HistoryNodeType.AUTOMATIC for node in connection.get_nodes())
+
+
 class NormalizedMatcher:
     _initial: NormalizedState
 
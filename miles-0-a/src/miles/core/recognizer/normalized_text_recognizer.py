@@ -1,22 +1,30 @@
-from collections import deque
+import time
 from random import shuffle
-from typing import List, Set, Tuple, Deque
+from typing import List, Sequence, Dict, Tuple
 
 from src.miles.core.plugin.plugin_structure import NamespaceComponent
+from src.miles.core.recognizer.analyzer_memo import AnalyzerMemo
 from src.miles.core.recognizer.analyzer_provider import AnalyzerProvider
 from src.miles.core.recognizer.history_to_struct import StructFactory
 from src.miles.core.recognizer.matching_definition import MatchingDefinitionSet
-from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedConnection
+from src.miles.core.recognizer.compiled_matcher import CompiledMatcher
+from src.miles.core.recognizer.normalized_matcher import NormalizedNode, HistoryNodeType
+from src.miles.core.recognizer.frontier import DynamicCache, RecognitionFrontier, create_frontier
 from src.miles.core.recognizer.optimization import RecOptimizationStrategy
-from src.miles.core.recognizer.recognizer_error import RecognizerError
+from src.miles.core.recognizer.recognizer_error import RecognizerError, RecognizerBudgetExceeded, RecognitionCancelled
 from src.miles.core.recognizer.recognizer_pointer import RecPointer
 from src.miles.core.recognizer.recognizer_stack import RecognizerStack
+from src.miles.core.recognizer.search_strategy import SearchStrategy, ScoreCombination, DEFAULT_BEAM_WIDTH
+from src.miles.shared.analyzer_profiler import AnalyzerProfiler
 from src.miles.shared.certainty import CertaintyDecision, CertaintyItem, CertaintyEffect
 from src.miles.shared.context.data_holder import TextDataHolder
 from src.miles.shared.context.flags import Flags
+from src.miles.shared.context.token_buffer import TokenBuffer
 from src.miles.shared.context_analyzer import GenericContextAnalyzer, DefaultWordContextAnalyzerFactory
 from src.miles.shared.executor.command_structure import NamespaceStructure, CommandStructure
 from src.miles.shared.priority.dynamic_priority import DynamicPriorityRuleSet
+from src.miles.shared.recognition_budget import RecognitionBudget
+from src.miles.shared.recognition_stats import RecognitionStats
 from src.miles.utils.decorators import auto_str
 
 
@@ -40,30 +48,57 @@ def _optimized_route(next_gen_pointers: List[RecPointer], analyzer: GenericConte
         raise ValueError(f'Unexpected optimization strategy: {optimization_strategy.name}')
 
 
-class _DynamicCache:
-    _cache: Set[Tuple[int, int]]
-
-    def __init__(self):
-        self._cache = set()
-
-    def _pair(self, pointer: RecPointer):
-        state_id = pointer.get_state().get_id()
-        position = pointer.get_position()
-        return state_id, position
-
-    def add_to_cache(self, pointer: RecPointer):
-        self._cache.add(self._pair(pointer))
-
-    def is_in_cache(self, pointer: RecPointer):
-        return self._pair(pointer) in self._cache
-
-    def __contains__(self, item):
-        if not isinstance(item, RecPointer):
-            return False
-        return self.is_in_cache(item)
-
-    def clear(self):
-        self._cache = set()
+def _current_token(pointer: RecPointer, input_data: TextDataHolder) -> str | None:
+    position = pointer.get_position()
+    if position < input_data.size():
+        return input_data[position]
+    return None
+
+
+def _ordered_transitions(matcher: CompiledMatcher,
+                         pointer: RecPointer,
+                         input_data: TextDataHolder,
+                         dynamic_priorities: DynamicPriorityRuleSet,
+                         dispatch: bool,
+                         priorities: Dict[int, int] | None = None,
+                         stats: RecognitionStats | None = None) -> Sequence[int]:
+    """
+    :param priorities: if given, receives the dynamic priorities of the transitions
+    :param stats: if given, counts the evaluations of the dynamic rules
+    """
+    state = pointer.get_state()
+    if dispatch:
+        transitions = state.candidates(_current_token(pointer, input_data))
+    else:
+        transitions = state.ordered_transitions()
+
+    rules = dynamic_priorities.get_rules()
+    if not rules:
+        return transitions
+
+    transitions = sorted(transitions)  # declaration order for equal priorities
+    priority_map = {}
+    for t in transitions:
+        priority = matcher.priority(t)
+        connection_origin = matcher.nodes(t)[0]
+        for d in rules:
+            context = input_data.dynamic_priority_context(
+                start_at=pointer.get_position(),
+                flags=pointer.flags(),
+                connection_type=connection_origin.node_type,
+                connection_arg=connection_origin.argument,
+                connection_name=connection_origin.name,
+                priority=priority
+            )
+            if d.is_applicable(context):
+                priority = d.priority(context)
+        priority_map[t] = priority
+        if stats is not None:
+            stats.rule_evaluations += len(rules)
+
+    if priorities is not None:
+        priorities.update(priority_map)
+    return sorted(transitions, key=lambda x: priority_map[x], reverse=True)
 
 
 @auto_str
@@ -72,27 +107,35 @@ class _ExtendedCommandReader:
     _reached_pointers: List[RecPointer]
     _failed_max_pointer: RecPointer | None
     _analyzers: AnalyzerProvider
-    _cache: _DynamicCache
+    _cache: DynamicCache
     _dynamic_priorities: DynamicPriorityRuleSet
     _certainty_effect: CertaintyEffect
 
     def __init__(self,
-                 matcher: NormalizedMatcher,
+                 matcher: CompiledMatcher,
                  input_data: TextDataHolder,
                  start_from: int,
                  analyzer_provider: AnalyzerProvider,
                  dynamic_priorities: DynamicPriorityRuleSet | None,
                  certainty_effect: CertaintyEffect,
                  stack: RecognizerStack,
-                 flags: Flags):
+                 flags: Flags,
+                 budget: RecognitionBudget | None = None):
+        """
+        :param budget: budget of the command recognition that runs the analyzer of this nested recognition,
+        the reader counts its expansions in it, stops when it runs out
+        and raises RecognitionCancelled when it is cancelled
+        """
         self._matcher = matcher
+        self._budget = budget
         self._input_data = input_data
         self._certainty_effect = certainty_effect
         self._pointers = []
         self._reached_pointers = []
         self._failed_max_pointer = None
         self._start_from = start_from
-        self._cache = _DynamicCache()
+        self._cache = DynamicCache()
+        self._memo = AnalyzerMemo()
         self._initial_stack = stack
         self._initial_flags = flags
 
@@ -108,6 +151,7 @@ class _ExtendedCommandReader:
         self._pointers = []
         self._reached_pointers = []
         self._cache.clear()
+        self._memo.clear()
         self._failed_max_pointer = None
         self._recognize_tokens()
         result = list(self._reached_pointers)
@@ -128,6 +172,12 @@ class _ExtendedCommandReader:
 
     def _run_token_recognition_loop(self):
         while len(self._pointers) > 0:
+            if self._budget is not None:
+                if self._budget.is_cancelled():
+                    raise RecognitionCancelled()
+                if self._budget.is_exceeded():
+                    break  # the command reader stops before its next expansion
+                self._budget.add_expansion()
             first = self._pointers.pop(0)
             advanced = self._advance_pointer(first)
             self._add_to_pointers(advanced)
@@ -153,19 +203,18 @@ class _ExtendedCommandReader:
         pointers_dict = {}
         decision = CertaintyDecision()
         category_count = 0
-        for connection in ordered_connections:
-            new_pointers = self._go_through_connection(pointer, connection)
-
-            if len(new_pointers) > 0:
-                category_count += 1
-                items = []
-                for np in new_pointers:
-                    pointers_count += 1
-                    pointers_dict[pointers_count] = np
-                    item = CertaintyItem(pointers_count, category_count, np.certainty(), np.flags().copy())
-                    items.append(item)
-                decision.add(items)
-                next_gen_pointers.extend(new_pointers)
+        for transition in ordered_connections:
+            for new_pointers in self._pointer_groups(pointer, transition):
+                if len(new_pointers) > 0:
+                    category_count += 1
+                    items = []
+                    for np in new_pointers:
+                        pointers_count += 1
+                        pointers_dict[pointers_count] = np
+                        item = CertaintyItem(pointers_count, category_count, np.certainty(), np.flags().copy())
+                        items.append(item)
+                    decision.add(items)
+                    next_gen_pointers.extend(new_pointers)
 
         target_order = self._certainty_effect.apply(decision)
         result = []
@@ -175,83 +224,97 @@ class _ExtendedCommandReader:
 
         return result
 
-    def _go_through_connection(self, pointer: RecPointer, connection: NormalizedConnection) -> List[RecPointer]:
-        nodes = connection.get_nodes()
+    def _pointer_groups(self, pointer: RecPointer, transition: int) -> List[List[RecPointer]]:
+        """
+        :return: pointers produced by the transition, grouped by the transitions they went through.
+        A shared state is passed at once, its transitions continue the transition to it
+        """
+        if not self._matcher.is_shared(transition):
+            return [self._go_through_connection(pointer, transition)]
+        groups = []
+        for p in self._go_through_connection(pointer, transition):
+            for t in self._all_connections_ordered(p):
+                groups.extend(self._pointer_groups(p, t))
+        return groups
+
+    def _go_through_connection(self, pointer: RecPointer, transition: int) -> List[RecPointer]:
+        nodes = self._matcher.nodes(transition)
         previous_generation = [pointer]
 
         for node in nodes:
             this_generation = []
             for p in previous_generation:
                 analyzer = self._analyzers.provide_analyzer(node.node_type, node.argument)
-                advance = p.advance_with_analyzer(node, analyzer)
+                advance = p.advance_with_analyzer(node, analyzer, self._memo)
                 advance = _optimized_route(advance, analyzer)
 
                 if len(advance) == 0:  # failed pointer
-                    position = p.get_position()
-                    prev_max = self._failed_max_pointer.get_position()
-                    if position > prev_max:
-                        self._failed_max_pointer = p
+                    self._update_failed_max(p)
 
                 this_generation.extend(advance)
             previous_generation = this_generation
 
-        destination = pointer.get_state().get_destination(connection)
+        destination = self._matcher.destination(transition)
         result = []
         for p in previous_generation:
             r = p.move_to(destination)
             result.append(r)
         return result
 
-    def _all_connections_ordered(self, pointer: RecPointer) -> List[NormalizedConnection]:
-        state = pointer.get_state()
-        connections_from_state = state.all_connections()
-
-        priority_map = {}
-        for c in connections_from_state:
-            priority = state.get_priority(c)
-            connection_origin = c.get_nodes()[0]
-            for d in self._dynamic_priorities.get_rules():
-                context = self._input_data.dynamic_priority_context(
-                    start_at=pointer.get_position(),
-                    flags=pointer.flags(),
-                    connection_type=connection_origin.node_type,
-                    connection_arg=connection_origin.argument,
-                    connection_name=connection_origin.name,
-                    priority=priority
-                )
-                if d.is_applicable(context):
-                    priority = d.priority(context)
-            priority_map[c] = priority
-
-        return sorted(connections_from_state, key=lambda x: priority_map[x], reverse=True)
+    def _all_connections_ordered(self, pointer: RecPointer) -> Sequence[int]:
+        transitions = _ordered_transitions(self._matcher, pointer, self._input_data, self._dynamic_priorities,
+                                           self._analyzers.exact_words())
+        if len(transitions) < pointer.get_state().transition_count():  # skipped words fail at this position
+            self._update_failed_max(pointer)
+        return transitions
+
+    def analyzer_memo(self) -> AnalyzerMemo:
+        return self._memo
+
+    def _update_failed_max(self, pointer: RecPointer):
+        if pointer.get_position() > self._failed_max_pointer.get_position():
+            self._failed_max_pointer = pointer
 
 
 @auto_str
 class _CommandReader:
-    _pointers: Deque[RecPointer]
+    _frontier: RecognitionFrontier
     _reached_pointer: RecPointer | None
     _failed_max_pointer: RecPointer | None
     _analyzers: AnalyzerProvider
-    _cache: _DynamicCache
     _certainty_effect: CertaintyEffect
     _dynamic_priorities: DynamicPriorityRuleSet
 
     def __init__(self,
-                 matcher: NormalizedMatcher,
+                 matcher: CompiledMatcher,
                  input_data: TextDataHolder,
                  start_from: int,
                  analyzer_provider: AnalyzerProvider,
                  certainty_effect: CertaintyEffect,
                  dynamic_priorities: DynamicPriorityRuleSet | None,
-                 flags: Flags):
+                 flags: Flags,
+                 search_strategy: SearchStrategy = SearchStrategy.DEPTH_FIRST,
+                 score_combination: ScoreCombination = ScoreCombination.PRODUCT,
+                 beam_width: int = DEFAULT_BEAM_WIDTH,
+                 stats: RecognitionStats | None = None,
+                 budget: RecognitionBudget | None = None):
         self._matcher = matcher
         self._input_data = input_data
-        self._pointers = deque()
+        self._search_strategy = search_strategy
+        self._score_combination = score_combination
+        self._beam_width = beam_width
+        self._frontier = create_frontier(search_strategy, score_combination, beam_width)
+        self._detailed = stats is not None
+        if stats is None:
+            stats = RecognitionStats()
+        self._stats = stats
+        self._budget = budget
+        self._best_finished = None
         self._certainty_effect = certainty_effect
         self._reached_pointer = None
         self._failed_max_pointer = None
         self._start_from = start_from
-        self._cache = _DynamicCache()
+        self._memo = AnalyzerMemo()
         if flags is None:
             flags = Flags()
         self._initial_flags = flags
@@ -264,10 +327,13 @@ class _CommandReader:
         self._dynamic_priorities = dynamic_priorities
 
     def recognize(self):
-        self._pointers = deque()
+        self._frontier = create_frontier(self._search_strategy, self._score_combination, self._beam_width)
         self._reached_pointer = None
-        self._cache.clear()
+        self._best_finished = None
+        self._memo.clear()
         self._failed_max_pointer = None
+        if self._budget is not None:
+            self._budget.start()
         self._recognize_tokens()
         return self._reached_pointer
 
@@ -278,36 +344,66 @@ class _CommandReader:
                                    current_position=self._start_from,
                                    flags=self._initial_flags.copy())
         self._failed_max_pointer = first_pointer
-        self._cache.add_to_cache(first_pointer)
-        self._pointers.append(first_pointer)
+        self._frontier.push_all([first_pointer])
 
         self._run_token_recognition_loop()
 
     def _run_token_recognition_loop(self):
-        while len(self._pointers) > 0 and self._reached_pointer is None:
-            first = self._pointers.popleft()
+        expanded = 0
+        created = 0
+        max_frontier = 0
+        while self._reached_pointer is None:
+            if self._budget is not None and self._budget.is_cancelled():
+                raise RecognitionCancelled()
+            if self._budget is not None and self._budget.is_exceeded():
+                self._reached_pointer = self._best_finished
+                if self._reached_pointer is None:
+                    self._add_stats(expanded, created, max_frontier)
+                    raise RecognizerBudgetExceeded(self._budget.expanded(), self._budget.elapsed())
+                break
+            first = self._frontier.pop()
+            if first is None:
+                break
+            expanded += 1
+            if self._budget is not None:
+                self._budget.add_expansion()
             advanced = self._advance_pointer(first)
-            self._add_to_pointers(advanced)
+            if self._budget is not None:
+                self._remember_finished(advanced)
+            self._frontier.push_all(advanced)
+            if self._detailed:
+                created += len(advanced)
+                max_frontier = max(max_frontier, self._frontier.size())
+        self._add_stats(expanded, created, max_frontier)
 
         if self._reached_pointer is None:
-            position = self._failed_max_pointer.get_position()
-            if position < self._input_data.size():
-                error_token = self._input_data[position]
-                message = f'Unable to recognize command! Error at position {position + 1}: {error_token}'
-                raise RecognizerError(message)
-            else:
-                raise RecognizerError(f'Unable to recognize command! Unexpected end of input.')
-
-    def _add_to_pointers(self, new_pointers: List[RecPointer]):
-        new_items: List[RecPointer] = []
-        for p in new_pointers:
-            if p not in self._cache:
-                new_items.append(p)
-
-        for item in new_items:
-            self._cache.add_to_cache(item)
-
-        self._pointers.extendleft(new_items)
+            raise self._recognition_error()
+
+    def _add_stats(self, expanded: int, created: int, max_frontier: int):
+        self._stats.expanded += expanded
+        self._stats.pruned += self._frontier.pruned()
+        if self._detailed:
+            self._stats.created += created
+            self._stats.deduplicated += self._frontier.deduplicated()
+            self._stats.max_frontier = max(self._stats.max_frontier, max_frontier)
+
+    def _recognition_error(self) -> RecognizerError:
+        position = self._failed_max_pointer.get_position()
+        if position < self._input_data.size():
+            error_token = self._input_data[position]
+            return RecognizerError(f'Unable to recognize command! Error at position {position + 1}: {error_token}')
+        return RecognizerError(f'Unable to recognize command! Unexpected end of input.')
+
+    def _remember_finished(self, pointers: List[RecPointer]):
+        for p in pointers:
+            if not p.is_finished():
+                continue
+            best = self._best_finished
+            if best is None or self._score_of(p) > self._score_of(best):
+                self._best_finished = p
+
+    def _score_of(self, pointer: RecPointer):
+        return pointer.score(self._score_combination), pointer.path_priority()
 
     def _advance_pointer(self, pointer: RecPointer) -> List[RecPointer]:
         if pointer.is_finished():
@@ -315,24 +411,25 @@ class _CommandReader:
             return []
 
         next_gen_pointers: List[RecPointer] = []
-        ordered_connections = self._all_connections_ordered(pointer)
+        priorities = {}
+        ordered_connections = self._all_connections_ordered(pointer, priorities)
         pointers_count = 0
         pointers_dict = {}
         decision = CertaintyDecision()
         category_count = 0
-        for connection in ordered_connections:
-            new_pointers = self._go_through_connection(pointer, connection)
-
-            if len(new_pointers) > 0:
-                category_count += 1
-                items = []
-                for np in new_pointers:
-                    pointers_count += 1
-                    pointers_dict[pointers_count] = np
-                    item = CertaintyItem(pointers_count, category_count, np.certainty(), np.flags().copy())
-                    items.append(item)
-                decision.add(items)
-                next_gen_pointers.extend(new_pointers)
+        for transition in ordered_connections:
+            priority = priorities.get(transition, self._matcher.priority(transition))
+            for new_pointers in self._pointer_groups(pointer, transition, priority):
+                if len(new_pointers) > 0:
+                    category_count += 1
+                    items = []
+                    for np in new_pointers:
+                        pointers_count += 1
+                        pointers_dict[pointers_count] = np
+                        item = CertaintyItem(pointers_count, category_count, np.certainty(), np.flags().copy())
+                        items.append(item)
+                    decision.add(items)
+                    next_gen_pointers.extend(new_pointers)
 
         target_order = self._certainty_effect.apply(decision)
         result = []
@@ -342,75 +439,314 @@ class _CommandReader:
 
         return result
 
-    def _go_through_connection(self, pointer: RecPointer, connection: NormalizedConnection) -> List[RecPointer]:
-        nodes = connection.get_nodes()
+    def _pointer_groups(self, pointer: RecPointer, transition: int, priority: int) -> List[List[RecPointer]]:
+        """
+        :return: pointers produced by the transition, grouped by the transitions they went through.
+        A shared state is passed at once, its transitions continue the transition to it,
+        so the pointers are the same as if the paths through the shared state were not split.
+        The transition to the shared state adds nothing to the path priority, the transitions after it do
+        """
+        if not self._matcher.is_shared(transition):
+            return [self._go_through_connection(pointer, transition, priority)]
+        groups = []
+        for p in self._go_through_connection(pointer, transition, 0):
+            priorities = {}
+            for t in self._all_connections_ordered(p, priorities):
+                groups.extend(self._pointer_groups(p, t, priorities.get(t, self._matcher.priority(t))))
+        return groups
+
+    def _go_through_connection(self, pointer: RecPointer, transition: int, priority: int) -> List[RecPointer]:
+        nodes = self._matcher.nodes(transition)
         previous_generation = [pointer]
 
         for node in nodes:
             this_generation = []
             for p in previous_generation:
                 analyzer = self._analyzers.provide_analyzer(node.node_type, node.argument)
-                advance = p.advance_with_analyzer(node, analyzer)
+                if self._detailed and node.node_type == HistoryNodeType.MATCHING:
+                    advance = self._measured_advance(p, node, analyzer)
+                else:
+                    advance = p.advance_with_analyzer(node, analyzer, self._memo)
                 advance = _optimized_route(advance, analyzer)
 
                 if len(advance) == 0:  # failed pointer
-                    position = p.get_position()
-                    prev_max = self._failed_max_pointer.get_position()
-                    if position > prev_max:
-                        self._failed_max_pointer = p
+                    self._update_failed_max(p)
 
                 this_generation.extend(advance)
             previous_generation = this_generation
 
-        destination = pointer.get_state().get_destination(connection)
+        destination = self._matcher.destination(transition)
         result = []
         for p in previous_generation:
-            r = p.move_to(destination)
+            r = p.move_to(destination, priority)
             result.append(r)
         return result
 
-    def _all_connections_ordered(self, pointer: RecPointer) -> List[NormalizedConnection]:
-        state = pointer.get_state()
-        connections_from_state = state.all_connections()
-
-        priority_map = {}
-        for c in connections_from_state:
-            priority = state.get_priority(c)
-            connection_origin = c.get_nodes()[0]
-            for d in self._dynamic_priorities.get_rules():
-                context = self._input_data.dynamic_priority_context(
-                    start_at=pointer.get_position(),
-                    flags=pointer.flags(),
-                    connection_type=connection_origin.node_type,
-                    connection_arg=connection_origin.argument,
-                    connection_name=connection_origin.name,
-                    priority=priority
-                )
-                if d.is_applicable(context):
-                    priority = d.priority(context)
-            priority_map[c] = priority
-
-        return sorted(connections_from_state, key=lambda x: priority_map[x], reverse=True)
+    def _measured_advance(self,
+                          pointer: RecPointer,
+                          node: NormalizedNode,
+                          analyzer: GenericContextAnalyzer) -> List[RecPointer]:
+        hits = self._memo.hits() if self._memo is not None else 0
+        started = time.perf_counter()
+        advance = pointer.advance_with_analyzer(node, analyzer, self._memo)
+        elapsed = time.perf_counter() - started
+        if self._memo is None or self._memo.hits() == hits:
+            self._stats.add_analyzer_call(node.argument, elapsed)
+        return advance
+
+    def _all_connections_ordered(self, pointer: RecPointer, priorities: Dict[int, int]) -> Sequence[int]:
+        stats = self._stats if self._detailed else None
+        transitions = _ordered_transitions(self._matcher, pointer, self._input_data, self._dynamic_priorities,
+                                           self._analyzers.exact_words(), priorities, stats)
+        if len(transitions) < pointer.get_state().transition_count():  # skipped words fail at this position
+            self._update_failed_max(pointer)
+        return transitions
+
+    def analyzer_memo(self) -> AnalyzerMemo:
+        return self._memo
+
+    def _update_failed_max(self, pointer: RecPointer):
+        if pointer.get_position() > self._failed_max_pointer.get_position():
+            self._failed_max_pointer = pointer
+
+
+class _Expansion:
+    """
+    Pointers produced by one pointer, with the end of the input range that was read to produce them
+    and the furthest failed pointer of the expansion
+    """
+    __slots__ = ('pointer', 'children', 'horizon', 'failed')
+
+    def __init__(self, pointer: RecPointer, children: List[RecPointer], horizon: int, failed: RecPointer | None):
+        self.pointer = pointer
+        self.children = children
+        self.horizon = horizon
+        self.failed = failed
+
+
+@auto_str
+class _IncrementalCommandReader(_CommandReader):
+    """
+    Command reader that keeps the expansions of pointers between recognitions of the changing input.
+    The input holder reports every token range read by the analyzers and dynamic priorities,
+    so an expansion can be reused while all tokens it has read stay the same.
+    Every recognition replays the search from the same initial pointer: reused expansions return the same pointers,
+    so the search order and the result are the same as of the command reader on the whole input.
+    Analyzer memo is not used, its variants do not carry the read ranges
+    """
+    _expansions: Dict[int, _Expansion]
+
+    def __init__(self,
+                 matcher: CompiledMatcher,
+                 input_data: TextDataHolder,
+                 start_from: int,
+                 analyzer_provider: AnalyzerProvider,
+                 certainty_effect: CertaintyEffect,
+                 dynamic_priorities: DynamicPriorityRuleSet | None,
+                 flags: Flags,
+                 search_strategy: SearchStrategy = SearchStrategy.DEPTH_FIRST,
+                 score_combination: ScoreCombination = ScoreCombination.PRODUCT,
+                 beam_width: int = DEFAULT_BEAM_WIDTH):
+        super().__init__(matcher, input_data, start_from, analyzer_provider, certainty_effect, dynamic_priorities,
+                         flags=flags,
+                         search_strategy=search_strategy,
+                         score_combination=score_combination,
+                         beam_width=beam_width)
+        self._memo = None
+        self._expansions = {}
+        self._horizon = 0
+        self._expansion_failed = None
+        self._read_past_end = False
+        self._initial_pointer = RecPointer(matcher.initial_state(),
+                                           input_data,
+                                           current_position=start_from,
+                                           flags=self._initial_flags.copy())
+        input_data.observe_reads(self._observe_read)
+
+    def recognize_changed(self, first_changed: int, stats: RecognitionStats | None = None) -> RecPointer | None:
+        """
+        Recognizes the current input, reusing expansions that read only the tokens before the first changed one
+        :param first_changed: index of the first token that differs from the previous input
+        :return: finished pointer or None if there is no such pointer for the current input
+        """
+        if stats is None:
+            stats = RecognitionStats()
+        self._forget_changed(first_changed)
+        self._frontier = create_frontier(self._search_strategy, self._score_combination, self._beam_width)
+        self._reached_pointer = None
+        self._failed_max_pointer = self._initial_pointer
+        self._read_past_end = False
+        size = self._input_data.size()
+        visited: Dict[int, _Expansion] = {}
+        expanded = 0
+
+        self._frontier.push_all([self._initial_pointer])
+        while True:
+            pointer = self._frontier.pop()
+            if pointer is None:
+                break
+            if pointer.is_finished():
+                self._reached_pointer = pointer
+                break
+            expansion = self._expansions.get(id(pointer))
+            if expansion is None or expansion.pointer is not pointer:
+                expansion = self._expand(pointer)
+                expanded += 1
+            failed = expansion.failed
+            if failed is not None and failed.get_position() > self._failed_max_pointer.get_position():
+                self._failed_max_pointer = failed
+            if expansion.horizon > size:
+                self._read_past_end = True
+            visited[id(pointer)] = expansion
+            self._frontier.push_all(expansion.children)
+
+        if self._reached_pointer is None:  # everything reachable is visited, the rest is not needed anymore
+            self._expansions = visited
+        else:
+            self._expansions.update(visited)
+        stats.expanded += expanded
+        stats.pruned += self._frontier.pruned()
+        return self._reached_pointer
+
+    def read_past_end(self) -> bool:
+        """
+        :return: True if the last recognition depends on tokens after the end of the input,
+        so more tokens may change its result
+        """
+        return self._read_past_end
+
+    def recognition_error(self) -> RecognizerError:
+        return self._recognition_error()
+
+    def _forget_changed(self, first_changed: int):
+        self._expansions = {key: e for key, e in self._expansions.items() if e.horizon <= first_changed}
+
+    def _expand(self, pointer: RecPointer) -> _Expansion:
+        self._horizon = 0
+        self._expansion_failed = None
+        if self._analyzers.exact_words() and pointer.get_state().transition_count() > 0:
+            self._observe_read(pointer.get_position() + 1)  # the first word dispatch reads the current token
+        children = self._advance_pointer(pointer)
+        return _Expansion(pointer, children, self._horizon, self._expansion_failed)
+
+    def _observe_read(self, end: int):
+        if end > self._horizon:
+            self._horizon = end
+
+    def _update_failed_max(self, pointer: RecPointer):
+        failed = self._expansion_failed
+        if failed is None or pointer.get_position() > failed.get_position():
+            self._expansion_failed = pointer
+
+
+@auto_str
+class _CompletionReader(_CommandReader):
+    """
+    Explores every pointer that reads the whole input and collects the word and matching nodes that can consume
+    the next token, with the priorities of their transitions.
+    Pointers at the end of input take the nodes from the expectations of their states, precomputed by the compiled
+    matcher, so only the automatic nodes in front of them are run.
+    A matching that reads past the end of input may accept more tokens, so it is collected too.
+    Matchings are expected to consume at least one token, nodes after them are not collected
+    """
+    _expected: Dict[Tuple[HistoryNodeType, str], Tuple[NormalizedNode, int]]
+
+    def complete(self) -> Tuple[List[Tuple[NormalizedNode, int]], bool]:
+        """
+        :return: expected nodes with the highest priority of each, and True if the input is already a command
+        """
+        self._frontier = create_frontier(SearchStrategy.DEPTH_FIRST, self._score_combination)
+        self._expected = {}
+        self._horizon = 0
+        self._input_data.observe_reads(self._observe_read)
+        complete = False
+        size = self._input_data.size()
+        first_pointer = RecPointer(self._matcher.initial_state(),
+                                   self._input_data,
+                                   current_position=self._start_from,
+                                   flags=self._initial_flags.copy())
+        self._failed_max_pointer = first_pointer
+        self._frontier.push_all([first_pointer])
+        while True:
+            pointer = self._frontier.pop()
+            if pointer is None:
+                break
+            if pointer.get_position() < size:
+                self._frontier.push_all(self._advance_pointer(pointer))
+                continue
+            if pointer.is_final():
+                complete = True
+            self._frontier.push_all(self._expect_from_state(pointer))
+        return list(self._expected.values()), complete
+
+    def _expect_from_state(self, pointer: RecPointer) -> List[RecPointer]:
+        priorities = {}
+        if self._dynamic_priorities.get_rules():
+            _ordered_transitions(self._matcher, pointer, self._input_data, self._dynamic_priorities, False,
+                                 priorities)
+        result = []
+        for transition, first in pointer.get_state().expectations():
+            priority = priorities.get(transition, self._matcher.priority(transition))
+            if first == 0:
+                self._expect(self._matcher.nodes(transition)[0], priority)
+            else:
+                result.extend(self._go_through_connection(pointer, transition, priority))
+        return result
+
+    def _go_through_connection(self, pointer: RecPointer, transition: int, priority: int) -> List[RecPointer]:
+        nodes = self._matcher.nodes(transition)
+        size = self._input_data.size()
+        previous_generation = [pointer]
+
+        for node in nodes:
+            this_generation = []
+            for p in previous_generation:
+                if p.get_position() >= size and node.node_type != HistoryNodeType.AUTOMATIC:
+                    self._expect(node, priority)
+                    continue
+                analyzer = self._analyzers.provide_analyzer(node.node_type, node.argument)
+                self._horizon = 0
+                this_generation.extend(p.advance_with_analyzer(node, analyzer))  # memo hits do not report reads
+                if node.node_type == HistoryNodeType.MATCHING and self._horizon > size:
+                    self._expect(node, priority)
+            previous_generation = this_generation
+
+        destination = self._matcher.destination(transition)
+        return [p.move_to(destination, priority) for p in previous_generation]
+
+    def _observe_read(self, end: int):
+        if end > self._horizon:
+            self._horizon = end
+
+    def _expect(self, node: NormalizedNode, priority: int):
+        key = (node.node_type, node.argument)
+        known = self._expected.get(key)
+        if known is None or known[1] < priority:
+            self._expected[key] = (node, priority)
 
 
 @auto_str
 class _NamespaceReader:
     _pointers: List[RecPointer]
     _reached_pointer: RecPointer | None
-    _cache: _DynamicCache
+    _cache: DynamicCache
     _failed_max_pointer: RecPointer | None
 
     def __init__(self,
-                 matcher: NormalizedMatcher,
+                 matcher: CompiledMatcher,
                  input_data: TextDataHolder,
-                 flags: Flags):
+                 flags: Flags,
+                 budget: RecognitionBudget | None = None):
         self._matcher = matcher
         self._input_data = input_data
         self._pointers = []
+        if flags is None:
+            flags = Flags()
         self._initial_flags = flags
+        self._budget = budget
         self._reached_pointer = None
         self._previous_reached = None
-        self._cache = _DynamicCache()
+        self._cache = DynamicCache()
         self._failed_max_pointer = None
         self._analyzers = AnalyzerProvider(MatchingDefinitionSet(), DefaultWordContextAnalyzerFactory())
 
@@ -444,6 +780,8 @@ class _NamespaceReader:
                     else:
                         message = f'Unable to recognize namespace! Unexpected end of input.'
                     raise RecognizerError(message)
+            if self._budget is not None and self._budget.is_cancelled():
+                raise RecognitionCancelled()
             first = self._pointers.pop(0)
             advanced = self._advance_pointer(first)
             self._add_to_pointers(advanced)
@@ -465,8 +803,8 @@ class _NamespaceReader:
 
         next_gen_pointers: List[RecPointer] = []
         ordered_connections = self._all_connections_ordered(pointer)
-        for connection in ordered_connections:
-            new_pointers = self._go_through_connection(pointer, connection)
+        for transition in ordered_connections:
+            new_pointers = self._go_through_connection(pointer, transition)
             next_gen_pointers.extend(new_pointers)
 
         if not next_gen_pointers:
@@ -480,17 +818,11 @@ class _NamespaceReader:
 
         return next_gen_pointers
 
-    def _all_connections_ordered(self, pointer: RecPointer) -> List[NormalizedConnection]:
-        state = pointer.get_state()
-        connections_from_state = state.all_connections()
-        priority_map = {}
-        for c in connections_from_state:
-            priority = state.get_priority(c)
-            priority_map[c] = priority
-        return sorted(connections_from_state, key=lambda x: priority_map[x], reverse=True)
-
-    def _go_through_connection(self, pointer: RecPointer, connection: NormalizedConnection) -> List[RecPointer]:
-        nodes = connection.get_nodes()
+    def _all_connections_ordered(self, pointer: RecPointer) -> Sequence[int]:
+        return pointer.get_state().candidates(_current_token(pointer, self._input_data))
+
+    def _go_through_connection(self, pointer: RecPointer, transition: int) -> List[RecPointer]:
+        nodes = self._matcher.nodes(transition)
         previous_generation = [pointer]
 
         for node in nodes:
@@ -500,7 +832,7 @@ class _NamespaceReader:
                 advance = p.advance_with_analyzer(node, analyzer)
                 this_generation.extend(advance)
             previous_generation = this_generation
-        destination = pointer.get_state().get_destination(connection)
+        destination = self._matcher.destination(transition)
 
         result = []
         for p in previous_generation:
@@ -509,10 +841,42 @@ class _NamespaceReader:
         return result
 
 
-def recognize_namespace(matcher: NormalizedMatcher, tokens: List[str],
-                        flags: Flags | None = None) -> NamespaceStructure:
+def create_incremental_reader(nc: NamespaceComponent,
+                              input_data: TextDataHolder,
+                              ns: NamespaceStructure,
+                              flags: Flags | None = None) -> _IncrementalCommandReader:
+    """
+    :param input_data: holder of the changing input, its tokens are replaced before every recognition
+    """
+    analyzer_provider = AnalyzerProvider(nc.definitions, nc.word_analyzer_factory)
+    return _IncrementalCommandReader(nc.compiled_matcher, input_data, ns.size(), analyzer_provider,
+                                     nc.certainty_effect, nc.dynamic_priorities,
+                                     flags=flags,
+                                     search_strategy=nc.search_strategy,
+                                     score_combination=nc.score_combination,
+                                     beam_width=nc.beam_width)
+
+
+def complete_command(nc: NamespaceComponent,
+                     tokens: List[str],
+                     ns: NamespaceStructure,
+                     flags: Flags | None = None) -> Tuple[List[Tuple[NormalizedNode, int]], bool]:
+    """
+    :return: word and matching nodes that can consume the token after the input with their priorities,
+    and True if the input is already a command
+    """
+    of_data = TextDataHolder(tokens)
+    analyzer_provider = AnalyzerProvider(nc.definitions, nc.word_analyzer_factory)
+    reader = _CompletionReader(nc.compiled_matcher, of_data, ns.size(), analyzer_provider, nc.certainty_effect,
+                               nc.dynamic_priorities, flags=flags)
+    return reader.complete()
+
+
+def recognize_namespace(matcher: CompiledMatcher, tokens: List[str],
+                        flags: Flags | None = None,
+                        budget: RecognitionBudget | None = None) -> NamespaceStructure:
     of_data = TextDataHolder(tokens)
-    reader = _NamespaceReader(matcher, of_data, flags=flags)
+    reader = _NamespaceReader(matcher, of_data, flags=flags, budget=budget)
     pointer: RecPointer = reader.recognize()
     struct_factory = StructFactory()
     return struct_factory.convert_namespace(tokens, pointer)
@@ -521,32 +885,66 @@ def recognize_namespace(matcher: NormalizedMatcher, tokens: List[str],
 def recognize_command(nc: NamespaceComponent,
                       tokens: List[str],
                       ns: NamespaceStructure,
-                      flags: Flags | None = None) -> CommandStructure:
-    of_data = TextDataHolder(tokens)
+                      flags: Flags | None = None,
+                      beam_width: int | None = None,
+                      stats: RecognitionStats | None = None,
+                      budget: RecognitionBudget | None = None,
+                      profiler: AnalyzerProfiler | None = None) -> CommandStructure:
+    """
+    :param beam_width: if set, the command is recognized with the beam search of this width,
+    otherwise the search strategy of the namespace is used
+    :param profiler: records the calls of the word and matching analyzers
+    """
+    of_data = TextDataHolder(tokens, budget=budget, profiler=profiler)
     shift = ns.size()
-    matcher = nc.command_matcher
+    matcher = nc.compiled_matcher
     dynamic_priorities = nc.dynamic_priorities
-    analyzer_provider = AnalyzerProvider(nc.definitions, nc.word_analyzer_factory)
+    analyzer_provider = AnalyzerProvider(nc.definitions, nc.word_analyzer_factory, profiler)
+    search_strategy = nc.search_strategy
+    if beam_width is None:
+        beam_width = nc.beam_width
+    else:
+        search_strategy = SearchStrategy.BEAM
     reader = _CommandReader(matcher, of_data, shift, analyzer_provider, nc.certainty_effect, dynamic_priorities,
-                            flags=flags)
-    pointer: RecPointer = reader.recognize()
+                            flags=flags,
+                            search_strategy=search_strategy,
+                            score_combination=nc.score_combination,
+                            beam_width=beam_width,
+                            stats=stats,
+                            budget=budget)
+    started = time.perf_counter()
+    try:
+        pointer: RecPointer = reader.recognize()
+    finally:
+        if stats is not None:
+            stats.command_time += time.perf_counter() - started
+    started = time.perf_counter()
     struct_factory = StructFactory()
-    return struct_factory.convert_command(ns, tokens, pointer)
+    command_structure = struct_factory.convert_command(ns, tokens, pointer)
+    if stats is not None:
+        stats.conversion_time += time.perf_counter() - started
+    return command_structure
 
 
 def recognize_extended(title: str,
-                       tokens: List[str],
+                       tokens: List[str] | TokenBuffer,
                        nc: NamespaceComponent,
                        start_from: int,
                        stack: RecognizerStack,
-                       flags: Flags) -> List[CommandStructure]:
-    of_data = TextDataHolder(tokens)
-    matcher = nc.command_matcher
+                       flags: Flags,
+                       budget: RecognitionBudget | None = None,
+                       profiler: AnalyzerProfiler | None = None) -> List[CommandStructure]:
+    """
+    :param budget: budget of the command recognition that runs this one, see TextRecognizeContext.budget
+    :param profiler: profiler of the command recognition that runs this one, see TextRecognizeContext.profiler
+    """
+    of_data = TextDataHolder(tokens, budget=budget, profiler=profiler)
+    matcher = nc.compiled_matcher
     dynamic_priorities = nc.dynamic_priorities
     certainty_effect = nc.certainty_effect
-    analyzer_provider = AnalyzerProvider(nc.definitions, nc.word_analyzer_factory)
+    analyzer_provider = AnalyzerProvider(nc.definitions, nc.word_analyzer_factory, profiler)
     reader = _ExtendedCommandReader(matcher, of_data, start_from, analyzer_provider, dynamic_priorities,
-                                    certainty_effect, stack, flags)
+                                    certainty_effect, stack, flags, budget=budget)
     pointers: List[RecPointer] = reader.recognize()
     ns = NamespaceStructure(identifier=title, tokens=[])
     struct_factory = StructFactory()
@@ -1,3 +1,26 @@
 class RecognizerError(RuntimeError):
     def __init__(self, message=None):
         super().__init__(message)
+
+
+class RecognitionCancelled(RecognizerError):
+    """
+    Recognition was cancelled through its budget (see RecognitionBudget.cancel)
+    """
+
+    def __init__(self, message='Recognition cancelled'):
+        super().__init__(message)
+
+
+class RecognizerBudgetExceeded(RecognizerError):
+    """
+    Recognition ran out of its budget (see RecognitionBudget) before any command was recognized
+    """
+
+    def __init__(self, expanded: int, elapsed: float):
+        super().__init__(f'Recognition budget exceeded: {expanded} pointers expanded in {elapsed:.3f} s')
+        self.expanded = expanded
+        self.elapsed = elapsed
+
+    def __reduce__(self):
+        return RecognizerBudgetExceeded, (self.expanded, self.elapsed)
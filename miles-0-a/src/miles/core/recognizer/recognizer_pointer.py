@@ -1,12 +1,15 @@
 from typing import Self, List
 
 from src.miles.core.normalized.history import NorHistory, HistoryItem
-from src.miles.core.recognizer.normalized_matcher import NormalizedState, NormalizedNode, HistoryNodeType
+from src.miles.core.recognizer.analyzer_memo import AnalyzerMemo, AnalyzerVariant
+from src.miles.core.recognizer.compiled_matcher import CompiledState
+from src.miles.core.recognizer.normalized_matcher import NormalizedNode, HistoryNodeType
 from src.miles.core.recognizer.recognizer_stack import RecognizerStack
+from src.miles.core.recognizer.search_strategy import ScoreCombination
 from src.miles.shared.context.data_holder import TextDataHolder
 from src.miles.shared.context.flags import Flags
 from src.miles.shared.context.shared_node import SharedNode
-from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext, MIN_CERTAINTY
 from src.miles.shared.context_analyzer import GenericContextAnalyzer
 
 
@@ -18,16 +21,22 @@ class RecPointer:
         return f'Pointer {{ {self._at_state}, {self._current_position} }}'
 
     def __init__(self,
-                 at_state: NormalizedState,
+                 at_state: CompiledState,
                  of_data: TextDataHolder,
                  current_position=0,
                  history: NorHistory | None = None,
                  flags: Flags | None = None,
                  stack: RecognizerStack | None = None,
-                 certainty: float = 100):
+                 certainty: float = 100,
+                 certainty_product: float = 1.0,
+                 certainty_min: float = 1.0,
+                 path_priority: int = 0):
         self._at_state = at_state
         self._current_position = current_position
         self._certainty = certainty
+        self._certainty_product = certainty_product
+        self._certainty_min = certainty_min
+        self._path_priority = path_priority
         self._of_data = of_data
 
         if history is None:
@@ -47,59 +56,92 @@ class RecPointer:
             return False
         return self._at_state == other._at_state and self._history == other._history
 
-    def get_state(self) -> NormalizedState:
+    def get_state(self) -> CompiledState:
         return self._at_state
 
     def certainty(self):
         return self._certainty
 
-    def move_to(self, state: NormalizedState) -> Self:
+    def score(self, combination: ScoreCombination = ScoreCombination.PRODUCT) -> float:
+        """
+        :return: combined certainty of all recognition steps of the pointer, from 0 to 1
+        """
+        if combination == ScoreCombination.MINIMUM:
+            return self._certainty_min
+        return self._certainty_product
+
+    def path_priority(self) -> int:
+        """
+        :return: sum of priorities of all connections the pointer went through
+        """
+        return self._path_priority
+
+    def move_to(self, state: CompiledState, priority: int = 0) -> Self:
         return RecPointer(
             at_state=state,
             of_data=self._of_data,
             current_position=self._current_position,
             history=self._history,
             flags=self._flags.copy(),
-            certainty=self._certainty
+            certainty=self._certainty,
+            certainty_product=self._certainty_product,
+            certainty_min=self._certainty_min,
+            path_priority=self._path_priority + priority
         )
 
     def get_position(self):
         return self._current_position
 
-    def _create_next_pointer(self, context: TextRecognizeContext, node: NormalizedNode) -> Self:
+    def _variant_of(self, context: TextRecognizeContext, snapshot: bool) -> AnalyzerVariant | None:
         if context.is_failed():
             return None
-        new_position = context.index()
         certainty = context.last_certainty()
-        if certainty <= 1e-8:
+        if certainty <= MIN_CERTAINTY:
             return None
         if certainty > 100:
             certainty = 100
-
+        consumed = context.get_consumed()
+        if snapshot:
+            consumed = list(consumed)
+        return AnalyzerVariant(position=context.index(),
+                               consumed=consumed,
+                               result=context.get_result(),
+                               certainty=certainty)
+
+    def _create_next_pointer(self, variant: AnalyzerVariant, node: NormalizedNode) -> Self:
         new_item = HistoryItem(
             node=node,
             prev_point=self._current_position,
-            included=context.get_consumed(),
-            result=context.get_result(),
-            next_point=new_position
+            included=variant.consumed,
+            result=variant.result,
+            next_point=variant.position
         )
         return RecPointer(
             at_state=self._at_state,
             of_data=self._of_data,
-            current_position=new_position,
+            current_position=variant.position,
             history=self._history.extend(new_item),
-            certainty=certainty,
-            flags=self._flags.copy()
+            certainty=variant.certainty,
+            flags=self._flags.copy(),
+            certainty_product=self._certainty_product * variant.certainty / 100,
+            certainty_min=min(self._certainty_min, variant.certainty / 100),
+            path_priority=self._path_priority
         )
 
-    def advance_with_analyzer(self, node: NormalizedNode, analyzer: GenericContextAnalyzer) -> List[Self]:
-        result_pointers: List[RecPointer] = []
+    def collect_variants(self,
+                         node: NormalizedNode,
+                         analyzer: GenericContextAnalyzer,
+                         snapshot: bool = False) -> List[AnalyzerVariant]:
+        """
+        Runs the analyzer from the current position
+        :param snapshot: copy the consumed tokens of every variant, so the variants can be reused by other pointers
+        """
+        variants: List[AnalyzerVariant] = []
 
         def _on_interrupt(ctx: TextRecognizeContext):
-
-            next_pointer = self._create_next_pointer(ctx, node)
-            if next_pointer is not None:
-                result_pointers.append(next_pointer)
+            variant = self._variant_of(ctx, snapshot)
+            if variant is not None:
+                variants.append(variant)
 
         node_type = 'automatic'
         if node.node_type == HistoryNodeType.WORD:
@@ -120,7 +162,24 @@ class RecPointer:
                                                                      node=shared_node)
         analyzer.process(context)
         _on_interrupt(context)
-        return result_pointers
+        return variants
+
+    def advance_with_variants(self, node: NormalizedNode, variants: List[AnalyzerVariant]) -> List[Self]:
+        return [self._create_next_pointer(v, node) for v in variants]
+
+    def advance_with_analyzer(self,
+                              node: NormalizedNode,
+                              analyzer: GenericContextAnalyzer,
+                              memo: AnalyzerMemo | None = None) -> List[Self]:
+        if memo is None or node.node_type != HistoryNodeType.MATCHING or not analyzer.is_pure():
+            return self.advance_with_variants(node, self.collect_variants(node, analyzer))
+
+        key = (node.argument, node.name, self._current_position, self._flags.fingerprint(), self._stack.fingerprint())
+        variants = memo.get(key)
+        if variants is None:
+            variants = self.collect_variants(node, analyzer, snapshot=True)
+            memo.put(key, variants)
+        return self.advance_with_variants(node, variants)
 
     def is_finished(self):
         return self._at_state.is_final() and self._current_position >= self._of_data.size()
@@ -1,4 +1,4 @@
-from typing import List, Self
+from typing import List, Self, Tuple
 
 
 class RecStackItem:
@@ -29,3 +29,6 @@ class RecognizerStack:
 
     def copy(self) -> Self:
         return RecognizerStack(list(self._stack))
+
+    def fingerprint(self) -> Tuple[Tuple[str, int], ...]:
+        return tuple((item.title, item.position) for item in self._stack)
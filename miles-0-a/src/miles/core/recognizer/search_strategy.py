@@ -0,0 +1,28 @@
+from enum import Enum
+
+
+class SearchStrategy(Enum):
+    """
+    Search strategy defines the order in which the command recognizer expands pointers.
+    Depth first strategy follows the connections by priority and returns the first finished pointer.
+    Best first strategy always expands the pointer with the highest path score (see ScoreCombination)
+    and returns the finished pointer as soon as no other pointer can reach a higher score.
+    Beam strategy goes through the input position by position, expands at most beam width pointers
+    with the highest score at every position and drops the rest
+    """
+    DEPTH_FIRST = 0
+    BEST_FIRST = 1
+    BEAM = 2
+
+
+DEFAULT_BEAM_WIDTH = 16
+
+
+class ScoreCombination(Enum):
+    """
+    Defines how certainties of the recognition steps are combined into the path score.
+    Product prefers paths with fewer uncertain steps, minimum prefers paths with no weak steps.
+    Both scores never increase along the path, equal scores are ordered by the sum of connection priorities
+    """
+    PRODUCT = 0
+    MINIMUM = 1
@@ -0,0 +1,189 @@
+import threading
+import time
+from typing import Dict, Any, List, Tuple
+
+from src.miles.core.recognizer.optimization import RecOptimizationStrategy
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import GenericContextAnalyzer
+
+"""
+Analyzer latencies are counted in log2 buckets of microseconds:
+bucket 0 holds calls shorter than 1 us, bucket n holds calls from 2^(n-1) to 2^n us,
+the last bucket holds all calls longer than 2^(BUCKET_COUNT - 2) us (about 17 minutes)
+"""
+BUCKET_COUNT = 32
+
+
+def _bucket_of(elapsed: float) -> int:
+    microseconds = int(elapsed * 1_000_000)
+    return min(microseconds.bit_length(), BUCKET_COUNT - 1)
+
+
+def bucket_bound(bucket: int) -> float:
+    """
+    :return: upper bound of the bucket in seconds
+    """
+    return (1 << bucket) / 1_000_000
+
+
+class AnalyzerProfile:
+    """
+    Aggregated calls of one analyzer. A call succeeds if the analyzer reports at least one variant
+    """
+    calls: int
+    successes: int
+    fails: int
+    variants: int
+    total_time: float
+    min_time: float | None
+    max_time: float
+    histogram: List[int]
+
+    def __init__(self):
+        self.calls = 0
+        self.successes = 0
+        self.fails = 0
+        self.variants = 0
+        self.total_time = 0.0
+        self.min_time = None
+        self.max_time = 0.0
+        self.histogram = [0] * BUCKET_COUNT
+
+    def add(self, elapsed: float, variants: int):
+        self.calls += 1
+        if variants > 0:
+            self.successes += 1
+        else:
+            self.fails += 1
+        self.variants += variants
+        self.total_time += elapsed
+        if self.min_time is None or elapsed < self.min_time:
+            self.min_time = elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        self.histogram[_bucket_of(elapsed)] += 1
+
+    def mean_time(self) -> float:
+        if self.calls == 0:
+            return 0.0
+        return self.total_time / self.calls
+
+    def percentile(self, fraction: float) -> float:
+        """
+        :return: upper bound of the histogram bucket that contains the percentile, in seconds
+        """
+        if self.calls == 0:
+            return 0.0
+        target = fraction * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count > 0 and seen >= target:
+                return min(bucket_bound(bucket), self.max_time)
+        return self.max_time
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'successes': self.successes,
+            'fails': self.fails,
+            'variants': self.variants,
+            'total_time': self.total_time,
+            'mean_time': self.mean_time(),
+            'min_time': self.min_time if self.min_time is not None else 0.0,
+            'max_time': self.max_time,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'histogram': {bucket_bound(b): count for b, count in enumerate(self.histogram) if count > 0}
+        }
+
+
+class AnalyzerProfiler:
+    """
+    Collects the calls of word and matching analyzers across recognitions. Pass it to MatchingCore to enable it.
+    Analyzers are profiled by their kind and argument: ('matching', name) or ('word', word).
+    Results reused from the analyzer memo or the recognition cache are not calls.
+    The profiler is thread-safe
+    """
+    _profiles: Dict[Tuple[str, str], AnalyzerProfile]
+
+    def __init__(self):
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, kind: str, argument: str, analyzer: GenericContextAnalyzer) -> GenericContextAnalyzer:
+        return _ProfiledAnalyzer(self, (kind, argument), analyzer)
+
+    def record(self, key: Tuple[str, str], elapsed: float, variants: int):
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = AnalyzerProfile()
+                self._profiles[key] = profile
+            profile.add(elapsed, variants)
+
+    def profiles(self) -> Dict[Tuple[str, str], AnalyzerProfile]:
+        with self._lock:
+            return dict(self._profiles)
+
+    def reset(self):
+        with self._lock:
+            self._profiles = {}
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: profiles by 'kind:argument', the most expensive analyzer first
+        """
+        with self._lock:
+            ordered = sorted(self._profiles.items(), key=lambda item: item[1].total_time, reverse=True)
+            return {f'{kind}:{argument}': profile.as_dict() for (kind, argument), profile in ordered}
+
+    def report(self, limit: int | None = None) -> str:
+        """
+        :param limit: maximal number of analyzers in the report, the most expensive ones are kept
+        """
+        rows = list(self.as_dict().items())
+        if limit is not None:
+            rows = rows[:limit]
+        header = (f'{"analyzer":<32} {"calls":>8} {"success":>8} {"fail":>8} {"variants":>9} '
+                  f'{"total ms":>10} {"mean us":>9} {"p50 us":>9} {"p95 us":>9} {"max us":>9}')
+        lines = [header]
+        for name, p in rows:
+            lines.append(f'{name:<32} {p["calls"]:>8} {p["successes"]:>8} {p["fails"]:>8} {p["variants"]:>9} '
+                         f'{p["total_time"] * 1000:>10.3f} {p["mean_time"] * 1e6:>9.1f} {p["p50"] * 1e6:>9.1f} '
+                         f'{p["p95"] * 1e6:>9.1f} {p["max_time"] * 1e6:>9.1f}')
+        return '\n'.join(lines)
+
+
+class _ProfiledAnalyzer(GenericContextAnalyzer):
+    """
+    Measures GenericContextAnalyzer.process of the wrapped analyzer
+    """
+
+    def __init__(self, profiler: AnalyzerProfiler, key: Tuple[str, str], analyzer: GenericContextAnalyzer):
+        self._profiler = profiler
+        self._key = key
+        self._analyzer = analyzer
+
+    def invoke(self, context: TextRecognizeContext) -> None:
+        self._analyzer.invoke(context)
+
+    def has_result(self) -> bool:
+        return self._analyzer.has_result()
+
+    def process(self, context: TextRecognizeContext) -> None:
+        started = time.perf_counter()
+        try:
+            self._analyzer.process(context)
+        finally:
+            elapsed = time.perf_counter() - started
+            variants = context.interrupted_variants()
+            if context.is_variant():
+                variants += 1  # the final state of the context is a variant too
+            self._profiler.record(self._key, elapsed, variants)
+
+    def optimization_strategy(self) -> RecOptimizationStrategy:
+        return self._analyzer.optimization_strategy()
+
+    def is_pure(self) -> bool:
+        return self._analyzer.is_pure()
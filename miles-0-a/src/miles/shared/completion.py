@@ -0,0 +1,70 @@
+from typing import List
+
+from src.miles.core.recognizer.normalized_matcher import HistoryNodeType
+
+
+class ExpectedToken:
+    """
+    Token that can follow the command prefix: a word of the syntax or any token accepted by the matching
+    """
+    __slots__ = ('node_type', 'argument', 'priority')
+
+    def __init__(self, node_type: HistoryNodeType, argument: str, priority: int):
+        self.node_type = node_type
+        self.argument = argument
+        self.priority = priority
+
+    def __str__(self):
+        return f'ExpectedToken({self.node_type.name}, {self.argument}, {self.priority})'
+
+    def __repr__(self):
+        return str(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, ExpectedToken):
+            return False
+        return (self.node_type, self.argument, self.priority) == (other.node_type, other.argument, other.priority)
+
+    def __hash__(self):
+        return hash((self.node_type, self.argument, self.priority))
+
+    def is_word(self) -> bool:
+        return self.node_type == HistoryNodeType.WORD
+
+    def is_matching(self) -> bool:
+        return self.node_type == HistoryNodeType.MATCHING
+
+
+class Completion:
+    """
+    Result of MatchingCore.complete: the tokens that can follow the prefix, highest priority first
+    """
+    _expected: List[ExpectedToken]
+
+    def __init__(self, expected: List[ExpectedToken], complete: bool):
+        self._expected = sorted(expected, key=lambda e: (-e.priority, e.node_type.value, e.argument))
+        self._complete = complete
+
+    def __str__(self):
+        return f'Completion({self._expected}, complete={self._complete})'
+
+    def expected(self) -> List[ExpectedToken]:
+        return list(self._expected)
+
+    def words(self) -> List[str]:
+        return [e.argument for e in self._expected if e.is_word()]
+
+    def matchings(self) -> List[str]:
+        return [e.argument for e in self._expected if e.is_matching()]
+
+    def is_complete(self) -> bool:
+        """
+        :return: True if the prefix is already a command
+        """
+        return self._complete
+
+    def is_viable(self) -> bool:
+        """
+        :return: False if no command starts with the prefix
+        """
+        return self._complete or len(self._expected) > 0
@@ -3,15 +3,30 @@ from typing import List
 
 from src.miles.core.recognizer.normalized_matcher import HistoryNodeType
 from src.miles.core.recognizer.recognizer_stack import RecognizerStack
+from src.miles.shared.analyzer_profiler import AnalyzerProfiler
 from src.miles.shared.context.flags import Flags
 from src.miles.shared.context.shared_node import SharedNode
 from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context.token_buffer import TokenBuffer, as_token_buffer
 from src.miles.shared.priority.dynamic_priority import DynamicPriorityContext
+from src.miles.shared.recognition_budget import RecognitionBudget
 
 
 class TextDataHolder:
-    def __init__(self, text: List[str]):
-        self._text = text
+    _text: TokenBuffer
+
+    def __init__(self,
+                 text: List[str] | TokenBuffer,
+                 budget: RecognitionBudget | None = None,
+                 profiler: AnalyzerProfiler | None = None):
+        """
+        :param budget: budget of the recognition, given to the contexts for nested recognitions
+        :param profiler: profiler of the recognition, given to the contexts for nested recognitions
+        """
+        self._text = as_token_buffer(text)
+        self._on_read = None
+        self._budget = budget
+        self._profiler = profiler
 
     def __str__(self):
         return f"{str(self._text)}"
@@ -19,6 +34,22 @@ class TextDataHolder:
     def size(self) -> int:
         return len(self._text)
 
+    def replace(self, text: List[str] | TokenBuffer):
+        """
+        Replaces the input. Pointers and contexts created after the call see the new tokens
+        """
+        self._text = as_token_buffer(text)
+
+    def observe_reads(self, on_read: Callable[[int], None] | None):
+        """
+        :param on_read: receives the end (exclusive) of every token range read through the contexts
+        created by this holder, or UNBOUNDED_READ if the read depends on the whole input
+        """
+        self._on_read = on_read
+
+    def buffer(self) -> TokenBuffer:
+        return self._text
+
     def create_context(self,
                        on_interrupt: Callable[[TextRecognizeContext], None],
                        start_at: int,
@@ -33,7 +64,10 @@ class TextDataHolder:
             failed=failed,
             flags=flags,
             node=node,
-            stack=stack
+            stack=stack,
+            on_read=self._on_read,
+            budget=self._budget,
+            profiler=self._profiler
         )
 
     def dynamic_priority_context(self,
@@ -50,7 +84,8 @@ class TextDataHolder:
             connection_name=connection_name,
             static_priority=priority,
             start_at=start_at,
-            flags=flags
+            flags=flags,
+            on_read=self._on_read
         )
 
     def full(self):
@@ -1,21 +1,61 @@
-from typing import TypeVar, Any, Optional, Type, Dict, Self
+from typing import TypeVar, Any, Optional, Type, Dict, Self, Tuple, Hashable
 
 T = TypeVar('T')
 
 
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_hashable(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
 class Flags:
+    """
+    Copy-on-write map of flags.
+    copy() is O(1): the copy shares the underlying map with the original one,
+    and the map is duplicated only when either of them is written.
+    Flags are hashable by their content, so they can be a part of cache keys.
+    Note that the hash changes after set_flag
+    """
     _flags: Dict[str, Any]
+    _shared: bool
+    _fingerprint: Tuple | None
 
     def __init__(self, _map: Dict[str, Any] | None = None):
         if _map is None:
             _map = {}
         self._flags = _map
+        self._shared = False
+        self._fingerprint = None
 
     def __getitem__(self, item):
         return self._flags.__getitem__(item)
 
+    def __eq__(self, other):
+        if not isinstance(other, Flags):
+            return False
+        return self._flags is other._flags or self._flags == other._flags
+
+    def __hash__(self):
+        return hash(self.fingerprint())
+
+    def __str__(self):
+        return f'Flags({self._flags})'
+
     def set_flag(self, name: str, value: Any):
+        if self._shared:
+            self._flags = dict(self._flags)
+            self._shared = False
         self._flags[name] = value
+        self._fingerprint = None
 
     def get_flag(self, name: str, type_to_cast: Optional[Type[T]] = None) -> T | None:
         value = self._flags.get(name, None)
@@ -33,5 +73,17 @@ class Flags:
     def has_flag(self, name: str) -> bool:
         return name in self._flags
 
+    def fingerprint(self) -> Tuple:
+        """
+        :return: hashable snapshot of the flags content
+        """
+        if self._fingerprint is None:
+            self._fingerprint = tuple(sorted((k, _hashable(v)) for k, v in self._flags.items()))
+        return self._fingerprint
+
     def copy(self) -> Self:
-        return Flags(self._flags.copy())
+        self._shared = True
+        result = Flags(self._flags)
+        result._shared = True
+        result._fingerprint = self._fingerprint
+        return result
@@ -3,9 +3,16 @@ from typing import List, Callable, Self, TypeVar, Any
 from src.miles.core.recognizer.recognizer_stack import RecognizerStack
 from src.miles.shared.context.flags import Flags
 from src.miles.shared.context.shared_node import SharedNode
+from src.miles.shared.context.token_buffer import TokenBuffer, as_token_buffer, UNBOUNDED_READ
+from src.miles.shared.recognition_budget import RecognitionBudget
 
 T = TypeVar('T')
 
+MIN_CERTAINTY = 1e-8
+"""
+Variants with lower certainty are dropped by the recognizer
+"""
+
 
 class ConsumedRange:
     def __init__(self, from_index: int, to_index: int):
@@ -15,7 +22,7 @@ class ConsumedRange:
     def as_range(self) -> range:
         return range(self.from_index, self.to_index)
 
-    def apply_to(self, lst: List[T]) -> List[T]:
+    def apply_to(self, lst: List[T] | TokenBuffer) -> List[T]:
         return lst[self.from_index: self.to_index]
 
 
@@ -23,7 +30,7 @@ class TextRecognizeContext:
     def flags(self) -> Flags:
         return self._flags
 
-    _tokens: List[str]
+    _tokens: TokenBuffer
     _flags: Flags
     _consumed: List[str]
     _stack: RecognizerStack
@@ -31,18 +38,29 @@ class TextRecognizeContext:
     _result: Any
 
     def __init__(self,
-                 tokens: List[str],
+                 tokens: List[str] | TokenBuffer,
                  on_interrupt: Callable[[Self], None],
                  node: SharedNode,
                  start_at=0,
                  failed=False,
                  flags: Flags | None = None,
-                 stack: RecognizerStack | None = None):
-        self._tokens = list(tokens)
+                 stack: RecognizerStack | None = None,
+                 on_read: Callable[[int], None] | None = None,
+                 budget: RecognitionBudget | None = None,
+                 profiler: Any = None):
+        """
+        :param on_read: receives the end (exclusive) of every token range the analyzer reads,
+        including the checks if a token exists
+        :param budget: budget of the recognition, nested recognitions of the analyzer use it too
+        :param profiler: AnalyzerProfiler of the recognition, nested recognitions record their analyzers in it
+        """
+        self._tokens = as_token_buffer(tokens)
+        self._on_read = on_read
         self._position = start_at
         self._total = len(self._tokens)
         self._fail_flag = failed
         self._on_interrupt = on_interrupt
+        self._interrupts = 0
         self._consumed = []
         self._node = node
         self._result = None
@@ -50,10 +68,16 @@ class TextRecognizeContext:
         if stack is None:
             stack = RecognizerStack()
         self._stack = stack
+        self._budget = budget
+        self._profiler = profiler
         if flags is None:
             flags = Flags()
         self._flags = flags.copy()
 
+    def _read(self, end: int):
+        if self._on_read is not None:
+            self._on_read(end)
+
     def current(self) -> str | None:
         if self.is_empty():
             return None
@@ -63,18 +87,35 @@ class TextRecognizeContext:
         return self._position
 
     def lookahead(self, items: int) -> List[str]:
+        self._read(self._position + items)
         return self._tokens[self._position:self._position + items]
 
     def look(self, at_item: int) -> str:
+        self._read(self._position + at_item + 1)
         return self._tokens[self._position + at_item]
 
     def interrupt(self):
+        if self.is_variant():
+            self._interrupts += 1
         self._on_interrupt(self)
 
+    def is_variant(self) -> bool:
+        """
+        :return: True if the current state of the context is a recognition variant: not failed and not impossible
+        """
+        return not self._fail_flag and self._last_certainty > MIN_CERTAINTY
+
+    def interrupted_variants(self) -> int:
+        """
+        :return: number of variants the analyzer has reported by interrupting the context
+        """
+        return self._interrupts
+
     def get_result(self):
         return self._result
 
     def consume(self, items: int = 1, interrupted=False, certainty: float = 100) -> List[str]:
+        self._read(self._position + items)
         c_range = ConsumedRange(self._position, self._position + items)
         if self._fail_flag:
             return c_range.apply_to(self._tokens)
@@ -91,6 +132,7 @@ class TextRecognizeContext:
         prev_consumed = list(self._consumed)
         prev_certainty = self._last_certainty
 
+        self._read(self._position + items)
         c_range = ConsumedRange(self._position, self._position + items)
         self._consumed.extend(c_range.apply_to(self._tokens))
         self._position = min(self._total, self._position + items)
@@ -103,6 +145,7 @@ class TextRecognizeContext:
         self._consumed = prev_consumed
 
     def ignore(self, items: int = 1, interrupted: bool = False, certainty: float = 100) -> None:
+        self._read(self._position + items)
         self._position = min(self._total, self._position + items)
         self._last_certainty = certainty
         if interrupted:
@@ -112,12 +155,15 @@ class TextRecognizeContext:
         return self._last_certainty
 
     def remaining_count(self) -> int:
+        self._read(UNBOUNDED_READ)
         return self._total - self._position
 
     def has_any(self) -> bool:
+        self._read(self._position + 1)
         return self._position < self._total
 
     def is_empty(self) -> bool:
+        self._read(self._position + 1)
         return self._position >= self._total
 
     def is_failed(self):
@@ -127,7 +173,12 @@ class TextRecognizeContext:
         self._fail_flag = True
 
     def all_tokens(self) -> List[str]:
-        return list(self._tokens)
+        self._read(UNBOUNDED_READ)
+        return self._tokens.as_list()
+
+    def token_buffer(self) -> TokenBuffer:
+        self._read(UNBOUNDED_READ)
+        return self._tokens
 
     def write(self, items: List[str]) -> None:
         self._consumed.extend(items)
@@ -141,6 +192,12 @@ class TextRecognizeContext:
     def stack(self):
         return self._stack
 
+    def budget(self) -> RecognitionBudget | None:
+        return self._budget
+
+    def profiler(self) -> Any:
+        return self._profiler
+
     def set_flags(self, flags: Flags):
         self._flags = flags
 
@@ -0,0 +1,45 @@
+import sys
+from typing import List, Iterator, Sequence
+
+UNBOUNDED_READ = sys.maxsize
+"""
+End of the read range reported by the contexts when the result depends on the whole input (see TextDataHolder.observe_reads)
+"""
+
+
+class TokenBuffer:
+    """
+    Read-only storage of the input tokens.
+    The buffer is created once per recognition and shared by all contexts, so contexts
+    only keep a position in it instead of copying the whole input
+    """
+    _tokens: tuple
+
+    def __init__(self, tokens: Sequence[str]):
+        self._tokens = tuple(tokens)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return list(self._tokens[item])
+        return self._tokens[item]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tokens)
+
+    def __str__(self):
+        return str(list(self._tokens))
+
+    def slice(self, from_index: int, to_index: int) -> List[str]:
+        return list(self._tokens[from_index:to_index])
+
+    def as_list(self) -> List[str]:
+        return list(self._tokens)
+
+
+def as_token_buffer(tokens: Sequence[str] | TokenBuffer) -> TokenBuffer:
+    if isinstance(tokens, TokenBuffer):
+        return tokens
+    return TokenBuffer(tokens)
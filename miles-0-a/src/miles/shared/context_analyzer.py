@@ -24,6 +24,14 @@ class GenericContextAnalyzer(ABC):
     def optimization_strategy(self) -> RecOptimizationStrategy:
         return RecOptimizationStrategy.NONE
 
+    def is_pure(self) -> bool:
+        """
+        Pure analyzer produces the same variants for the same tokens, position, flags and stack,
+        so the recognizer may reuse them for all pointers that reach the same position during one recognition.
+        Pure analyzers must not depend on the previous recognition history or keep the consumed list between variants
+        """
+        return False
+
 
 class AutomaticContextAnalyzer(GenericContextAnalyzer):
     """
@@ -85,12 +93,22 @@ class WordContextAnalyzerFactory(ABC):
     def build(self, word: str) -> TypedContextAnalyzer:
         pass
 
+    def exact_words(self) -> bool:
+        """
+        :return: True if the built analyzers match only the token that equals to the word (case-insensitive)
+        and consume nothing else. Lets the recognizer skip the words that do not equal to the current token
+        """
+        return False
+
 
 class DefaultWordContextAnalyzerFactory(WordContextAnalyzerFactory):
 
     def build(self, word: str) -> TypedContextAnalyzer:
         return WordContextAnalyzer(word)
 
+    def exact_words(self) -> bool:
+        return type(self).build is DefaultWordContextAnalyzerFactory.build  # subclasses may build other analyzers
+
 
 class AnyWordContextAnalyzer(TypedContextAnalyzer):
     """
@@ -101,6 +119,9 @@ class AnyWordContextAnalyzer(TypedContextAnalyzer):
         current = context.consume()[0]
         context.set_result(current)
 
+    def is_pure(self) -> bool:
+        return True
+
 class NumberContextAnalyzer(TypedContextAnalyzer):
     """
     Matches one and only numbers
@@ -115,6 +136,9 @@ class NumberContextAnalyzer(TypedContextAnalyzer):
         except Exception:
             context.fail()
 
+    def is_pure(self) -> bool:
+        return True
+
 class TextContextAnalyzer(TypedContextAnalyzer):
     """
     Text Context Analyzer implements matching for unbounded text
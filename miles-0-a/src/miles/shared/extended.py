@@ -1,7 +1,9 @@
+import threading
 from typing import List, Tuple
 
 from src.miles.core.plugin.pipeline import create_normalized_matcher_from_definitions
 from src.miles.core.plugin.plugin_definition import PluginDefinition, NamespaceOfCommands, StoredCommand
+from src.miles.core.plugin.plugin_structure import NamespaceComponent
 from src.miles.core.plugin.register_to_definitions import map_register_to_definition
 from src.miles.core.recognizer.normalized_text_recognizer import recognize_extended
 from src.miles.core.recognizer.recognizer_error import RecognizerError
@@ -19,12 +21,20 @@ class _MockExecutor(CommandExecutor):
 
 
 class ExtendedCore:
+    """
+    Recognizes the commands of the temporary namespace inside the analyzer.
+    The temporary namespace is compiled on the first use and is reused until the commands or the register are changed
+    """
+    _compiled: Tuple[int, NamespaceComponent] | None
+
     def __init__(self, plugin: str, namespace: str, matching: str):
         self._plugin = plugin
         self._namespace = namespace
         self._matching = matching
         self._title = self._matching
         self._stored = []
+        self._compiled = None
+        self._lock = threading.Lock()
 
     def init_commands(self, commands: List[Tuple[str, str]]):
         stored = []
@@ -33,7 +43,9 @@ class ExtendedCore:
             syntax = c[1]
             stored_command = StoredCommand(name, syntax, _MockExecutor())
             stored.append(stored_command)
-        self._stored = stored
+        with self._lock:
+            self._stored = stored
+            self._compiled = None
 
     def _select_namespace(self) -> NamespaceOfCommands:
         reg = MilesRegister()
@@ -49,7 +61,7 @@ class ExtendedCore:
                 return n
         raise ValueError(f'Unknown namespace: {self._namespace}')
 
-    def recognize_extended(self, context: TextRecognizeContext) -> List[CommandStructure]:
+    def _compile(self) -> NamespaceComponent:
         selected = self._select_namespace()
 
         custom_namespace = NamespaceOfCommands(name=self._title,
@@ -59,19 +71,40 @@ class ExtendedCore:
                                                dynamic_priorities=selected.dynamic_priorities,
                                                definition_set=selected.definition_set,
                                                word_analyzer_factory=selected.word_analyzer_factory,
-                                               certainty_effect=selected.certainty_effect)
+                                               certainty_effect=selected.certainty_effect,
+                                               search_strategy=selected.search_strategy,
+                                               score_combination=selected.score_combination,
+                                               beam_width=selected.beam_width)
+        temp_plugin = PluginDefinition(name=self._title, namespaces=[custom_namespace])
+        temp_plugin_structure = create_normalized_matcher_from_definitions(temp_plugin)
+        return temp_plugin_structure.namespaces[0]
+
+    def _namespace_component(self) -> NamespaceComponent:
+        revision = MilesRegister().revision()
+        compiled = self._compiled
+        if compiled is not None and compiled[0] == revision:
+            return compiled[1]
+
+        with self._lock:
+            compiled = self._compiled
+            if compiled is not None and compiled[0] == revision:
+                return compiled[1]
+            ns = self._compile()
+            self._compiled = (revision, ns)
+            return ns
+
+    def recognize_extended(self, context: TextRecognizeContext) -> List[CommandStructure]:
         position = context.position()
         if context.stack().contains(self._title, position):
             return []  # fails to avoid infinite loop
 
-        temp_plugin = PluginDefinition(name=self._title, namespaces=[custom_namespace])
-        temp_plugin_structure = create_normalized_matcher_from_definitions(temp_plugin)
-        ns = temp_plugin_structure.namespaces[0]
+        ns = self._namespace_component()
 
         stack = context.stack().copy()
         stack.push(self._title, position)
 
-        result = recognize_extended(self._title, context.all_tokens(), ns, position, stack, context.flags())
+        result = recognize_extended(self._title, context.token_buffer(), ns, position, stack, context.flags(),
+                                    budget=context.budget(), profiler=context.profiler())
 
         return result
 
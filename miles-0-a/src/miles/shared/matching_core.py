@@ -1,11 +1,30 @@
-from typing import List, Any
+import asyncio
+import copy
+import functools
+import inspect
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Any, Tuple, Callable, Self, Dict
 
-from src.miles.core.plugin.plugin_structure import PluginStructure
+from src.miles.core.normalized.normalization_stats import NormalizationStats
+from src.miles.core.plugin.plugin_structure import PluginStructure, NamespaceComponent
 from src.miles.core.recognizer.history_to_struct import StructFactory
+from src.miles.core.recognizer.compiled_matcher import compile_matcher
 from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher
-from src.miles.core.recognizer.normalized_text_recognizer import recognize_namespace, recognize_command
+from src.miles.core.recognizer.normalized_text_recognizer import recognize_namespace, recognize_command, \
+    complete_command
+from src.miles.core.recognizer.recognizer_error import RecognizerError
+from src.miles.shared.analyzer_profiler import AnalyzerProfiler
+from src.miles.shared.completion import Completion, ExpectedToken
 from src.miles.shared.context.flags import Flags
 from src.miles.shared.executor.command_structure import NamespaceStructure, CommandStructure
+from src.miles.shared.recognition_budget import RecognitionBudget
+from src.miles.shared.recognition_cache import RecognitionCache
+from src.miles.shared.recognition_session import RecognitionSession
+from src.miles.shared.recognition_stats import RecognitionStats
 from src.miles.shared.tokenizer import Tokenizer
 
 
@@ -13,8 +32,21 @@ class MatchingCore:
 
     def __init__(self,
                  namespace_matcher: NormalizedMatcher,
-                 plugin_structures: List[PluginStructure]):
-        self._namespace_matcher = namespace_matcher
+                 plugin_structures: List[PluginStructure],
+                 cache: RecognitionCache | None = None,
+                 max_workers: int | None = None,
+                 stats_listener: Callable[[RecognitionStats], None] | None = None,
+                 profiler: AnalyzerProfiler | None = None):
+        """
+        :param cache: optional cache of recognized commands, it is cleared because the results of the previous core
+        may be invalid for the new one
+        :param max_workers: number of threads that run the recognition for the asynchronous methods
+        :param stats_listener: receives the stats of every recognition, also the failed one.
+        It is called in the thread (or the worker process of recognize_many) that recognized the command
+        :param profiler: records the calls of word and matching analyzers of all command recognitions,
+        except the ones in the worker processes of recognize_many
+        """
+        self._namespace_matcher = compile_matcher(namespace_matcher)
         self._namespace_name_map = {}
         for plugin in plugin_structures:
             for namespace in plugin.namespaces:
@@ -23,48 +55,334 @@ class MatchingCore:
         self._plugin_structures = list(plugin_structures)
         self._struct_factory = StructFactory()
         self._tokenizer = Tokenizer()
+        if cache is not None:
+            cache.clear()
+        self._cache = cache
+        self._stats_listener = stats_listener
+        self._profiler = profiler
+        self._max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
     def recognize_and_execute(self,
                               command: str,
                               namespace: str | None = None,
                               context: Any | None = None,
-                              flags: Flags | None = None):
+                              flags: Flags | None = None,
+                              beam_width: int | None = None,
+                              stats: RecognitionStats | None = None,
+                              max_expansions: int | None = None,
+                              timeout: float | None = None):
         tokens = self._tokenize(command)
-
-        if namespace is None:
-            namespace_structure = recognize_namespace(self._namespace_matcher, tokens, flags)
-        else:
-            namespace_structure = NamespaceStructure(identifier=namespace, tokens=[])
-
-        namespace_id = namespace_structure.identifier()
-        p_namespace, plugin = self._namespace_name_map[namespace_id]
-
-        command_structure = recognize_command(p_namespace,
-                                              tokens,
-                                              namespace_structure,
-                                              flags)
+        budget = _create_budget(max_expansions, timeout)
+        p_namespace, command_structure = self._recognize(tokens, namespace, flags, beam_width, stats, budget)
         executor = p_namespace.executors_map.get(command_structure.get_command_name())
         executor.on_recognize(command_structure, context)
 
     def recognize(self,
-                              command: str,
-                              namespace: str | None = None,
-                              flags: Flags | None = None) -> CommandStructure:
+                  command: str,
+                  namespace: str | None = None,
+                  flags: Flags | None = None,
+                  beam_width: int | None = None,
+                  stats: RecognitionStats | None = None,
+                  max_expansions: int | None = None,
+                  timeout: float | None = None) -> CommandStructure:
+        """
+        :param beam_width: recognize the command with the beam search of this width instead of the namespace strategy
+        :param stats: filled with the counters of the command recognition
+        :param max_expansions: maximal number of pointers expanded during the command recognition
+        :param timeout: maximal time of the command recognition in seconds.
+        When the expansions or the time run out, the best command recognized so far is returned;
+        if there is no such command, RecognizerBudgetExceeded is raised
+        """
+        tokens = self._tokenize(command)
+        budget = _create_budget(max_expansions, timeout)
+        _, command_structure = self._recognize(tokens, namespace, flags, beam_width, stats, budget)
+        return command_structure
+
+    async def arecognize_and_execute(self,
+                                     command: str,
+                                     namespace: str | None = None,
+                                     context: Any | None = None,
+                                     flags: Flags | None = None,
+                                     beam_width: int | None = None,
+                                     stats: RecognitionStats | None = None,
+                                     max_expansions: int | None = None,
+                                     timeout: float | None = None):
+        """
+        Asynchronous version of recognize_and_execute.
+        The executor is called in the event loop thread; if it returns an awaitable, the awaitable is awaited
+        """
+        p_namespace, command_structure = await self._arecognize(command, namespace, flags, beam_width, stats,
+                                                                max_expansions, timeout)
+        executor = p_namespace.executors_map.get(command_structure.get_command_name())
+        result = executor.on_recognize(command_structure, context)
+        if inspect.isawaitable(result):
+            await result
+
+    async def arecognize(self,
+                         command: str,
+                         namespace: str | None = None,
+                         flags: Flags | None = None,
+                         beam_width: int | None = None,
+                         stats: RecognitionStats | None = None,
+                         max_expansions: int | None = None,
+                         timeout: float | None = None) -> CommandStructure:
+        """
+        Asynchronous version of recognize. The recognition runs in the thread pool of the core and does not block
+        the event loop. If the awaiting task is cancelled, the recognition stops before the next pointer expansion
+        """
+        _, command_structure = await self._arecognize(command, namespace, flags, beam_width, stats,
+                                                      max_expansions, timeout)
+        return command_structure
+
+    async def _arecognize(self,
+                          command: str,
+                          namespace: str | None,
+                          flags: Flags | None,
+                          beam_width: int | None,
+                          stats: RecognitionStats | None,
+                          max_expansions: int | None,
+                          timeout: float | None) -> Tuple[NamespaceComponent, CommandStructure]:
         tokens = self._tokenize(command)
+        budget = RecognitionBudget(max_expansions=max_expansions, timeout=timeout)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._recognize, tokens, namespace, flags, beam_width, stats, budget)
+        try:
+            return await loop.run_in_executor(self._thread_pool(), call)
+        except asyncio.CancelledError:
+            budget.cancel()
+            raise
+
+    def complete(self, prefix: str, namespace: str, flags: Flags | None = None) -> Completion:
+        """
+        Finds the words and matchings that can follow the prefix of the command in the namespace.
+        All tokens of the prefix are treated as complete
+        """
+        tokens = self._tokenize(prefix)
+        p_namespace, plugin = self._namespace_name_map[namespace]
+        namespace_structure = NamespaceStructure(identifier=namespace, tokens=[])
+        nodes, complete = complete_command(p_namespace, tokens, namespace_structure, flags)
+        expected = [ExpectedToken(node.node_type, node.argument, priority) for node, priority in nodes]
+        return Completion(expected, complete)
+
+    def session(self, namespace: str, flags: Flags | None = None) -> RecognitionSession:
+        """
+        Creates the session that recognizes the command of the namespace as it grows or changes
+        (see RecognitionSession). The session is not thread-safe
+        """
+        p_namespace, plugin = self._namespace_name_map[namespace]
+        namespace_structure = NamespaceStructure(identifier=namespace, tokens=[])
+        return RecognitionSession(p_namespace, namespace_structure, flags, self._tokenizer)
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix='miles-recognizer')
+            return self._executor
+
+    def close(self):
+        """
+        Shuts down the thread pool of the asynchronous methods; it is created again if they are called later
+        """
+        with self._executor_lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def recognize_many(self,
+                       commands: List[str],
+                       namespace: str | None = None,
+                       flags: Flags | None = None,
+                       workers: int | None = None,
+                       core_factory: Callable[[], Self] | None = None) -> List[CommandStructure | Exception]:
+        """
+        Recognizes a batch of commands. Identical commands are recognized once.
+        :param workers: number of worker processes; the commands are recognized in this process if it is not set
+        :param core_factory: picklable function that builds the core in every worker. If it is not set,
+        the workers are forked and use a copy of this core
+        :return: command structure or the raised error for every command, in the order of the commands
+        """
+        all_tokens = [tuple(self._tokenize(c)) for c in commands]
+        unique = list(dict.fromkeys(all_tokens))
+        if workers is None or workers <= 1 or len(unique) <= 1:
+            unique_results = [_recognize_safely(self, list(tokens), namespace, flags) for tokens in unique]
+        else:
+            unique_results = _recognize_in_pool(self, unique, namespace, flags, workers, core_factory)
+
+        by_tokens = dict(zip(unique, unique_results))
+        returned = set()
+        results = []
+        for tokens in all_tokens:
+            result = by_tokens[tokens]
+            if tokens in returned and isinstance(result, CommandStructure):
+                result = copy.deepcopy(result)  # duplicates must not share the structure
+            returned.add(tokens)
+            results.append(result)
+        return results
+
+    def _recognize(self,
+                   tokens: List[str],
+                   namespace: str | None,
+                   flags: Flags | None,
+                   beam_width: int | None,
+                   stats: RecognitionStats | None,
+                   budget: RecognitionBudget | None) -> Tuple[NamespaceComponent, CommandStructure]:
+        listener = self._stats_listener
+        if listener is None:
+            return self._recognize_tokens(tokens, namespace, flags, beam_width, stats, budget)
+        if stats is None:
+            stats = RecognitionStats()
+        try:
+            return self._recognize_tokens(tokens, namespace, flags, beam_width, stats, budget)
+        finally:
+            listener(stats)
+
+    def _recognize_tokens(self,
+                          tokens: List[str],
+                          namespace: str | None,
+                          flags: Flags | None,
+                          beam_width: int | None,
+                          stats: RecognitionStats | None,
+                          budget: RecognitionBudget | None) -> Tuple[NamespaceComponent, CommandStructure]:
+        max_expansions = budget.max_expansions if budget is not None else None
+        timeout = budget.timeout if budget is not None else None
+        cache_key = None
+        if self._cache is not None:
+            fingerprint = flags.fingerprint() if flags is not None else ()
+            cache_key = (namespace, tuple(tokens), fingerprint, beam_width, max_expansions)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                if stats is not None:
+                    stats.cached = True
+                p_namespace, plugin = self._namespace_name_map[cached.namespace().identifier()]
+                return p_namespace, cached
 
         if namespace is None:
-            namespace_structure = recognize_namespace(self._namespace_matcher, tokens, flags)
+            started = time.perf_counter()
+            try:
+                namespace_structure = recognize_namespace(self._namespace_matcher, tokens, flags, budget=budget)
+            finally:
+                if stats is not None:
+                    stats.namespace_time += time.perf_counter() - started
         else:
             namespace_structure = NamespaceStructure(identifier=namespace, tokens=[])
 
         namespace_id = namespace_structure.identifier()
         p_namespace, plugin = self._namespace_name_map[namespace_id]
 
-        return recognize_command(p_namespace,
+        command_structure = recognize_command(p_namespace,
                                               tokens,
                                               namespace_structure,
-                                              flags)
+                                              flags,
+                                              beam_width=beam_width,
+                                              stats=stats,
+                                              budget=budget,
+                                              profiler=self._profiler)
+        if cache_key is not None and timeout is None:  # results cut by the timeout are not reproducible
+            self._cache.put(cache_key, command_structure)
+        return p_namespace, command_structure
+
+    def cache(self) -> RecognitionCache | None:
+        return self._cache
 
+    def profiler(self) -> AnalyzerProfiler | None:
+        return self._profiler
+
+    def analyzer_profile(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: profiles of the analyzers by 'kind:argument', the most expensive first; empty without the profiler
+        """
+        if self._profiler is None:
+            return {}
+        return self._profiler.as_dict()
+
+    def analyzer_report(self, limit: int | None = None) -> str:
+        """
+        :return: text table of the analyzer profiles, the most expensive first; empty without the profiler
+        """
+        if self._profiler is None:
+            return ''
+        return self._profiler.report(limit)
+
+    def normalization_stats(self) -> Dict[str, NormalizationStats]:
+        """
+        :return: sizes of the command matchers before and after the normalization by namespace name
+        """
+        return {name: namespace.normalization_stats
+                for name, (namespace, _) in self._namespace_name_map.items()
+                if namespace.normalization_stats is not None}
+
+    def normalization_report(self) -> str:
+        """
+        :return: text table of the command matcher sizes by namespace, '-' if the size before is unknown
+        """
+        lines = [f'{"namespace":<24} {"before":>10} {"after":>10} {"states":>8} {"max fan-out":>12} {"shared":>8}']
+        for name, stats in self.normalization_stats().items():
+            before = '-' if stats.connections_before is None else stats.connections_before
+            lines.append(f'{name:<24} {before:>10} {stats.connections_after:>10} {stats.states:>8} '
+                         f'{stats.max_fan_out:>12} {stats.shared_states:>8}')
+        return '\n'.join(lines)
 
     def _tokenize(self, command: str) -> List[str]:
         return self._tokenizer.tokenize(command)
+
+
+def _create_budget(max_expansions: int | None, timeout: float | None) -> RecognitionBudget | None:
+    if max_expansions is None and timeout is None:
+        return None
+    return RecognitionBudget(max_expansions=max_expansions, timeout=timeout)
+
+
+_worker_core: MatchingCore | None = None
+
+
+def _init_worker(core: MatchingCore | None, core_factory: Callable[[], MatchingCore] | None):
+    global _worker_core
+    if core_factory is not None:
+        core = core_factory()
+    _worker_core = core
+
+
+def _recognize_safely(core: MatchingCore,
+                      tokens: List[str],
+                      namespace: str | None,
+                      flags: Flags | None) -> CommandStructure | Exception:
+    try:
+        _, command_structure = core._recognize(tokens, namespace, flags, None, None, None)
+        return command_structure
+    except Exception as e:
+        return e
+
+
+def _recognize_in_worker(task: Tuple[List[str], str | None, Flags | None]) -> CommandStructure | Exception:
+    tokens, namespace, flags = task
+    result = _recognize_safely(_worker_core, tokens, namespace, flags)
+    try:
+        pickle.dumps(result)
+    except Exception as e:
+        return RecognizerError(f'Unable to return the result of {" ".join(tokens)}: {e}')
+    return result
+
+
+def _recognize_in_pool(core: MatchingCore,
+                       unique: List[Tuple[str, ...]],
+                       namespace: str | None,
+                       flags: Flags | None,
+                       workers: int,
+                       core_factory: Callable[[], MatchingCore] | None) -> List[CommandStructure | Exception]:
+    if core_factory is None:
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise ValueError('Core factory is required if worker processes can not be forked')
+        context = multiprocessing.get_context('fork')
+        init_args = (core, None)
+    else:
+        context = multiprocessing.get_context()
+        init_args = (None, core_factory)
+
+    tasks = [(list(tokens), namespace, flags) for tokens in unique]
+    chunk_size = max(1, len(tasks) // (workers * 4))
+    with context.Pool(processes=workers, initializer=_init_worker, initargs=init_args) as pool:
+        return pool.map(_recognize_in_worker, tasks, chunk_size)
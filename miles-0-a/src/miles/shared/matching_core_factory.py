@@ -1,14 +1,49 @@
+import os
+from typing import Callable
+
 from src.miles.core.plugin.pipeline import create_normalized_matcher_from_definitions, \
     create_normalized_matcher_for_namespaces
+from src.miles.core.command.syntax_cache import SyntaxCache
+from src.miles.core.plugin.grammar_cache import GrammarCache, grammar_key
 from src.miles.core.plugin.register_to_definitions import map_register_to_definition
+from src.miles.shared.analyzer_profiler import AnalyzerProfiler
 from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.recognition_cache import RecognitionCache
+from src.miles.shared.recognition_stats import RecognitionStats
 from src.miles.shared.register import MilesRegister
 
 
-def create_matching_core() -> MatchingCore:
+def create_matching_core(cache: RecognitionCache | None = None,
+                         stats_listener: Callable[[RecognitionStats], None] | None = None,
+                         profiler: AnalyzerProfiler | None = None,
+                         cache_dir: str | os.PathLike | None = None) -> MatchingCore:
+    """
+    :param cache_dir: directory of the grammar cache. If the registered grammar has been built before,
+    its matchers are loaded from the cache instead of being built, otherwise they are built and stored.
+    Parsed command syntax and the tables of the syntax parser are stored there too (see SyntaxCache)
+    """
     register = MilesRegister()
     definitions = map_register_to_definition(register)
-    namespace_matcher = create_normalized_matcher_for_namespaces(definitions)
-    plugin_structures = list(map(create_normalized_matcher_from_definitions, definitions))
 
-    return MatchingCore(namespace_matcher=namespace_matcher, plugin_structures=plugin_structures)
+    grammar_cache = None
+    cached = None
+    key = None
+    if cache_dir is not None:
+        SyntaxCache().attach(cache_dir)
+        grammar_cache = GrammarCache(cache_dir)
+        key = grammar_key(definitions)
+        cached = grammar_cache.load(key)
+
+    if cached is not None:
+        namespace_matcher = cached.namespace_matcher
+        plugin_structures = [create_normalized_matcher_from_definitions(d, cached.plugin_matchers(d.name()))
+                             for d in definitions]
+    else:
+        namespace_matcher = create_normalized_matcher_for_namespaces(definitions)
+        plugin_structures = list(map(create_normalized_matcher_from_definitions, definitions))
+        if grammar_cache is not None:
+            grammar_cache.store(key, namespace_matcher, plugin_structures)
+            SyntaxCache().save()
+
+    return MatchingCore(namespace_matcher=namespace_matcher, plugin_structures=plugin_structures, cache=cache,
+                        stats_listener=stats_listener, profiler=profiler)
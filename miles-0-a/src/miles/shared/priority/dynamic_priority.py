@@ -1,21 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Callable
 
 from src.miles.core.recognizer.normalized_matcher import HistoryNodeType
 from src.miles.shared.context.flags import Flags
+from src.miles.shared.context.token_buffer import TokenBuffer, as_token_buffer, UNBOUNDED_READ
 
 
 class DynamicPriorityContext:
     def __init__(self,
-                 tokens: List[str],
+                 tokens: List[str] | TokenBuffer,
                  connection_type: HistoryNodeType,
                  connection_argument: str,
                  connection_name: str,
                  static_priority: int,
                  start_at=0,
-                 flags=Flags | None
+                 flags: Flags | None = None,
+                 on_read: Callable[[int], None] | None = None
                  ):
-        self._tokens = list(tokens)
+        self._tokens = as_token_buffer(tokens)
+        self._on_read = on_read
         self._position = start_at
         self._total = len(self._tokens)
         self._connection_type = connection_type
@@ -26,7 +29,12 @@ class DynamicPriorityContext:
             flags = Flags()
         self.flags = flags.copy()
 
+    def _read(self, end: int):
+        if self._on_read is not None:
+            self._on_read(end)
+
     def __len__(self):
+        self._read(UNBOUNDED_READ)
         return self._total
 
     def is_word(self):
@@ -39,6 +47,7 @@ class DynamicPriorityContext:
         return self.static_priority()
 
     def is_empty(self):
+        self._read(self._position + 1)
         return self._position >= self._total
 
     def current(self) -> str | None:
@@ -50,6 +59,7 @@ class DynamicPriorityContext:
         return self._position
 
     def lookahead(self, items: int) -> List[str]:
+        self._read(self._position + items)
         return self._tokens[self._position: self._position + items]
 
     def is_matching(self):
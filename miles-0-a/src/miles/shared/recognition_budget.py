@@ -0,0 +1,64 @@
+import threading
+import time
+
+
+class RecognitionBudget:
+    """
+    Limits the work of one command recognition.
+    When the budget runs out, the recognizer returns the best finished command found so far,
+    or raises RecognizerBudgetExceeded if there is none.
+    Nested recognitions of the analyzers (see ExtendedCore) use the same budget: the readers of the command
+    and of the nested recognitions count their expansions together
+    """
+    max_expansions: int | None
+    timeout: float | None
+
+    def __init__(self, max_expansions: int | None = None, timeout: float | None = None):
+        """
+        :param max_expansions: maximal number of pointers to expand
+        :param timeout: maximal recognition time in seconds
+        """
+        if max_expansions is not None and max_expansions < 0:
+            raise ValueError(f'Expansion budget must not be negative, got {max_expansions}')
+        if timeout is not None and timeout < 0:
+            raise ValueError(f'Timeout must not be negative, got {timeout}')
+        self.max_expansions = max_expansions
+        self.timeout = timeout
+        self._started = None
+        self._expanded = 0
+        self._cancelled = threading.Event()
+
+    def start(self):
+        self._started = time.monotonic()
+        self._expanded = 0
+
+    def add_expansion(self):
+        self._expanded += 1
+
+    def expanded(self) -> int:
+        """
+        :return: pointers expanded since the start, by the command reader and by the nested recognitions
+        """
+        return self._expanded
+
+    def elapsed(self) -> float:
+        if self._started is None:
+            return 0.0
+        return time.monotonic() - self._started
+
+    def cancel(self):
+        """
+        Asks the recognition to stop; it may be called from any thread.
+        The recognizer raises RecognitionCancelled before the next pointer expansion
+        """
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def is_exceeded(self) -> bool:
+        if self.max_expansions is not None and self._expanded >= self.max_expansions:
+            return True
+        if self.timeout is not None and self.elapsed() >= self.timeout:
+            return True
+        return False
@@ -0,0 +1,88 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Tuple
+
+
+class RecognitionCache:
+    """
+    Thread-safe LRU cache of recognized command structures.
+    Entries expire after ttl seconds (if set); stored and returned values are deep copies,
+    so executors can't change the cached structures
+    """
+    _entries: OrderedDict[Hashable, Tuple[float, Any]]
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None):
+        if max_size < 1:
+            raise ValueError(f'Cache size must be positive, got {max_size}')
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f'Cache TTL must be positive, got {ttl}')
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, value = entry
+            if self._ttl is not None and time.monotonic() - stored_at > self._ttl:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def hits(self) -> int:
+        return self._hits
+
+    def misses(self) -> int:
+        return self._misses
+
+    def evictions(self) -> int:
+        """
+        :return: number of entries removed because the cache was full
+        """
+        return self._evictions
+
+    def expirations(self) -> int:
+        """
+        :return: number of entries removed because their TTL ran out
+        """
+        return self._expirations
+
+    def hit_rate(self) -> float:
+        total = self._hits + self._misses
+        if total == 0:
+            return 0.0
+        return self._hits / total
+
+    def __str__(self):
+        return (f'RecognitionCache(size={self.size()}, hits={self._hits}, misses={self._misses}, '
+                f'evictions={self._evictions}, expirations={self._expirations})')
@@ -0,0 +1,106 @@
+from typing import List
+
+from src.miles.core.plugin.plugin_structure import NamespaceComponent
+from src.miles.core.recognizer.history_to_struct import StructFactory
+from src.miles.core.recognizer.normalized_text_recognizer import create_incremental_reader
+from src.miles.core.recognizer.recognizer_error import RecognizerError
+from src.miles.shared.context.data_holder import TextDataHolder
+from src.miles.shared.context.flags import Flags
+from src.miles.shared.executor.command_structure import NamespaceStructure, CommandStructure
+from src.miles.shared.recognition_stats import RecognitionStats
+from src.miles.shared.session_status import SessionStatus
+from src.miles.shared.tokenizer import Tokenizer
+
+
+class RecognitionSession:
+    """
+    Recognition of the command of one namespace that arrives in parts:
+    partial results of the voice recognition, text that is being typed or edited.
+    Every update reuses the work of the previous ones that depends only on the tokens before the first changed token,
+    so appending tokens only extends the search. Use MatchingCore.session to create it
+    """
+    _tokens: List[str]
+
+    def __init__(self,
+                 component: NamespaceComponent,
+                 namespace: NamespaceStructure,
+                 flags: Flags | None = None,
+                 tokenizer: Tokenizer | None = None):
+        if tokenizer is None:
+            tokenizer = Tokenizer()
+        self._tokenizer = tokenizer
+        self._component = component
+        self._namespace = namespace
+        self._input = TextDataHolder([])
+        self._reader = create_incremental_reader(component, self._input, namespace, flags)
+        self._tokens = []
+        self._updated = False
+        self._status = SessionStatus.VIABLE
+        self._pointer = None
+        self._result = None
+
+    def update(self, command: str, stats: RecognitionStats | None = None) -> SessionStatus:
+        """
+        Recognizes the new version of the command
+        :param stats: receives the number of pointers expanded by this update, reused ones are not counted
+        """
+        return self.update_tokens(self._tokenizer.tokenize(command), stats)
+
+    def update_tokens(self, tokens: List[str], stats: RecognitionStats | None = None) -> SessionStatus:
+        tokens = list(tokens)
+        first_changed = _common_prefix(self._tokens, tokens)
+        if self._updated and first_changed == len(tokens) == len(self._tokens):
+            return self._status
+        if not self._updated:
+            first_changed = 0
+
+        self._tokens = tokens
+        self._updated = True
+        self._input.replace(tokens)
+        self._result = None
+        self._pointer = self._reader.recognize_changed(first_changed, stats)
+        if self._pointer is not None:
+            self._status = SessionStatus.FINISHED
+        elif self._reader.read_past_end():
+            self._status = SessionStatus.VIABLE
+        else:
+            self._status = SessionStatus.DEAD
+        return self._status
+
+    def status(self) -> SessionStatus:
+        return self._status
+
+    def tokens(self) -> List[str]:
+        return list(self._tokens)
+
+    def result(self) -> CommandStructure | None:
+        """
+        :return: structure of the recognized command if the status is finished, otherwise None
+        """
+        if self._pointer is None:
+            return None
+        if self._result is None:
+            self._result = StructFactory().convert_command(self._namespace, self._tokens, self._pointer)
+        return self._result
+
+    def error(self) -> RecognizerError | None:
+        """
+        :return: the error the command recognizer would raise for the current input, None if it is finished
+        """
+        if self._status == SessionStatus.FINISHED or not self._updated:
+            return None
+        return self._reader.recognition_error()
+
+    def namespace(self) -> NamespaceStructure:
+        return self._namespace
+
+    def component(self) -> NamespaceComponent:
+        return self._component
+
+
+def _common_prefix(old: List[str], new: List[str]) -> int:
+    size = min(len(old), len(new))
+    for i in range(size):
+        if old[i] != new[i]:
+            return i
+    return size
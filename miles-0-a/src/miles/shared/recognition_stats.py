@@ -0,0 +1,66 @@
+from typing import Dict, Any
+
+
+class RecognitionStats:
+    """
+    Counters of one command recognition. Pass an instance to MatchingCore.recognize to fill it,
+    or set the stats listener of the core to receive them after every recognition.
+    The counters of pointers, analyzers and dynamic rules are collected only when the stats are requested,
+    so the recognition without stats does not pay for them.
+    All times are in seconds
+    """
+    expanded: int
+    pruned: int
+    created: int
+    deduplicated: int
+    max_frontier: int
+    analyzer_calls: Dict[str, int]
+    analyzer_time: Dict[str, float]
+    rule_evaluations: int
+    namespace_time: float
+    command_time: float
+    conversion_time: float
+    cached: bool
+
+    def __init__(self):
+        self.expanded = 0
+        self.pruned = 0
+        self.created = 0  # pointers produced by the expansions
+        self.deduplicated = 0  # pointers dropped because their state and position were already reached
+        self.max_frontier = 0
+        self.analyzer_calls = {}  # by matching name, results reused from the analyzer memo are not counted
+        self.analyzer_time = {}
+        self.rule_evaluations = 0
+        self.namespace_time = 0.0
+        self.command_time = 0.0
+        self.conversion_time = 0.0
+        self.cached = False
+
+    def __str__(self):
+        return (f'RecognitionStats(expanded={self.expanded}, pruned={self.pruned}, created={self.created}, '
+                f'deduplicated={self.deduplicated}, max_frontier={self.max_frontier}, '
+                f'analyzer_calls={sum(self.analyzer_calls.values())}, rule_evaluations={self.rule_evaluations}, '
+                f'total_time={self.total_time():.6f}, cached={self.cached})')
+
+    def add_analyzer_call(self, name: str, elapsed: float):
+        self.analyzer_calls[name] = self.analyzer_calls.get(name, 0) + 1
+        self.analyzer_time[name] = self.analyzer_time.get(name, 0.0) + elapsed
+
+    def total_time(self) -> float:
+        return self.namespace_time + self.command_time + self.conversion_time
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'expanded': self.expanded,
+            'pruned': self.pruned,
+            'created': self.created,
+            'deduplicated': self.deduplicated,
+            'max_frontier': self.max_frontier,
+            'analyzer_calls': dict(self.analyzer_calls),
+            'analyzer_time': dict(self.analyzer_time),
+            'rule_evaluations': self.rule_evaluations,
+            'namespace_time': self.namespace_time,
+            'command_time': self.command_time,
+            'conversion_time': self.conversion_time,
+            'cached': self.cached
+        }
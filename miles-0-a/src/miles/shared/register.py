@@ -1,7 +1,8 @@
-from typing import List
+from typing import List, Dict, Set
 
 from src.miles.core.priority.priority_config import PriorityStrategy
 from src.miles.core.recognizer.matching_definition import MatchingDefinition
+from src.miles.core.recognizer.search_strategy import SearchStrategy, ScoreCombination, DEFAULT_BEAM_WIDTH
 from src.miles.shared.certainty import SortCertaintyEffect, CertaintyEffect
 from src.miles.shared.context_analyzer import TypedContextAnalyzer, DefaultWordContextAnalyzerFactory, \
     WordContextAnalyzerFactory
@@ -11,19 +12,63 @@ from src.miles.shared.priority.priority_rule import PriorityRule
 from src.miles.utils.singleton import Singleton
 
 
+class _PrefixNode:
+    children: Dict[str, '_PrefixNode']
+    prefix: str | None
+    first: str | None
+
+    def __init__(self):
+        self.children = {}
+        self.prefix = None  # prefix that ends in this node
+        self.first = None  # earliest remembered prefix that starts with the path to this node
+
+
 class _PrefixSet:
-    _prefixes: List[str]
+    """
+    Trie of namespace prefixes, none of them is the beginning of another one
+    """
+    _root: _PrefixNode
 
     def __init__(self):
-        self._prefixes = []
+        self._root = _PrefixNode()
 
     def remember_and_validate(self, new_prefix: str):
-        for old_prefix in self._prefixes:
-            if old_prefix.startswith(new_prefix):
-                raise ValueError(f'Prefix conflict: "{new_prefix}" is part of "{old_prefix}"')
-            if new_prefix.startswith(old_prefix):
-                raise ValueError(f'Prefix conflict: "{old_prefix}" is part of "{new_prefix}"')
-        self._prefixes.append(new_prefix)
+        node = self._root
+        for char in new_prefix:
+            if node.prefix is not None:
+                raise ValueError(f'Prefix conflict: "{node.prefix}" is part of "{new_prefix}"')
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            if node.first is not None:
+                raise ValueError(f'Prefix conflict: "{new_prefix}" is part of "{node.first}"')
+
+        node = self._root
+        for char in new_prefix:
+            if node.first is None:
+                node.first = new_prefix
+            node = node.children.setdefault(char, _PrefixNode())
+        if node.first is None:
+            node.first = new_prefix
+        node.prefix = new_prefix
+
+
+class _Revision:
+    """
+    Counter of register changes. It is shared by the register and all its plugins and namespaces,
+    any change of them increments it, so the compiled structures can be invalidated
+    """
+    _value: int
+
+    def __init__(self):
+        self._value = 0
+
+    def increment(self):
+        self._value += 1
+
+    def value(self) -> int:
+        return self._value
 
 
 class CommandInitializer:
@@ -37,9 +82,12 @@ class NamespaceInitializer:
     _static_priority_rules: List[PriorityRule]
     _matchings: List[MatchingDefinition]
 
-    def __init__(self, name: str, prefix: str):
+    def __init__(self, name: str, prefix: str, _revision: _Revision | None = None):
         self._name = name
         self._prefix = prefix
+        if _revision is None:
+            _revision = _Revision()
+        self._revision = _revision
         self._commands = []
         self._static_priority_rules = []
         self._dynamic_priority_rules = []
@@ -48,32 +96,42 @@ class NamespaceInitializer:
         self._default_priority = 0
         self._word_analyzer_factory = DefaultWordContextAnalyzerFactory()
         self._certainty_effect = SortCertaintyEffect()
+        self._search_strategy = SearchStrategy.DEPTH_FIRST
+        self._score_combination = ScoreCombination.PRODUCT
+        self._beam_width = DEFAULT_BEAM_WIDTH
+        self._minimize_matcher = False
 
     def add_command(self, name: str, syntax: str, executor: CommandExecutor):
         command = CommandInitializer(name, syntax, executor)
         self._commands.append(command)
+        self._revision.increment()
 
     def set_priority_strategy(self, ps: PriorityStrategy):
         self._priority_strategy = ps
+        self._revision.increment()
 
     def get_priority_strategy(self) -> PriorityStrategy:
         return self._priority_strategy
 
     def set_default_priority(self, priority: int):
         self._default_priority = priority
+        self._revision.increment()
 
     def get_default_priority(self) -> int:
         return self._default_priority
 
     def extend_commands(self, commands: List[CommandInitializer]):
         self._commands.extend(commands)
+        self._revision.increment()
 
     def add_matching(self, name: str, analyzer: TypedContextAnalyzer):
         matching = MatchingDefinition(name, analyzer)
         self._matchings.append(matching)
+        self._revision.increment()
 
     def extend_matching(self, matchings: List[MatchingDefinition]):
         self._matchings.extend(matchings)
+        self._revision.increment()
 
     def get_matchings(self) -> List[MatchingDefinition]:
         return list(self._matchings)
@@ -83,9 +141,11 @@ class NamespaceInitializer:
 
     def add_static_priority_rule(self, rule: PriorityRule):
         self._static_priority_rules.append(rule)
+        self._revision.increment()
 
     def add_dynamic_priority_rule(self, rule: DynamicPriorityRule):
         self._dynamic_priority_rules.append(rule)
+        self._revision.increment()
 
     def get_name(self):
         return self._name
@@ -93,31 +153,73 @@ class NamespaceInitializer:
     def get_prefix(self):
         return self._prefix
 
-    def get_static_priorities(self):
-        return self._static_priority_rules
+    def get_static_priorities(self) -> List[PriorityRule]:
+        return list(self._static_priority_rules)
 
     def get_dynamic_priorities(self) -> List[DynamicPriorityRule]:
-        return self._dynamic_priority_rules
+        return list(self._dynamic_priority_rules)
 
     def get_word_analyzer_factory(self) -> WordContextAnalyzerFactory:
         return self._word_analyzer_factory
 
     def set_word_analyzer_factory(self, factory: WordContextAnalyzerFactory):
         self._word_analyzer_factory = factory
+        self._revision.increment()
 
     def get_certainty_effect(self):
         return self._certainty_effect
 
     def set_certainty_effect(self, ce: CertaintyEffect):
         self._certainty_effect = ce
+        self._revision.increment()
+
+    def get_search_strategy(self) -> SearchStrategy:
+        return self._search_strategy
+
+    def set_search_strategy(self, strategy: SearchStrategy):
+        self._search_strategy = strategy
+        self._revision.increment()
+
+    def get_score_combination(self) -> ScoreCombination:
+        return self._score_combination
+
+    def set_score_combination(self, combination: ScoreCombination):
+        self._score_combination = combination
+        self._revision.increment()
+
+    def get_beam_width(self) -> int:
+        return self._beam_width
+
+    def set_beam_width(self, width: int):
+        """
+        Sets the number of pointers kept at every input position by the beam search strategy
+        """
+        if width < 1:
+            raise ValueError(f'Beam width must be positive, got {width}')
+        self._beam_width = width
+        self._revision.increment()
+
+    def get_minimize_matcher(self) -> bool:
+        return self._minimize_matcher
+
+    def set_minimize_matcher(self, minimize: bool):
+        """
+        Merges equivalent states of the command matcher after the normalization: fewer states to build and
+        to remember during the recognition, the recognized commands are the same
+        """
+        self._minimize_matcher = minimize
+        self._revision.increment()
 
 
 class PluginRegister:
     _name: str
 
-    def __init__(self, name: str, display_name: str, _prefixes: _PrefixSet):
+    def __init__(self, name: str, display_name: str, _prefixes: _PrefixSet, _revision: _Revision | None = None):
         self._name = name
         self._prefixes = _prefixes
+        if _revision is None:
+            _revision = _Revision()
+        self._revision = _revision
         if display_name is None:
             display_name = name
         self._display_name = display_name
@@ -130,9 +232,10 @@ class PluginRegister:
         return self._display_name
 
     def add_namespace(self, name: str, prefix: str) -> NamespaceInitializer:
-        namespace = NamespaceInitializer(name, prefix)
+        namespace = NamespaceInitializer(name, prefix, self._revision)
         self._prefixes.remember_and_validate(namespace.get_prefix())
         self._namespaces.append(namespace)
+        self._revision.increment()
         return namespace
 
     def get_namespaces(self) -> List[NamespaceInitializer]:
@@ -141,25 +244,33 @@ class PluginRegister:
 
 class MilesRegister(metaclass=Singleton):
     _plugins: List[PluginRegister]
+    _plugin_names: Set[str]
 
     def __init__(self):
         self._plugins = []
+        self._plugin_names = set()
         self._prefix_set = _PrefixSet()
+        self._revision = _Revision()
 
     def _has_plugin_named(self, name: str):
-        for p in self._plugins:
-            if p.get_name() == name:
-                return True
-        return False
+        return name in self._plugin_names
 
     def create_plugin_register(self, plugin_name: str, display_name: str | None = None) -> PluginRegister:
-        plugin = PluginRegister(plugin_name, display_name, self._prefix_set)
+        plugin = PluginRegister(plugin_name, display_name, self._prefix_set, self._revision)
 
         if self._has_plugin_named(plugin_name):
             raise ValueError(f'Plugin "{plugin_name}" has already been registered')
 
         self._plugins.append(plugin)
+        self._plugin_names.add(plugin_name)
+        self._revision.increment()
         return plugin
 
     def all_plugins(self) -> List[PluginRegister]:
         return list(self._plugins)
+
+    def revision(self) -> int:
+        """
+        :return: number that changes every time plugins, namespaces or their contents are changed
+        """
+        return self._revision.value()
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class SessionStatus(Enum):
+    """
+    State of the recognition session after the last update.
+    Viable: the input is not a command yet, but more tokens may complete it.
+    Finished: the input is a command, the session has its structure.
+    Dead: no command starts with the input, adding tokens can not help
+    """
+    VIABLE = 0
+    FINISHED = 1
+    DEAD = 2
@@ -66,6 +66,9 @@ class ColorContextAnalyzer(TypedContextAnalyzer):
         context.ignore(certainty=certainty)
         context.write([word])
 
+    def is_pure(self) -> bool:
+        return True
+
 
 class ShapeContextAnalyzer(TypedContextAnalyzer):
     def invoke(self, context: TextRecognizeContext):
@@ -77,6 +80,9 @@ class ShapeContextAnalyzer(TypedContextAnalyzer):
         context.ignore(certainty=certainty)
         context.write([word])
 
+    def is_pure(self) -> bool:
+        return True
+
 
 def is_audio_recognition_error(context: TextRecognizeContext):
     current = context.current().lower()
@@ -125,6 +131,9 @@ class NumberContextAnalyzer(TypedContextAnalyzer):
         else:
             context.fail()
 
+    def is_pure(self) -> bool:
+        return True
+
 
 class ShapeIdContextAnalyzer(TypedContextAnalyzer):
 
@@ -138,6 +147,9 @@ class ShapeIdContextAnalyzer(TypedContextAnalyzer):
         else:
             context.fail()
 
+    def is_pure(self) -> bool:
+        return True
+
 
 class CoordinatesContextAnalyzer(TypedContextAnalyzer):
 
@@ -160,6 +172,9 @@ class CoordinatesContextAnalyzer(TypedContextAnalyzer):
         context.ignore(command_structure.get_root().size())
         context.write([x, y])
 
+    def is_pure(self) -> bool:
+        return True
+
 
 class AddCommandExecutor(RequestCommandExecutor):
     def recognize_request(self, command_structure: CommandStructure, request_context: RequestContext):
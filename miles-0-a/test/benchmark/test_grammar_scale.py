@@ -0,0 +1,27 @@
+from src.benchmark.grammar_scale import generate_commands, growth_exponents, check_near_linear, measure_size
+
+
+def test_generate_commands():
+    commands = generate_commands(100)
+
+    assert len(commands) == 100
+    assert len({name for name, _ in commands}) == 100
+    assert len({syntax for _, syntax in commands}) == 100
+
+
+def test_check_near_linear():
+    linear = {100: 0.05, 1000: 0.4, 10000: 4.2}
+    quadratic = {100: 0.05, 1000: 0.4, 10000: 40.0}
+
+    assert [round(k, 2) for _, _, k in growth_exponents(linear)] == [0.9, 1.02]
+    assert check_near_linear(linear) == []
+    assert check_near_linear(quadratic) == ['1000 -> 10000 commands: time grows as size^2.00']
+    assert check_near_linear(quadratic, max_exponent=2.5) == []
+
+
+def test_measure_normalize_stage():
+    result = measure_size(50, repetitions=1, stage='normalize')
+
+    assert result.name == 'normalize_50'
+    assert len(result.samples) == 1
+    assert result.median() > 0
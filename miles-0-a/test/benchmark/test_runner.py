@@ -0,0 +1,31 @@
+from src.benchmark.runner import measure, compare, ScenarioResult, to_json, from_json
+from src.benchmark.scenario import Scenario
+
+
+def test_measure():
+    calls = []
+
+    def setup():
+        calls.append('setup')
+        return lambda: calls.append('run')
+
+    result = measure(Scenario('counter', 'counts the runs', setup, warmup=2, repetitions=3))
+
+    assert calls == ['setup'] + ['run'] * 5
+    assert len(result.samples) == 3
+    assert result.min() <= result.median() <= result.p95()
+
+
+def test_compare():
+    baseline = {'fast': ScenarioResult('fast', [0.010, 0.011, 0.012]),
+                'noise': ScenarioResult('noise', [0.0001])}
+    results = {'fast': ScenarioResult('fast', [0.020, 0.021, 0.022]),
+               'noise': ScenarioResult('noise', [0.0003]),
+               'new': ScenarioResult('new', [1.0])}
+
+    regressions = compare(results, baseline, tolerance=0.2)
+
+    assert [r.name for r in regressions] == ['fast']
+    assert regressions[0].ratio() > 1.5
+    restored = from_json(to_json(results, {}))
+    assert restored['fast'].samples == results['fast'].samples
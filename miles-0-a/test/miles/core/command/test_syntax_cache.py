@@ -0,0 +1,21 @@
+from src.miles.core.command.generic_command_processor import GenericCommandProcessor
+from src.miles.core.command.syntax_cache import command_to_list, command_from_list, SyntaxCache
+
+
+def test_command_round_trip():
+    command = GenericCommandProcessor().process('(ADD, DRAW) { color } [ shape ] item=(RED, BLUE) AT coordinates')
+
+    data = command_to_list(command)
+    restored = command_from_list(data)
+
+    assert str(restored) == str(command)
+    assert command_to_list(restored) == data
+
+
+def test_syntax_is_parsed_once():
+    syntax = 'SYNTAX { CACHE } test'
+    first = GenericCommandProcessor().process(syntax)
+    second = GenericCommandProcessor().process(syntax)
+
+    assert second is first
+    assert SyntaxCache().get(syntax) is first
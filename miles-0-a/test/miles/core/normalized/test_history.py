@@ -0,0 +1,40 @@
+from src.miles.core.normalized.history import NorHistory, HistoryItem
+from src.miles.core.recognizer.normalized_matcher import NormalizedNode, HistoryNodeType
+
+
+def _word_item(word: str, position: int) -> HistoryItem:
+    node = NormalizedNode(HistoryNodeType.WORD, word, None)
+    return HistoryItem(node=node, prev_point=position, included=[word], next_point=position + 1, result=word)
+
+
+def test_extend_keeps_origin():
+    empty = NorHistory()
+    first = empty.extend(_word_item('A', 0))
+    second = first.extend(_word_item('B', 1))
+
+    assert len(empty) == 0
+    assert len(first) == 1
+    assert len(second) == 2
+    assert [i.node.argument for i in first.all_items()] == ['A']
+    assert [i.node.argument for i in second.all_items()] == ['A', 'B']
+    assert second.last().node.argument == 'B'
+
+
+def test_shared_prefix():
+    common = NorHistory().extend(_word_item('A', 0))
+    left = common.extend(_word_item('B', 1))
+    right = common.extend(_word_item('C', 1))
+
+    assert [i.node.argument for i in left.all_items()] == ['A', 'B']
+    assert [i.node.argument for i in right.all_items()] == ['A', 'C']
+    assert left != right
+
+
+def test_equality():
+    items = [_word_item('A', 0), _word_item('B', 1)]
+    built = NorHistory(items)
+    extended = NorHistory().extend(_word_item('A', 0)).extend(_word_item('B', 1))
+
+    assert built == extended
+    assert built.all_items() == items
+    assert built != NorHistory(items[:1])
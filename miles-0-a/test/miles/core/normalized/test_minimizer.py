@@ -0,0 +1,66 @@
+from src.miles.core.normalized.matcher_minimizer import minimize, equivalence_classes
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedState, NormalizedConnection, \
+    NormalizedNode, HistoryNodeType
+
+
+def _connection(connection_id: int, *nodes: NormalizedNode) -> NormalizedConnection:
+    return NormalizedConnection(connection_id, list(nodes))
+
+
+def _word(word: str) -> NormalizedNode:
+    return NormalizedNode(HistoryNodeType.WORD, word, None)
+
+
+def _label(name: str) -> NormalizedNode:
+    return NormalizedNode(HistoryNodeType.AUTOMATIC, f'recognize {name}', None)
+
+
+def _create_matcher() -> NormalizedMatcher:
+    """
+    RED AT X -> first, GREEN AT X -> first, MOVE AT X -> second
+    """
+    states = [NormalizedState(i, False) for i in range(8)] + [NormalizedState(8, True), NormalizedState(9, True)]
+    initial, red, green, move, red_at, green_at, move_at, _, first, second = states
+    initial.add_connection(_connection(1, _word('red')), red)
+    initial.add_connection(_connection(2, _word('green')), green)
+    initial.add_connection(_connection(3, _word('move')), move)
+    red.add_connection(_connection(4, _word('at')), red_at)
+    green.add_connection(_connection(5, _word('at')), green_at)
+    move.add_connection(_connection(6, _word('at')), move_at)
+    red_at.add_connection(_connection(7, _word('x'), _label('first')), first)
+    green_at.add_connection(_connection(8, _word('x'), _label('first')), first)
+    move_at.add_connection(_connection(9, _word('x'), _label('second')), second)
+    return NormalizedMatcher(initial)
+
+
+def _paths(state: NormalizedState, prefix=()):
+    if state.is_final():
+        return [prefix]
+    result = []
+    for connection, destination, _ in state.transitions():
+        result += _paths(destination, prefix + tuple(node.argument for node in connection.get_nodes()))
+    return result
+
+
+def test_equivalence_classes():
+    states, classes = equivalence_classes(_create_matcher())
+    by_id = {state.get_id(): c for state, c in zip(states, classes)}
+
+    assert by_id[1] == by_id[2]
+    assert by_id[4] == by_id[5]
+    assert by_id[1] != by_id[3]  # the labels of the commands differ
+    assert by_id[8] == by_id[9]  # final states without connections
+    assert len(set(classes)) == 6
+
+
+def test_minimize_keeps_paths():
+    matcher = _create_matcher()
+    minimized = minimize(matcher)
+
+    assert _paths(minimized.initial_state()) == _paths(matcher.initial_state())
+    initial = minimized.initial_state()
+    red, green, move = [destination for _, destination, _ in initial.transitions()]
+    assert red is green
+    assert red.get_id() == 1
+    assert move is not red
+    assert [c.get_id() for c in red.all_connections()] == [4]
@@ -0,0 +1,120 @@
+from typing import List, Tuple
+
+from src.miles.core.matcher.matcher import Matcher, MatchState, MatchConnection, ConnectionType
+from src.miles.core.normalized.matcher_normalizer import _get_normalized_collection, normalize
+from src.miles.core.normalized.normalization_stats import normalization_stats
+from src.miles.utils.string_builder import lines
+
+A = ConnectionType.AUTOMATIC
+W = ConnectionType.WORD
+
+
+def _matcher(transitions: List[Tuple[int, int, ConnectionType, str]]) -> Matcher:
+    """
+    States with id > 100 are final, 0 is the initial state
+    """
+    states = {0: MatchState.initial()}
+    for from_id, to_id, connection_type, arg in transitions:
+        for state_id in (from_id, to_id):
+            if state_id not in states:
+                states[state_id] = MatchState(state_id, state_id > 100)
+        states[from_id].add_connection(MatchConnection(connection_type, arg), 0, states[to_id])
+    return Matcher(states[0])
+
+
+def test_automatic_paths_shared_by_states():
+    matcher = _matcher([
+        (0, 1, W, 'a'),
+        (0, 2, W, 'b'),
+        (1, 3, A, 'c'),
+        (2, 3, A, 'd'),
+        (3, 4, A, 'e'),
+        (4, 101, W, 'f'),
+        (3, 101, A, 'g'),
+    ])
+    assert (
+            lines(
+                ["0 ->",
+                 "a -- 1",
+                 "b -- 2",
+                 "1 ->",
+                 "cef -- 101",
+                 "cg -- 101",
+                 "2 ->",
+                 "def -- 101",
+                 "dg -- 101"]
+            ) == _get_normalized_collection(matcher).sprint())
+
+
+def test_automatic_loop_entered_from_both_sides():
+    matcher = _matcher([
+        (0, 1, W, 'a'),
+        (0, 2, W, 'b'),
+        (1, 3, A, 'c'),
+        (2, 4, A, 'd'),
+        (3, 4, A, 'e'),
+        (4, 3, A, 'f'),
+        (3, 101, W, 'x'),
+        (4, 101, W, 'y'),
+    ])
+    assert (
+            lines(
+                ["0 ->",
+                 "a -- 1",
+                 "b -- 2",
+                 "1 ->",
+                 "cey -- 101",
+                 "cx -- 101",
+                 "2 ->",
+                 "dfx -- 101",
+                 "dy -- 101"]
+            ) == _get_normalized_collection(matcher).sprint())
+
+
+def test_equal_connections_share_nodes():
+    matcher = _matcher([
+        (0, 1, W, 'a'),
+        (0, 2, W, 'b'),
+        (1, 3, A, 'c'),
+        (2, 3, A, 'c'),
+        (3, 101, W, 'x'),
+    ])
+    initial = normalize(matcher).initial_state()
+    first, second = [destination for _, destination, _ in initial.transitions()]
+    [(first_connection, _, _)] = first.transitions()
+    [(second_connection, _, _)] = second.transitions()
+
+    assert [node.argument for node in first_connection.get_nodes()] == ['c', 'x']
+    assert first_connection.get_nodes()[0] is second_connection.get_nodes()[0]
+    assert first_connection.get_id() != second_connection.get_id()
+
+
+def test_shared_states_bound_fan_out():
+    # three independent pairs of automatic ways: 8 paths from the initial state
+    transitions = []
+    for i in range(3):
+        transitions += [(i * 2, i * 2 + 1, A, 'skip'), (i * 2, i * 2 + 1, A, 'take')]
+        transitions += [(i * 2 + 1, i * 2 + 2, A, 'next')]
+    transitions += [(6, 101, W, 'end')]
+    matcher = _matcher(transitions)
+
+    full = normalization_stats(normalize(matcher))
+    assert (full.max_fan_out, full.shared_states) == (8, 0)
+
+    bounded = normalize(matcher, max_fan_out=4)
+    stats = normalization_stats(bounded)
+    assert stats.max_fan_out <= 4
+    assert stats.shared_states > 0
+
+    def words(state, prefix):
+        result = []
+        for connection, destination, _ in state.transitions():
+            path = prefix + [node.argument for node in connection.get_nodes()]
+            if destination.is_final():
+                result.append(' '.join(path))
+            else:
+                result += words(destination, path)
+        return result
+
+    assert words(bounded.initial_state(), []) == words(normalize(matcher).initial_state(), [])
+
@@ -0,0 +1,68 @@
+from src.miles.core.recognizer.analyzer_memo import AnalyzerMemo
+from src.miles.core.recognizer.compiled_matcher import compile_matcher
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedState, NormalizedNode, \
+    HistoryNodeType
+from src.miles.core.recognizer.recognizer_pointer import RecPointer
+from src.miles.shared.context.data_holder import TextDataHolder
+from src.miles.shared.context.flags import Flags
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+
+
+class _CountingAnalyzer(TypedContextAnalyzer):
+    def __init__(self, pure: bool):
+        self.calls = 0
+        self.pure = pure
+
+    def invoke(self, context: TextRecognizeContext):
+        self.calls += 1
+        context.consume(interrupted=True)
+        context.consume()
+
+    def is_pure(self) -> bool:
+        return self.pure
+
+
+def _advance_twice(analyzer: _CountingAnalyzer, memo: AnalyzerMemo, flags: Flags):
+    state = compile_matcher(NormalizedMatcher(NormalizedState(0, False))).initial_state()
+    data = TextDataHolder(['a', 'b', 'c'])
+    node = NormalizedNode(HistoryNodeType.MATCHING, 'counting', None)
+    first = RecPointer(state, data, current_position=1, flags=flags).advance_with_analyzer(node, analyzer, memo)
+    second = RecPointer(state, data, current_position=1, flags=flags).advance_with_analyzer(node, analyzer, memo)
+    return first, second
+
+
+def test_pure_analyzer_is_memoized():
+    analyzer = _CountingAnalyzer(pure=True)
+    memo = AnalyzerMemo()
+    first, second = _advance_twice(analyzer, memo, Flags())
+
+    assert analyzer.calls == 1
+    assert memo.hits() == 1
+    assert memo.misses() == 1
+    assert [p.get_position() for p in first] == [2, 3]
+    assert [p.get_position() for p in second] == [2, 3]
+    assert [p.get_history().last().included for p in second] == [['b'], ['b', 'c']]
+
+
+def test_impure_analyzer_is_not_memoized():
+    analyzer = _CountingAnalyzer(pure=False)
+    memo = AnalyzerMemo()
+    _advance_twice(analyzer, memo, Flags())
+
+    assert analyzer.calls == 2
+    assert memo.hits() == 0
+    assert memo.misses() == 0
+
+
+def test_named_nodes_are_memoized_separately():
+    analyzer = _CountingAnalyzer(pure=True)
+    memo = AnalyzerMemo()
+    state = compile_matcher(NormalizedMatcher(NormalizedState(0, False))).initial_state()
+    data = TextDataHolder(['a', 'b', 'c'])
+    for name in ['start', 'end', 'start']:
+        node = NormalizedNode(HistoryNodeType.MATCHING, 'counting', name)
+        RecPointer(state, data, current_position=1).advance_with_analyzer(node, analyzer, memo)
+
+    assert analyzer.calls == 2
+    assert memo.hits() == 1
@@ -0,0 +1,78 @@
+from src.miles.core.recognizer.compiled_matcher import compile_matcher
+from src.miles.core.recognizer.normalized_matcher import NormalizedMatcher, NormalizedState, NormalizedConnection, \
+    NormalizedNode, HistoryNodeType
+
+
+def _word(connection_id: int, word: str) -> NormalizedConnection:
+    return NormalizedConnection(connection_id, [NormalizedNode(HistoryNodeType.WORD, word, None)])
+
+
+def _create_matcher() -> NormalizedMatcher:
+    initial = NormalizedState(0, False)
+    middle = NormalizedState(1, False)
+    final = NormalizedState(2, True)
+    initial.add_connection(_word(1, 'a'), middle, 1)
+    initial.add_connection(_word(2, 'b'), final, 5)
+    initial.add_connection(_word(3, 'c'), final, 1)
+    middle.add_connection(_word(4, 'd'), final, 0)
+    return NormalizedMatcher(initial)
+
+
+def test_compiled_structure():
+    compiled = compile_matcher(_create_matcher())
+
+    assert compiled.size() == 3
+    assert compiled.transition_count() == 4
+    initial = compiled.initial_state()
+    assert initial.get_id() == 0
+    assert not initial.is_final()
+    assert initial.transition_count() == 3
+
+    destinations = [compiled.destination(t).get_id() for t in initial.transitions()]
+    assert destinations == [1, 2, 2]
+    assert [compiled.nodes(t)[0].argument for t in initial.transitions()] == ['a', 'b', 'c']
+
+
+def test_ordered_transitions_are_stable():
+    compiled = compile_matcher(_create_matcher())
+    initial = compiled.initial_state()
+
+    ordered = [compiled.nodes(t)[0].argument for t in initial.ordered_transitions()]
+    assert ordered == ['b', 'a', 'c']
+    assert [compiled.priority(t) for t in initial.ordered_transitions()] == [5, 1, 1]
+
+
+def test_first_word_dispatch():
+    initial = NormalizedState(0, False)
+    final = NormalizedState(1, True)
+    automatic = NormalizedNode(HistoryNodeType.AUTOMATIC, 'auto', None)
+    initial.add_connection(_word(1, 'Set'), final, 0)
+    initial.add_connection(NormalizedConnection(2, [NormalizedNode(HistoryNodeType.MATCHING, 'number', None)]),
+                           final, 3)
+    initial.add_connection(NormalizedConnection(3, [automatic, NormalizedNode(HistoryNodeType.WORD, 'set', None)]),
+                           final, 5)
+    initial.add_connection(_word(4, 'move'), final, 1)
+    compiled = compile_matcher(NormalizedMatcher(initial))
+    state = compiled.initial_state()
+
+    def ids(transitions):
+        return [compiled.connection(t).get_id() for t in transitions]
+
+    assert ids(state.candidates('SET')) == [3, 2, 1]
+    assert ids(state.candidates('move')) == [2, 4]
+    assert ids(state.candidates('other')) == [2]
+    assert ids(state.candidates(None)) == [2]
+
+
+def test_expectations():
+    initial = NormalizedState(0, False)
+    final = NormalizedState(1, True)
+    automatic = NormalizedNode(HistoryNodeType.AUTOMATIC, 'auto', None)
+    initial.add_connection(_word(1, 'set'), final, 0)
+    initial.add_connection(NormalizedConnection(2, [automatic, NormalizedNode(HistoryNodeType.MATCHING, 'n', None)]),
+                           final, 3)
+    initial.add_connection(NormalizedConnection(3, [automatic]), final, 1)
+    compiled = compile_matcher(NormalizedMatcher(initial))
+
+    expectations = [(compiled.connection(t).get_id(), first) for t, first in compiled.initial_state().expectations()]
+    assert expectations == [(2, 1), (3, None), (1, 0)]
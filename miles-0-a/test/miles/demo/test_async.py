@@ -0,0 +1,123 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.miles.core.recognizer.recognizer_error import RecognitionCancelled
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.extended import ExtendedCore
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+
+class AsyncExecutor(CommandExecutor):
+
+    async def on_recognize(self, command_structure: CommandStructure, context):
+        await asyncio.sleep(0)
+        context.append(command_structure.get_command_name())
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class BlockingAnalyzer(TypedContextAnalyzer):
+    def __init__(self):
+        self.calls = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def invoke(self, context: TextRecognizeContext):
+        self.calls += 1
+        self.entered.set()
+        self.release.wait(timeout=10)
+        context.consume()
+
+
+def test_async_recognize_and_execute():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("async")
+    namespace_init = plugin_register.add_namespace("async", "async")
+    namespace_init.add_command("hello", "HELLO", AsyncExecutor())
+    matching_core: MatchingCore = create_matching_core()
+
+    async def run():
+        executed = []
+        result = await matching_core.arecognize("hello", namespace="async")
+        await matching_core.arecognize_and_execute("hello", namespace="async", context=executed)
+        return result, executed
+
+    result, executed = asyncio.run(run())
+    matching_core.close()
+    assert result.get_command_name() == "hello"
+    assert executed == ["hello"]
+
+
+def test_async_cancel():
+    analyzer = BlockingAnalyzer()
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("slow_cancel")
+    namespace_init = plugin_register.add_namespace("slow_cancel", "slow_cancel")
+    namespace_init.add_command("long", "slow slow slow", NoExecutor())
+    namespace_init.add_matching("slow", analyzer)
+    matching_core: MatchingCore = create_matching_core()
+
+    async def run():
+        task = asyncio.create_task(matching_core.arecognize("a b c", namespace="slow_cancel"))
+        while not analyzer.entered.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    analyzer.release.set()
+    matching_core.close()
+    assert analyzer.calls == 1
+
+
+class CancellingAnalyzer(TypedContextAnalyzer):
+    def invoke(self, context: TextRecognizeContext):
+        context.budget().cancel()
+        context.consume()
+
+
+class CountingAnalyzer(TypedContextAnalyzer):
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, context: TextRecognizeContext):
+        self.calls += 1
+        context.consume()
+
+
+class InnerAnalyzer(TypedContextAnalyzer):
+    def __init__(self):
+        self._core = ExtendedCore(plugin='cancel_inside', namespace='cancel_inside', matching='inner')
+        self._core.init_commands([('inner', 'cancel after')])
+
+    def invoke(self, context: TextRecognizeContext):
+        for s in self._core.recognize_extended(context=context):
+            context.variant(s.size())
+
+
+def test_cancelled_budget():
+    after = CountingAnalyzer()
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("cancel_inside")
+    namespace_init = plugin_register.add_namespace("cancel_inside", "cancel_inside")
+    namespace_init.add_command("outer", "inner", NoExecutor())
+    namespace_init.add_matching("inner", InnerAnalyzer())
+    namespace_init.add_matching("cancel", CancellingAnalyzer())
+    namespace_init.add_matching("after", after)
+    matching_core: MatchingCore = create_matching_core()
+
+    with pytest.raises(RecognitionCancelled):
+        matching_core.recognize("a b", namespace="cancel_inside", timeout=10)
+    assert after.calls == 0  # the nested recognition stops before its next expansion
@@ -0,0 +1,56 @@
+import pickle
+
+from src.miles.core.recognizer.recognizer_error import RecognizerError, RecognizerBudgetExceeded
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+_core: MatchingCore | None = None
+
+
+def _get_core() -> MatchingCore:
+    global _core
+    if _core is not None:
+        return _core
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("batch")
+    namespace_init = plugin_register.add_namespace("batch", "batch")
+    namespace_init.add_command("clear", "CLEAR ALL", NoExecutor())
+    namespace_init.add_command("add", "ADD RED CIRCLE", NoExecutor())
+    _core = create_matching_core()
+    return _core
+
+
+def _check(results):
+    assert [r.get_command_name() if isinstance(r, CommandStructure) else 'error' for r in results] == \
+           ['clear', 'add', 'error', 'clear']
+    assert isinstance(results[2], RecognizerError)
+    assert results[0] is not results[3]
+
+
+def test_batch():
+    matching_core = _get_core()
+    commands = ["clear all", "add red circle", "add blue circle", "clear all"]
+
+    _check(matching_core.recognize_many(commands, namespace="batch"))
+    _check(matching_core.recognize_many(commands, namespace="batch", workers=2))
+
+
+def test_pickle():
+    structure = _get_core().recognize("batch clear all")
+    restored = pickle.loads(pickle.dumps(structure))
+    assert restored.get_command_name() == "clear"
+    assert restored.get_input() == structure.get_input()
+
+    error = pickle.loads(pickle.dumps(RecognizerBudgetExceeded(5, 0.5)))
+    assert error.expanded == 5
+    assert str(error) == str(RecognizerBudgetExceeded(5, 0.5))
@@ -0,0 +1,40 @@
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.recognition_stats import RecognitionStats
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class AnyTokenAnalyzer(TypedContextAnalyzer):
+    def __init__(self, certainty: float):
+        self.certainty = certainty
+
+    def invoke(self, context: TextRecognizeContext):
+        context.consume(certainty=self.certainty)
+
+
+def test_beam():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("beam")
+    namespace_init = plugin_register.add_namespace("beam", "beam")
+    for certainty in [30, 90, 60]:
+        namespace_init.add_command(f"c{certainty}", f"any{certainty} DONE", NoExecutor())
+        namespace_init.add_matching(f'any{certainty}', AnyTokenAnalyzer(certainty))
+    matching_core: MatchingCore = create_matching_core()
+
+    stats = RecognitionStats()
+    assert matching_core.recognize("x done", namespace="beam", beam_width=1, stats=stats).get_command_name() == "c90"
+    assert stats.pruned == 2
+
+    stats = RecognitionStats()
+    assert matching_core.recognize("x done", namespace="beam", beam_width=3, stats=stats).get_command_name() == "c90"
+    assert stats.pruned == 0
@@ -0,0 +1,47 @@
+from src.miles.core.recognizer.search_strategy import SearchStrategy, ScoreCombination
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class GuessAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        context.consume(certainty=30)
+
+
+class SureAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        if context.current().lower() == 'circle':
+            context.consume(certainty=90)
+        else:
+            context.fail()
+
+
+def test_best_first():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("best_first")
+    namespace_init = plugin_register.add_namespace("best_first", "best first")
+    namespace_init.add_command("guess", "guess guess", NoExecutor())
+    namespace_init.add_command("sure", "sure guess", NoExecutor())
+    namespace_init.add_matching('guess', GuessAnalyzer())
+    namespace_init.add_matching('sure', SureAnalyzer())
+    namespace_init.set_search_strategy(SearchStrategy.BEST_FIRST)
+
+    matching_core: MatchingCore = create_matching_core()
+    assert matching_core.recognize("circle at", namespace="best_first").get_command_name() == "sure"
+
+    namespace_init.set_score_combination(ScoreCombination.MINIMUM)
+    matching_core = create_matching_core()
+    assert matching_core.recognize("circle at", namespace="best_first").get_command_name() == "sure"
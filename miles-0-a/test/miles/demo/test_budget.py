@@ -0,0 +1,99 @@
+import pytest
+
+from src.miles.core.recognizer.recognizer_error import RecognizerBudgetExceeded
+from src.miles.core.recognizer.search_strategy import SearchStrategy
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.extended import ExtendedCore
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.recognition_stats import RecognitionStats
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class AnyTokenAnalyzer(TypedContextAnalyzer):
+    def __init__(self, certainty: float):
+        self.certainty = certainty
+
+    def invoke(self, context: TextRecognizeContext):
+        context.consume(certainty=self.certainty)
+
+
+def test_budget():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("budget")
+    namespace_init = plugin_register.add_namespace("budget", "budget")
+    namespace_init.add_command("weak", "weak", NoExecutor())
+    namespace_init.add_command("strong", "strong", NoExecutor())
+    namespace_init.add_command("long", "strong strong strong", NoExecutor())
+    namespace_init.add_matching('weak', AnyTokenAnalyzer(40))
+    namespace_init.add_matching('strong', AnyTokenAnalyzer(90))
+    namespace_init.set_search_strategy(SearchStrategy.BEST_FIRST)
+    matching_core: MatchingCore = create_matching_core()
+
+    with pytest.raises(RecognizerBudgetExceeded) as exc_info:
+        matching_core.recognize("x", namespace="budget", max_expansions=1)
+    assert exc_info.value.expanded == 1
+
+    stats = RecognitionStats()
+    result = matching_core.recognize("x", namespace="budget", max_expansions=2, stats=stats)
+    assert result.get_command_name() == "strong"
+    assert stats.expanded == 2
+
+    assert matching_core.recognize("x y z", namespace="budget", timeout=10).get_command_name() == "long"
+
+
+class ChainAnalyzer(TypedContextAnalyzer):
+    def __init__(self, namespace: str):
+        self._core = ExtendedCore(plugin=namespace, namespace=namespace, matching='chain')
+        self._core.init_commands([('link', 'Z chain'), ('last', 'Z')])
+
+    def invoke(self, context: TextRecognizeContext):
+        structures = self._core.recognize_extended(context=context)
+        if not structures:
+            context.fail()
+            return
+        for s in structures:
+            context.variant(s.size())
+
+
+def test_budget_of_nested_recognition():
+    plugin_register = MilesRegister().create_plugin_register("limited")
+    namespace_init = plugin_register.add_namespace("limited", "limited")
+    namespace_init.add_command("chain", "chain", NoExecutor())
+    namespace_init.add_matching('chain', ChainAnalyzer('limited'))
+    matching_core: MatchingCore = create_matching_core()
+    command = ' '.join(['z'] * 30)
+
+    assert matching_core.recognize(command, namespace="limited").get_command_name() == "chain"
+
+    stats = RecognitionStats()
+    with pytest.raises(RecognizerBudgetExceeded) as exc_info:
+        matching_core.recognize(command, namespace="limited", max_expansions=20, stats=stats)
+    assert stats.expanded == 1  # the nested recognitions used the budget in the first expansion
+    assert exc_info.value.expanded == 20
+
+
+def test_budget_of_late_nested_recognition():
+    plugin_register = MilesRegister().create_plugin_register("late")
+    namespace_init = plugin_register.add_namespace("late", "late")
+    namespace_init.add_command("chain", "Y Y Y Y Y Y Y Y chain", NoExecutor())
+    namespace_init.add_matching('chain', ChainAnalyzer('late'))
+    matching_core: MatchingCore = create_matching_core()
+    command = ' '.join(['y'] * 8 + ['z'] * 30)
+
+    assert matching_core.recognize(command, namespace="late").get_command_name() == "chain"
+
+    stats = RecognitionStats()
+    with pytest.raises(RecognizerBudgetExceeded) as exc_info:
+        matching_core.recognize(command, namespace="late", max_expansions=12, stats=stats)
+    assert stats.expanded == 9
+    assert exc_info.value.expanded == 12  # the nested recognition used only what the command reader left
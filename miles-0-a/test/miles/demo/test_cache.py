@@ -0,0 +1,43 @@
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.recognition_cache import RecognitionCache
+from src.miles.shared.recognition_stats import RecognitionStats
+from src.miles.shared.register import MilesRegister
+from test.miles.demo.output_context import OutputContext
+
+
+class NameExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context: OutputContext):
+        context.set(command_structure.get_command_name())
+
+
+def test_cache():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("cache")
+    namespace_init = plugin_register.add_namespace("cache", "cache")
+    namespace_init.add_command("clear", "CLEAR ALL", NameExecutor())
+    namespace_init.add_command("add", "ADD RED CIRCLE", NameExecutor())
+    cache = RecognitionCache(max_size=8)
+    matching_core: MatchingCore = create_matching_core(cache=cache)
+
+    first = matching_core.recognize("clear all", namespace="cache")
+    stats = RecognitionStats()
+    second = matching_core.recognize("clear all", namespace="cache", stats=stats)
+
+    assert first.get_command_name() == second.get_command_name() == "clear"
+    assert first is not second
+    assert stats.expanded == 0
+    assert cache.hits() == 1
+    assert cache.misses() == 1
+
+    output_context = OutputContext()
+    matching_core.recognize_and_execute("cache add red circle", context=output_context)
+    assert output_context.get() == "add"
+    matching_core.recognize_and_execute("cache add red circle", context=output_context)
+    assert cache.hits() == 2
+
+    create_matching_core(cache=cache)
+    assert cache.size() == 0
@@ -0,0 +1,51 @@
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class PairAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        if len(context.lookahead(2)) < 2:
+            context.fail()
+            return
+        context.consume(2)
+
+
+def test_complete():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("complete")
+    namespace_init = plugin_register.add_namespace("complete", "complete")
+    namespace_init.add_command("move", "MOVE TO pair", NoExecutor())
+    namespace_init.add_command("mark", "MOVE MARK", NoExecutor())
+    namespace_init.add_command("stop", "STOP", NoExecutor())
+    namespace_init.add_matching("pair", PairAnalyzer())
+    matching_core: MatchingCore = create_matching_core()
+
+    start = matching_core.complete("", "complete")
+    assert sorted(start.words()) == ["MOVE", "STOP"]
+    assert not start.is_complete()
+
+    after_move = matching_core.complete("move", "complete")
+    assert sorted(after_move.words()) == ["MARK", "TO"]
+    assert after_move.matchings() == []
+
+    assert matching_core.complete("move to", "complete").matchings() == ["pair"]
+    assert matching_core.complete("move to 1", "complete").matchings() == ["pair"]
+
+    finished = matching_core.complete("move to 1 2", "complete")
+    assert finished.is_complete()
+    assert finished.expected() == []
+
+    wrong = matching_core.complete("jump", "complete")
+    assert not wrong.is_viable()
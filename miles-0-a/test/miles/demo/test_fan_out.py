@@ -0,0 +1,78 @@
+import pytest
+
+import src.miles.core.plugin.pipeline as pipeline
+from src.miles.core.priority.priority_config import PriorityStrategy
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.priority.priority_rule import GeneralWordRule
+from src.miles.shared.register import MilesRegister
+
+NESTED = "OPEN {{A}} {{B}} {{C}} {{D}} {{E}} {{F}} {{G}} {{H}}"
+REPEATED = "OPEN {{A}} {{A}} {{A}} {{A}} {{A}} {{A}} {{A}} {{A}}"
+INPUTS = [
+    "nested open",
+    "nested open a",
+    "nested open b d f h",
+    "nested open a b c d e f g h",
+    "nested open h",
+]
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+def _tree(node):
+    return node.node_type(), node.number(), node.value(), [_tree(child) for child in node.children()]
+
+
+def _recognized(core, inputs):
+    return [_tree(core.recognize(command).get_root()) for command in inputs]
+
+
+def test_fan_out(monkeypatch):
+    plugin_register = MilesRegister().create_plugin_register("fan_out")
+    namespace_init = plugin_register.add_namespace("nested", "nested")
+    namespace_init.add_command("open", NESTED, NoExecutor())
+
+    monkeypatch.setattr(pipeline, "MAX_FAN_OUT", None)
+    unbounded = create_matching_core()
+    monkeypatch.setattr(pipeline, "MAX_FAN_OUT", 8)
+    bounded = create_matching_core()
+
+    before = unbounded.normalization_stats()["nested"]
+    after = bounded.normalization_stats()["nested"]
+    assert before.connections_before == after.connections_before
+    assert before.max_fan_out == 511
+    assert before.shared_states == 0
+    assert after.max_fan_out <= 8
+    assert after.shared_states > 0
+    assert after.connections_after < before.connections_after
+    assert "nested" in bounded.normalization_report()
+
+    assert _recognized(bounded, INPUTS) == _recognized(unbounded, INPUTS)
+    completion = bounded.complete("nested open b", "nested")
+    assert completion.words() == unbounded.complete("nested open b", "nested").words()
+
+
+@pytest.mark.parametrize("prefix, strategy", [("maximal", PriorityStrategy.FIND_MAX),
+                                              ("primary", PriorityStrategy.FIRST)])
+def test_fan_out_with_priorities(monkeypatch, prefix, strategy):
+    plugin_register = MilesRegister().create_plugin_register(f"fan_out_{prefix}")
+    namespace_init = plugin_register.add_namespace(prefix, prefix)
+    namespace_init.add_command("open", REPEATED, NoExecutor())
+    namespace_init.set_priority_strategy(strategy)
+    namespace_init.add_static_priority_rule(GeneralWordRule(5))
+    inputs = [f"{prefix} open a", f"{prefix} open a a", f"{prefix} open a a a a a a a a"]
+
+    monkeypatch.setattr(pipeline, "MAX_FAN_OUT", None)
+    unbounded = create_matching_core()
+    monkeypatch.setattr(pipeline, "MAX_FAN_OUT", 8)
+    bounded = create_matching_core()
+
+    # shared states would change the order of the paths with different priorities
+    assert bounded.normalization_stats()[prefix].shared_states == 0
+    assert _recognized(bounded, inputs) == _recognized(unbounded, inputs)
@@ -0,0 +1,81 @@
+from src.miles.core.normalized.matcher_serializer import matcher_to_dict
+from src.miles.core.plugin.grammar_cache import grammar_key
+from src.miles.core.plugin.register_to_definitions import map_register_to_definition
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.priority.dynamic_priority import DynamicPriorityRule, DynamicPriorityContext
+from src.miles.shared.register import MilesRegister
+
+
+class RecordingExecutor(CommandExecutor):
+
+    def __init__(self):
+        self.executed = []
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        self.executed.append(command_structure.get_command_name())
+
+
+class NumberAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        if context.current().isdigit():
+            context.consume()
+        else:
+            context.fail()
+
+
+class NeverRule(DynamicPriorityRule):
+
+    def is_applicable(self, context: DynamicPriorityContext) -> bool:
+        return False
+
+    def priority(self, context: DynamicPriorityContext) -> int:
+        return 0
+
+
+def _matchers(core):
+    return [matcher_to_dict(namespace.command_matcher)
+            for structure in core._plugin_structures for namespace in structure.namespaces]
+
+
+def test_grammar_cache(tmp_path):
+    executor = RecordingExecutor()
+    plugin_register = MilesRegister().create_plugin_register("grammar_cache")
+    namespace_init = plugin_register.add_namespace("grammar_cache", "stored")
+    namespace_init.add_command("move", "MOVE { TO } number number", executor)
+    namespace_init.add_command("clear", "CLEAR [ ALL ]", executor)
+    namespace_init.add_matching("number", NumberAnalyzer())
+
+    built = create_matching_core(cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("grammar-*.json"))) == 1
+    assert (tmp_path / "syntax-commands.json").exists()
+    loaded = create_matching_core(cache_dir=tmp_path)
+
+    assert _matchers(loaded) == _matchers(built)
+    loaded.recognize_and_execute("stored move to 10 20")
+    loaded.recognize_and_execute("stored clear all all")
+    assert executor.executed == ["move", "clear"]
+
+    definitions = map_register_to_definition(MilesRegister())
+    key = grammar_key(definitions)
+    plugin = next(d for d in definitions if d.name() == "grammar_cache")
+    plugin.namespaces()[0].commands[0].syntax = "MOVE number number"
+    assert grammar_key(definitions) != key
+
+
+def test_grammar_cache_with_dynamic_priorities(tmp_path):
+    plugin_register = MilesRegister().create_plugin_register("grammar_cache_dynamic")
+    namespace_init = plugin_register.add_namespace("grammar_cache_dynamic", "retained")
+    namespace_init.add_command("open", "OPEN {{A}} {{B}} {{C}} {{D}} {{E}} {{F}} {{G}} {{H}}", RecordingExecutor())
+
+    bounded = create_matching_core(cache_dir=tmp_path)
+    assert bounded.normalization_stats()["grammar_cache_dynamic"].shared_states > 0
+
+    namespace_init.add_dynamic_priority_rule(NeverRule())
+    flat = create_matching_core(cache_dir=tmp_path)
+    assert flat.normalization_stats()["grammar_cache_dynamic"].shared_states == 0
+    assert len(list(tmp_path.glob("grammar-*.json"))) == 2
@@ -0,0 +1,50 @@
+from src.miles.core.plugin.grammar_cache import grammar_key
+from src.miles.core.plugin.register_to_definitions import map_register_to_definition
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class NumberAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        if context.current().isdigit():
+            context.consume()
+        else:
+            context.fail()
+
+
+def _recognized(core):
+    result = []
+    for command in ["shapes insert red square at 1 2", "shapes insert blue at 1 2", "shapes move 3 to 1 2",
+                    "shapes move 3 to coordinates 1 2", "shapes set 3 color green"]:
+        structure = core.recognize(command)
+        result.append((structure.get_command_name(), [str(node.node_type()) for node in structure.get_root()]))
+    return result
+
+
+def test_minimize():
+    plugin_register = MilesRegister().create_plugin_register("minimize")
+    namespace_init = plugin_register.add_namespace("shapes", "shapes")
+    namespace_init.add_command("insert", "INSERT (RED, GREEN, BLUE) {SQUARE} AT number number", NoExecutor())
+    namespace_init.add_command("move", "MOVE number TO {COORDINATES} number number", NoExecutor())
+    namespace_init.add_command("color", "SET number COLOR (RED, GREEN, BLUE)", NoExecutor())
+    namespace_init.add_matching("number", NumberAnalyzer())
+
+    full = create_matching_core()
+    key = grammar_key(map_register_to_definition(MilesRegister()))
+    namespace_init.set_minimize_matcher(True)
+    minimized = create_matching_core()
+
+    assert grammar_key(map_register_to_definition(MilesRegister())) != key
+    assert minimized.normalization_stats()["shapes"].states < full.normalization_stats()["shapes"].states
+    assert _recognized(minimized) == _recognized(full)
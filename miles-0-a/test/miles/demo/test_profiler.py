@@ -0,0 +1,104 @@
+import pytest
+
+from src.miles.core.recognizer.recognizer_error import RecognizerError
+from src.miles.shared.analyzer_profiler import AnalyzerProfiler, AnalyzerProfile
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.extended import ExtendedCore
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class SplitAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        context.variant(1)
+        context.consume(2)
+
+
+class DigitAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        if not context.current().isdigit():
+            context.fail()
+            return
+        context.consume()
+
+
+class PairAnalyzer(TypedContextAnalyzer):
+    def __init__(self):
+        self._core = ExtendedCore(plugin='inner_profile', namespace='inner_profile', matching='pair')
+        self._core.init_commands([('pair', 'digit digit')])
+
+    def invoke(self, context: TextRecognizeContext):
+        structures = self._core.recognize_extended(context=context)
+        if not structures:
+            context.fail()
+            return
+        for s in structures:
+            context.variant(s.size())
+
+
+def test_profiler():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("profiler")
+    namespace_init = plugin_register.add_namespace("profiler", "profiler")
+    namespace_init.add_command("split", "SPLIT split", NoExecutor())
+    namespace_init.add_command("digit", "DIGIT digit", NoExecutor())
+    namespace_init.add_matching("split", SplitAnalyzer())
+    namespace_init.add_matching("digit", DigitAnalyzer())
+    matching_core: MatchingCore = create_matching_core(profiler=AnalyzerProfiler())
+
+    matching_core.recognize("split a b", namespace="profiler")
+    matching_core.recognize("digit 1", namespace="profiler")
+    with pytest.raises(RecognizerError):
+        matching_core.recognize("digit x", namespace="profiler")
+
+    profile = matching_core.analyzer_profile()
+    assert profile["matching:split"]["calls"] == 1
+    assert profile["matching:split"]["variants"] == 2
+    assert profile["matching:digit"]["calls"] == 2
+    assert profile["matching:digit"]["successes"] == 1
+    assert profile["matching:digit"]["fails"] == 1
+    assert sum(profile["matching:digit"]["histogram"].values()) == 2
+    assert "matching:split" in matching_core.analyzer_report()
+
+    matching_core.profiler().reset()
+    assert matching_core.analyzer_profile() == {}
+
+
+def test_percentile():
+    profile = AnalyzerProfile()
+    for _ in range(9):
+        profile.add(0.000_002, 1)
+    profile.add(0.001, 0)
+
+    assert profile.calls == 10
+    assert profile.fails == 1
+    assert profile.percentile(0.5) <= 0.000_004
+    assert profile.percentile(0.95) == 0.001
+
+
+def test_profiler_of_nested_recognition():
+    plugin_register = MilesRegister().create_plugin_register("inner_profile")
+    namespace_init = plugin_register.add_namespace("inner_profile", "inner_profile")
+    namespace_init.add_command("pair", "PAIR pair", NoExecutor())
+    namespace_init.add_matching("pair", PairAnalyzer())
+    namespace_init.add_matching("digit", DigitAnalyzer())
+    matching_core: MatchingCore = create_matching_core(profiler=AnalyzerProfiler())
+
+    matching_core.recognize("pair 1 2", namespace="inner_profile")
+
+    profile = matching_core.analyzer_profile()
+    assert profile["matching:pair"]["calls"] == 1
+    assert profile["matching:digit"]["calls"] == 2
+    assert profile["matching:digit"]["successes"] == 2
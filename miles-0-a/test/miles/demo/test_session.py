@@ -0,0 +1,63 @@
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.recognition_stats import RecognitionStats
+from src.miles.shared.register import MilesRegister
+from src.miles.shared.session_status import SessionStatus
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class DigitAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        if context.is_empty() or not context.current().isdigit():
+            context.fail()
+            return
+        context.consume()
+
+
+def test_session():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("session")
+    namespace_init = plugin_register.add_namespace("session", "session")
+    namespace_init.add_command("sum", "SUM digit digit", NoExecutor())
+    namespace_init.add_command("clear", "CLEAR", NoExecutor())
+    namespace_init.add_matching("digit", DigitAnalyzer())
+    matching_core: MatchingCore = create_matching_core()
+    session = matching_core.session("session")
+
+    assert session.update("sum") == SessionStatus.VIABLE
+    assert session.result() is None
+    assert session.update("sum 1") == SessionStatus.VIABLE
+
+    stats = RecognitionStats()
+    assert session.update("sum 1 2", stats=stats) == SessionStatus.FINISHED
+    assert session.result().get_command_name() == "sum"
+    full_stats = RecognitionStats()
+    matching_core.recognize("sum 1 2", namespace="session", stats=full_stats)
+    assert stats.expanded < full_stats.expanded
+
+    assert session.update("sum 1 2 3") == SessionStatus.DEAD
+    assert str(session.error()) == str(_error_of(matching_core, "sum 1 2 3"))
+
+    assert session.update("sum x") == SessionStatus.DEAD
+    assert session.update("sum 7 8") == SessionStatus.FINISHED
+    assert session.result().get_command_name() == "sum"
+    assert session.update("clear") == SessionStatus.FINISHED
+    assert session.result().get_command_name() == "clear"
+
+
+def _error_of(matching_core: MatchingCore, command: str) -> Exception | None:
+    try:
+        matching_core.recognize(command, namespace="session")
+    except Exception as e:
+        return e
+    return None
@@ -0,0 +1,56 @@
+import pytest
+
+from src.miles.core.recognizer.recognizer_error import RecognizerError
+from src.miles.shared.context.text_recognize_context import TextRecognizeContext
+from src.miles.shared.context_analyzer import TypedContextAnalyzer
+from src.miles.shared.executor.command_executor import CommandExecutor
+from src.miles.shared.executor.command_structure import CommandStructure
+from src.miles.shared.matching_core import MatchingCore
+from src.miles.shared.matching_core_factory import create_matching_core
+from src.miles.shared.recognition_cache import RecognitionCache
+from src.miles.shared.recognition_stats import RecognitionStats
+from src.miles.shared.register import MilesRegister
+
+
+class NoExecutor(CommandExecutor):
+
+    def on_recognize(self, command_structure: CommandStructure, context):
+        pass
+
+
+class TokenAnalyzer(TypedContextAnalyzer):
+
+    def invoke(self, context: TextRecognizeContext):
+        context.consume()
+
+
+def test_stats():
+    register = MilesRegister()
+    plugin_register = register.create_plugin_register("stats")
+    namespace_init = plugin_register.add_namespace("stats", "stats")
+    namespace_init.add_command("pair", "PAIR token token", NoExecutor())
+    namespace_init.add_matching("token", TokenAnalyzer())
+    received = []
+    matching_core: MatchingCore = create_matching_core(cache=RecognitionCache(), stats_listener=received.append)
+
+    stats = RecognitionStats()
+    matching_core.recognize("stats pair a b", stats=stats)
+    assert received == [stats]
+    assert stats.expanded > 0
+    assert stats.created > 0
+    assert stats.max_frontier >= 1
+    assert stats.analyzer_calls == {"token": 2}
+    assert stats.namespace_time > 0
+    assert stats.command_time > 0
+    assert stats.total_time() >= stats.command_time
+    assert not stats.cached
+
+    matching_core.recognize("stats pair a b")
+    assert len(received) == 2
+    assert received[1].cached
+    assert received[1].expanded == 0
+
+    with pytest.raises(RecognizerError):
+        matching_core.recognize("stats pair a")
+    assert len(received) == 3
+    assert received[2].command_time > 0
@@ -0,0 +1,30 @@
+from src.miles.shared.context.flags import Flags
+
+
+def test_copy_on_write():
+    origin = Flags()
+    origin.set_flag('source', 'text')
+    copy = origin.copy()
+    assert copy['source'] == 'text'
+
+    copy.set_flag('source', 'audio')
+    assert copy['source'] == 'audio'
+    assert origin['source'] == 'text'
+
+    origin.set_flag('debug', True)
+    assert not copy.has_flag('debug')
+
+
+def test_hashable():
+    first = Flags()
+    first.set_flag('source', 'text')
+    first.set_flag('values', [1, 2])
+    second = Flags({'values': [1, 2], 'source': 'text'})
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first, second, first.copy()}) == 1
+
+    second.set_flag('source', 'audio')
+    assert first != second
+    assert first.fingerprint() != second.fingerprint()
@@ -0,0 +1,37 @@
+from src.miles.shared.recognition_cache import RecognitionCache
+
+
+def test_lru_eviction():
+    cache = RecognitionCache(max_size=2)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]
+    cache.put('c', [3])
+
+    assert cache.get('b') is None
+    assert cache.get('a') == [1]
+    assert cache.get('c') == [3]
+    assert cache.evictions() == 1
+    assert cache.hits() == 3
+    assert cache.misses() == 1
+    assert cache.hit_rate() == 0.75
+
+
+def test_values_are_copied():
+    cache = RecognitionCache()
+    value = ['x']
+    cache.put('a', value)
+    value.append('y')
+    cached = cache.get('a')
+    cached.append('z')
+
+    assert cache.get('a') == ['x']
+
+
+def test_ttl():
+    cache = RecognitionCache(ttl=1e-9)
+    cache.put('a', 1)
+
+    assert cache.get('a') is None
+    assert cache.expirations() == 1
+    assert cache.size() == 0
@@ -0,0 +1,42 @@
+import pytest
+
+from src.miles.shared.register import MilesRegister, _PrefixSet
+
+
+def test_revision_changes():
+    register = MilesRegister()
+    before = register.revision()
+
+    plugin = register.create_plugin_register('test_revision_plugin')
+    after_plugin = register.revision()
+    namespace = plugin.add_namespace('test_revision_namespace', 'test revision')
+    after_namespace = register.revision()
+    namespace.add_command('command', 'word', None)
+    after_command = register.revision()
+
+    assert before < after_plugin < after_namespace < after_command
+    assert register.revision() == after_command
+
+    namespace.get_commands().clear()
+    namespace.get_static_priorities().append(None)
+    namespace.get_dynamic_priorities().append(None)
+    assert len(namespace.get_commands()) == 1
+    assert namespace.get_static_priorities() == []
+    assert namespace.get_dynamic_priorities() == []
+
+
+def test_prefix_conflicts():
+    prefixes = _PrefixSet()
+    prefixes.remember_and_validate('canvas')
+    prefixes.remember_and_validate('cart')
+    prefixes.remember_and_validate('car wash')
+
+    with pytest.raises(ValueError, match='"ca" is part of "canvas"'):
+        prefixes.remember_and_validate('ca')
+    with pytest.raises(ValueError, match='"canvas" is part of "canvas app"'):
+        prefixes.remember_and_validate('canvas app')
+    with pytest.raises(ValueError, match='"cart" is part of "cart"'):
+        prefixes.remember_and_validate('cart')
+    with pytest.raises(ValueError, match='"car" is part of "cart"'):
+        prefixes.remember_and_validate('car')
+    prefixes.remember_and_validate('cat')